@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase
+from src.storage.storage_manager import StorageManager
+from benchmarks.bench_search import make_entries
+from benchmarks.bench_sqlite_engine import FAST_PARAMS
+import shutil
+import tempfile
+import time
+
+def timed(function, repeat: int = 20) -> float:
+    """Melhor tempo de `repeat` execuções, em ms"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def bench_change_detection(count: int = 20_000):
+    data_dir = tempfile.mkdtemp()
+    try:
+        writer = StorageManager(data_dir, kdf_params=FAST_PARAMS, journal_mode=True)
+        assert writer.save_database(PasswordDatabase(make_entries(count)), "senha_mestre")
+        written = writer.load_database("senha_mestre")
+        reader = StorageManager(data_dir, kdf_params=FAST_PARAMS, journal_mode=True)
+        database = reader.load_database("senha_mestre")
+
+        # Sem gravações de outro processo: só stat e cabeçalho
+        unchanged = timed(lambda: reader.refresh_database(database, "senha_mestre"))
+        # Outro processo editou uma entrada: lê só o registro novo do diário
+        entries = list(written)
+
+        def edit_and_refresh():
+            entry = writer.reveal_entry(entries.pop(), "senha_mestre")
+            entry.title += " (editado)"
+            entry.update_timestamp()
+            writer.save_entry(written, entry, "senha_mestre")
+            start = time.perf_counter()
+            assert reader.refresh_database(database, "senha_mestre")
+            return time.perf_counter() - start
+        incremental = min(edit_and_refresh() for _ in range(20)) * 1000
+        full = timed(lambda: reader.load_database("senha_mestre"), repeat=3)
+
+        print(f"{count} entradas")
+        print(f"Sem alterações:        {unchanged:8.3f} ms")
+        print(f"Uma entrada alterada:  {incremental:8.3f} ms")
+        print(f"Recarregar tudo:       {full:8.1f} ms")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    bench_change_detection()
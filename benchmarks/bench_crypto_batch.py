@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.crypto_manager import CryptoManager
+from cryptography.fernet import Fernet
+import time
+
+def timed(function, rounds: int = 3) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def bench_batch(count: int = 100_000, size: int = 64):
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    payloads = [os.urandom(size) for _ in range(count)]
+    ids = [str(i).encode() for i in range(count)]
+    
+    one_by_one = timed(lambda: [crypto.encrypt_bytes(p, aad) for p, aad in zip(payloads, ids)])
+    batch = timed(lambda: crypto.encrypt_many(payloads, ids, workers=0))
+    sealed = crypto.encrypt_many(payloads, ids)
+    opened = timed(lambda: crypto.decrypt_many(sealed, ids, workers=0))
+    
+    print(f"{count} payloads de {size} bytes")
+    print(f"encrypt_bytes um a um: {one_by_one:.0f} ms")
+    print(f"encrypt_many:          {batch:.0f} ms")
+    print(f"decrypt_many:          {opened:.0f} ms")
+    for workers in (2, 4, os.cpu_count() or 1):
+        parallel = timed(lambda: crypto.encrypt_many(payloads, ids, workers=workers))
+        print(f"encrypt_many, {workers} threads: {parallel:.0f} ms")
+
+def bench_fernet(count: int = 20_000):
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    
+    # Antes: um Fernet novo a cada chamada
+    fresh = timed(lambda: [Fernet(crypto.key).encrypt(b"registro") for _ in range(count)])
+    cached = timed(lambda: [crypto.encrypt_data("registro") for _ in range(count)])
+    print(f"Fernet por chamada: {fresh:.0f} ms, reaproveitado: {cached:.0f} ms ({count} registros)")
+
+if __name__ == "__main__":
+    bench_batch()
+    bench_fernet()
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication
+from src.ui.main_window import PasswordDialog
+from src.ui.theme_manager import ThemeManager
+from benchmarks.bench_search import make_entries
+import time
+
+def open_and_close(app: QApplication, open_dialog) -> float:
+    """Tempo até o diálogo estar desenhado na tela, em ms"""
+    start = time.perf_counter()
+    dialog = open_dialog()
+    dialog.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    dialog.hide()
+    return elapsed * 1000
+
+def bench_entry_dialog(opens: int = 30):
+    app = QApplication.instance() or QApplication(sys.argv)
+    manager = ThemeManager()
+    manager.apply()
+    entries = make_entries(opens)
+    created = []
+
+    def new_dialog(entry):
+        dialog = PasswordDialog(entry)
+        created.append(dialog)
+        return dialog
+
+    cached = PasswordDialog()
+    results = {}
+    for label, open_dialog in (("Novo a cada abertura", new_dialog),
+                               ("Reaproveitado (bind)", lambda entry: cached.bind(entry) or cached)):
+        times = [open_and_close(app, lambda: open_dialog(entry)) for entry in entries]
+        manager.apply(manager.toggle_theme())
+        after_toggle = open_and_close(app, lambda: open_dialog(entries[0]))
+        results[label] = (min(times), after_toggle)
+
+    for dialog in created:
+        dialog.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    print("                        abrir     logo após trocar o tema")
+    for label, (opening, after_toggle) in results.items():
+        print(f"{label:<22} {opening:6.2f} ms {after_toggle:12.2f} ms")
+
+if __name__ == "__main__":
+    bench_entry_dialog()
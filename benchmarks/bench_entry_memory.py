@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+import random
+import tracemalloc
+
+WORDS = ["mail", "bank", "shop", "cloud", "git", "news", "social", "travel", "music", "video"]
+USERNAMES = [f"{word}@example.com" for word in WORDS] + ["admin", "root", "fulano"]
+
+@dataclass
+class DataclassEntry:
+    """PasswordEntry de antes: dataclass com __dict__ e datas em texto ISO"""
+    id: str
+    title: str
+    username: str
+    password: str
+    url: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: str = None
+    updated_at: str = None
+    sealed_secret: Optional[bytes] = field(default=None, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.now().isoformat()
+        if self.updated_at is None:
+            self.updated_at = self.created_at
+
+def raw_rows(count: int):
+    """Valores como chegam de um arquivo: strings novas a cada entrada (sem compartilhamento)"""
+    rng = random.Random(42)
+    for i in range(count):
+        word = rng.choice(WORDS)
+        created = datetime(2024, 1, 1, 12, 0, i % 60, i)
+        yield (
+            str(i),
+            f"{word.title()} {i}",
+            "".join(rng.choice(USERNAMES)),  # Cópia nova: valores repetidos entre entradas
+            "".join(f"https://{word}.com"),
+            created.isoformat(),
+            created.replace(minute=30).isoformat(),
+            b"\x01" + bytes(40),
+        )
+
+def measure(entry_class, count: int) -> float:
+    """Memória (MiB) que continua ocupada pelas entradas criadas"""
+    tracemalloc.start()
+    entries = [
+        entry_class(id=entry_id, title=title, username=username, password=None, url=url,
+                    created_at=created, updated_at=updated, sealed_secret=sealed)
+        for entry_id, title, username, url, created, updated, sealed in raw_rows(count)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(entries) == count
+    return size / (1024 * 1024)
+
+def bench_memory(count: int = 100_000):
+    before = measure(DataclassEntry, count)
+    after = measure(PasswordEntry, count)
+    
+    print(f"{count} entradas")
+    print(f"Dataclass:          {before:.1f} MiB")
+    print(f"__slots__ compacto: {after:.1f} MiB")
+
+if __name__ == "__main__":
+    bench_memory()
@@ -0,0 +1,31 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.fuzzy_search import FuzzySearch
+from src.models.search_index import SearchIndex
+from benchmarks.bench_search import make_entries
+import gc
+import time
+
+FRAME_MS = 16.7
+
+def bench_fuzzy(count: int = 50_000):
+    entries = make_entries(count)
+    search = FuzzySearch(SearchIndex(entries))
+    gc.collect()  # Como o desbloqueio faz ao terminar de carregar
+    
+    # Digitação letra a letra, com e sem erro de digitação
+    for query in ["cloud 4211", "colud 4211", "socail", "travle4242", "bank12@examp"]:
+        worst = total = 0.0
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = search.search(query[:end])
+            elapsed = (time.perf_counter() - start) * 1000
+            worst = max(worst, elapsed)
+            total += elapsed
+        print(f"'{query}': {len(results)} resultados, média {total / len(query):.1f} ms/tecla, "
+              f"pior {worst:.1f} ms (quadro = {FRAME_MS} ms)")
+
+if __name__ == "__main__":
+    bench_fuzzy()
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase
+from src.storage.importer import read_rows
+from src.storage.storage_manager import StorageManager
+from benchmarks.bench_sqlite_engine import FAST_PARAMS
+import csv
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+def write_exports(data_dir: str, count: int) -> tuple[str, str]:
+    """Exportação CSV (Chrome) e JSON (Bitwarden) com `count` logins"""
+    csv_path = os.path.join(data_dir, "chrome.csv")
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "username", "password", "note"])
+        for i in range(count):
+            writer.writerow([f"Site {i}", f"https://site{i}.com/login", f"user{i}@example.com",
+                             f"senha-{i}-{i * 7919 % 100003}", "nota" if i % 10 == 0 else ""])
+
+    json_path = os.path.join(data_dir, "bitwarden.json")
+    with open(json_path, 'w') as f:
+        items = ({'type': 1, 'name': f"Site {i}", 'notes': None,
+                  'login': {'username': f"user{i}@example.com", 'password': f"senha-{i}",
+                            'uris': [{'match': None, 'uri': f"https://site{i}.com/login"}]}}
+                 for i in range(count))
+        f.write('{"encrypted": false, "folders": [], "items": [')
+        for i, item in enumerate(items):
+            f.write((',' if i else '') + json.dumps(item))
+        f.write(']}')
+    return csv_path, json_path
+
+def peak_mib(function) -> float:
+    """Pico de memória alocada durante `function`, em MiB"""
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+def bench_import(count: int = 100_000):
+    data_dir = tempfile.mkdtemp()
+    try:
+        csv_path, json_path = write_exports(data_dir, count)
+        for name, path, load_all in (("CSV", csv_path, lambda f: list(csv.DictReader(f))),
+                                     ("JSON", json_path, lambda f: json.load(f)['items'])):
+            size = os.path.getsize(path) / 2 ** 20
+
+            # Leitura: arquivo inteiro em memória x fluxo
+            def whole():
+                with open(path, newline='') as f:
+                    load_all(f)
+            streamed = peak_mib(lambda: sum(1 for _ in read_rows(path)))
+
+            # Importação completa num cofre vazio: leitura, criptografia em lote e um save
+            vault_dir = os.path.join(data_dir, f"vault_{name}")
+            storage = StorageManager(vault_dir, kdf_params=FAST_PARAMS)
+            database = PasswordDatabase()
+            start = time.perf_counter()
+            result = storage.import_file(database, path, "senha_mestre")
+            elapsed = time.perf_counter() - start
+            assert result.imported == count
+
+            print(f"{name} ({count} linhas, {size:.1f} MiB)")
+            print(f"  Pico lendo tudo:     {peak_mib(whole):8.1f} MiB")
+            print(f"  Pico lendo em fluxo: {streamed:8.1f} MiB")
+            print(f"  Importar e salvar:   {elapsed:8.2f} s ({count / elapsed:,.0f} linhas/s)")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    bench_import()
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.crypto_manager import CryptoManager
+from src.models.password_model import PasswordDatabase
+from src.storage.vault_format import encode_chunks
+from benchmarks.bench_search import make_entries
+import subprocess
+import tempfile
+
+# Processo filho: lê o cofre de um jeito e informa tempo e pico de RSS
+READ_SCRIPT = """
+import os, sys, time, resource
+sys.path.insert(0, sys.argv[1])
+from src.crypto.crypto_manager import CryptoManager
+from src.storage.vault_format import decode_vault, VaultReader, MappedVault
+
+path, mode = sys.argv[2], sys.argv[3]
+crypto = CryptoManager()
+crypto.use_key(sys.argv[4].encode())
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+with open(path, 'rb') as f:
+    if mode == "read":
+        count = len(decode_vault(f.read(), crypto))
+    elif mode == "stream":
+        count = sum(len(batch) for batch in VaultReader(f, crypto).batches())
+    else:
+        vault = MappedVault(f, crypto)
+        if mode == "mmap":
+            count = sum(len(batch) for batch in vault.batches())
+        else:
+            count = len(vault.read_chunk(len(vault) // 2))  # Só o bloco necessário
+        vault.close()
+elapsed = time.perf_counter() - start
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(count, elapsed * 1000, (peak - baseline) / 1024, peak / 1024)
+"""
+
+MODES = [
+    ("read", "f.read() + decode"),
+    ("stream", "leitura em blocos"),
+    ("mmap", "mmap, todos os blocos"),
+    ("mmap-one", "mmap, um bloco"),
+]
+
+def bench_mapped_read(count: int = 100_000):
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    with tempfile.NamedTemporaryFile() as f:
+        for chunk in encode_chunks(PasswordDatabase(make_entries(count)), crypto):
+            f.write(chunk)
+        f.flush()
+        print(f"{count} entradas, {os.path.getsize(f.name) / (1024 * 1024):.1f} MiB")
+        
+        for mode, label in MODES:
+            result = subprocess.run([sys.executable, "-c", READ_SCRIPT, root, f.name, mode, crypto.key.decode()],
+                                    capture_output=True, text=True, check=True)
+            entries, elapsed, rss, total = result.stdout.split()
+            print(f"{label:24} {float(elapsed):7.0f} ms  pico RSS {float(total):6.1f} MiB (+{float(rss):.1f} na leitura, {entries} entradas)")
+
+if __name__ == "__main__":
+    bench_mapped_read()
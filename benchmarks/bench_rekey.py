@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.kdf import KdfParams, KDF_SCRYPT
+from src.models.password_model import PasswordDatabase
+from src.storage.storage_manager import StorageManager
+from benchmarks.bench_search import make_entries
+import shutil
+import tempfile
+import time
+
+# KDF barato: o que interessa aqui é a recriptografia das entradas
+FAST_PARAMS = KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 10)
+
+def bench_rekey(count: int = 100_000):
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert storage.save_database(PasswordDatabase(make_entries(count)), "senha_antiga")
+        
+        start = time.perf_counter()
+        assert storage.change_master_password("senha_antiga", "senha_nova")
+        password_only = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        assert storage.change_master_password("senha_nova", "senha_final", rotate_key=True)
+        rotation = time.perf_counter() - start
+        
+        print(f"{count} entradas ({os.cpu_count()} CPUs)")
+        print(f"Troca de senha:           {password_only * 1000:.0f} ms")
+        print(f"Troca de senha e de chave: {rotation * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    bench_rekey()
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from src.models.search_index import SearchIndex
+import random
+import time
+
+WORDS = ["mail", "bank", "shop", "cloud", "git", "news", "social", "travel", "music", "video"]
+
+def make_entries(count: int) -> list[PasswordEntry]:
+    rng = random.Random(42)
+    entries = []
+    for i in range(count):
+        word = rng.choice(WORDS)
+        entries.append(PasswordEntry(
+            id=str(i),
+            title=f"{word.title()} {i}",
+            username=f"{rng.choice(WORDS)}{i}@example.com",
+            password="senha",
+            url=f"https://{word}{i % 997}.com"
+        ))
+    return entries
+
+def linear_scan(entries, search_text):
+    """Filtro original de MainWindow.filter_entries"""
+    return [
+        entry for entry in entries
+        if (search_text in entry.title.lower() or
+            search_text in entry.username.lower() or
+            (entry.url and search_text in entry.url.lower()))
+    ]
+
+def bench_search(count: int = 100_000):
+    entries = make_entries(count)
+    
+    start = time.perf_counter()
+    index = SearchIndex(entries)
+    print(f"Construção do índice ({count} entradas): {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    # Simula digitação: cada prefixo é uma consulta
+    for query in ["bank 1234", "cloud99@", "social", "example"]:
+        linear_total = index_total = 0.0
+        for end in range(1, len(query) + 1):
+            prefix = query[:end]
+            start = time.perf_counter()
+            expected = linear_scan(entries, prefix)
+            linear_total += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            found = index.search(prefix)
+            index_total += time.perf_counter() - start
+            assert found == [e.id for e in expected]
+        
+        keys = len(query)
+        print(f"'{query}': varredura {linear_total / keys * 1000:.1f} ms/tecla, "
+              f"índice {index_total / keys * 1000:.1f} ms/tecla")
+
+if __name__ == "__main__":
+    bench_search()
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import uuid
+import shutil
+import tempfile
+import time
+
+def make_database(count: int) -> PasswordDatabase:
+    db = PasswordDatabase()
+    for i in range(count):
+        db.entries.append(PasswordEntry(
+            id=str(uuid.uuid4()),
+            title=f"Site {i}",
+            username=f"user{i}@test.com",
+            password=f"senha{i}",
+            url=f"https://site{i}.com"
+        ))
+    return db
+
+def bench_saves(rounds: int = 20, entries: int = 100):
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir)
+        master_password = "senha_mestre_123"
+        db = make_database(entries)
+        storage.save_database(db, master_password)
+        
+        # Antes: KDF em cada save (sessão bloqueada a cada vez)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            storage.lock()
+            storage.save_database(db, master_password)
+        cold = (time.perf_counter() - start) / rounds
+        
+        # Agora: chave da sessão reutilizada
+        start = time.perf_counter()
+        for _ in range(rounds):
+            storage.save_database(db, master_password)
+        warm = (time.perf_counter() - start) / rounds
+        
+        print(f"Save com KDF:    {cold * 1000:.2f} ms")
+        print(f"Save com sessão: {warm * 1000:.2f} ms")
+        print(f"Ganho: {cold / warm:.1f}x")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    bench_saves()
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase
+from src.storage.storage_manager import StorageManager
+from benchmarks.bench_search import make_entries
+from benchmarks.bench_sqlite_engine import FAST_PARAMS
+import shutil
+import tempfile
+import time
+
+def disk_usage(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+def bench_snapshots(count: int = 100_000, days: int = 5):
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS, journal_mode=True)
+        assert storage.save_database(PasswordDatabase(make_entries(count)), "senha_mestre")
+        database = storage.load_database("senha_mestre")
+        backups = storage.snapshots.root
+        vault_size = os.path.getsize(storage.db_file)
+
+        start = time.perf_counter()
+        first = storage.create_snapshot("senha_mestre")
+        first_time = time.perf_counter() - start
+        first_size = disk_usage(backups)
+
+        # Um "dia" de uso: algumas entradas editadas, depois o snapshot diário
+        daily = []
+        entries = list(database)
+        for day in range(days):
+            for entry in entries[day * 10:day * 10 + 10]:
+                entry = storage.reveal_entry(entry, "senha_mestre")
+                entry.title += " (editado)"
+                entry.update_timestamp()
+                assert storage.save_entry(database, entry, "senha_mestre")
+            before = disk_usage(backups)
+            start = time.perf_counter()
+            assert storage.create_snapshot("senha_mestre") is not None
+            daily.append((time.perf_counter() - start, disk_usage(backups) - before))
+
+        start = time.perf_counter()
+        restored = storage.load_snapshot(first, "senha_mestre")
+        restore_time = time.perf_counter() - start
+        assert len(restored) == count
+
+        export_path = os.path.join(data_dir, "export.encrypted")
+        start = time.perf_counter()
+        assert storage.export_vault(export_path, "senha_mestre")
+        export_time = time.perf_counter() - start
+
+        print(f"{count} entradas, cofre de {vault_size / 2 ** 20:.1f} MiB")
+        print(f"Primeiro snapshot:        {first_size / 2 ** 20:8.1f} MiB em {first_time:.2f} s")
+        for day, (elapsed, size) in enumerate(daily, 1):
+            print(f"Dia {day} (10 alteradas):    {size / 1024:8.1f} KiB em {elapsed:.2f} s "
+                  f"(cópia do arquivo: {vault_size / 1024:.0f} KiB)")
+        print(f"Carregar snapshot:        {restore_time:8.2f} s")
+        print(f"Exportar arquivo único:   {export_time:8.2f} s")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    bench_snapshots()
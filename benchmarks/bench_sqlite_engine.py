@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.kdf import KdfParams, KDF_SCRYPT
+from src.models.password_model import PasswordDatabase
+from src.storage.storage_manager import StorageManager, ENGINE_FILE, ENGINE_SQLITE
+from benchmarks.bench_search import make_entries
+import shutil
+import tempfile
+import time
+
+# KDF barato: o que interessa aqui é o custo de gravar e abrir o cofre
+FAST_PARAMS = KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 10)
+
+def bench_engine(label: str, count: int, edits: int = 50, **options):
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS, **options)
+        database = PasswordDatabase(make_entries(count))
+        assert storage.save_database(database, "senha_mestre")
+
+        entries = list(database)[:edits]
+        start = time.perf_counter()
+        for entry in entries:
+            entry.title += " (editado)"
+            assert storage.save_entry(database, entry, "senha_mestre")
+        edit = (time.perf_counter() - start) / edits
+        storage.close()
+
+        reopened = StorageManager(data_dir, kdf_params=FAST_PARAMS, **options)
+        start = time.perf_counter()
+        assert reopened.load_entry(entries[0].id, "senha_mestre") is not None
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert len(reopened.load_database("senha_mestre")) == count
+        load = time.perf_counter() - start
+        reopened.close()
+
+        print(f"{label:<16} {edit * 1000:9.2f} ms {single * 1000:10.1f} ms {load * 1000:9.0f} ms")
+    finally:
+        shutil.rmtree(data_dir)
+
+def bench_engines(count: int = 20_000):
+    print(f"{count} entradas     por edição   uma entrada  abrir tudo")
+    bench_engine("Arquivo", count, engine=ENGINE_FILE)
+    bench_engine("Arquivo+diário", count, engine=ENGINE_FILE, journal_mode=True)
+    bench_engine("SQLite", count, engine=ENGINE_SQLITE)
+
+if __name__ == "__main__":
+    bench_engines()
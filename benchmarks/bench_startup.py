@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase
+from src.storage.storage_manager import StorageManager
+from benchmarks.bench_search import make_entries
+from benchmarks.bench_sqlite_engine import FAST_PARAMS
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda num processo novo (imports frios), no diretório do cofre de teste:
+# mede até a primeira pintura do login e até a lista desbloqueada na tela.
+# Pausas curtas nos laços: chamar processEvents sem parar esgota a contagem de
+# referências do None no PySide6 com Python 3.11
+_DRIVER = r"""
+import time
+start = time.perf_counter()
+import sys
+sys.argv = ["main.py"]
+sys.path.insert(0, ROOT)
+import main
+from PySide6.QtCore import QEvent, QObject
+
+class FirstPaint(QObject):
+    painted = None
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.painted is None:
+            self.painted = time.perf_counter()
+        return False
+
+app = main.PasswordManagerApp()
+watcher = FirstPaint()
+app.app.installEventFilter(watcher)
+app.show_login()
+while watcher.painted is None:
+    app.app.processEvents()
+painted = watcher.painted
+heavy = [name for name in ("cryptography.fernet", "ui.main_window") if name in sys.modules]
+
+# Usuário digita a senha (o aquecimento roda nesse meio tempo)
+deadline = time.perf_counter() + 0.5
+while time.perf_counter() < deadline:
+    app.app.processEvents()
+    time.sleep(0.005)
+typed = time.perf_counter()
+app.login_window.password_input.setText("senha_mestre")
+app.login_window.handle_login()
+while app.main_window is None or not app.main_window.list_model.rowCount():
+    app.app.processEvents()
+    time.sleep(0.001)
+unlocked = time.perf_counter()
+print(json.dumps({"paint": painted - start, "unlock": unlocked - typed, "before_paint": heavy}))
+app.on_quit()
+"""
+
+def run_once(data_dir: str) -> dict:
+    driver = "ROOT = %r\nimport json\n" % ROOT + _DRIVER
+    environment = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    launched = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", driver], cwd=data_dir, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - launched
+    return result
+
+def bench_startup(count: int = 2000, runs: int = 5):
+    work_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(os.path.join(work_dir, "data"), kdf_params=FAST_PARAMS, journal_mode=True)
+        assert storage.save_database(PasswordDatabase(make_entries(count)), "senha_mestre")
+        storage.close()
+
+        results = [run_once(work_dir) for _ in range(runs)]
+        paint = min(result["paint"] for result in results) * 1000
+        unlock = min(result["unlock"] for result in results) * 1000
+        print(f"{count} entradas, melhor de {runs} execuções (KDF barato)")
+        print(f"Primeira pintura do login:   {paint:7.0f} ms (desde o início do script)")
+        print(f"Senha digitada até a lista:  {unlock:7.0f} ms")
+        print(f"Importados antes da pintura: {results[0]['before_paint'] or 'nada pesado'}")
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == "__main__":
+    bench_startup()
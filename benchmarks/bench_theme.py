@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication
+from src.ui.main_window import PasswordDialog
+from src.ui.theme_manager import ThemeManager, stylesheet
+import time
+
+def open_dialog(app: QApplication, per_widget: bool, theme: str) -> PasswordDialog:
+    dialog = PasswordDialog()
+    if per_widget:
+        dialog.setStyleSheet(stylesheet(theme))  # Como antes: cada diálogo reaplicava o QSS
+    dialog.show()
+    app.processEvents()
+    return dialog
+
+def bench_windows(app: QApplication, manager: ThemeManager, count: int, per_widget: bool):
+    app.setStyleSheet("")
+    if not per_widget:
+        manager.apply("dark")
+    windows = [open_dialog(app, per_widget, "dark") for _ in range(count)]
+
+    start = time.perf_counter()
+    extra = open_dialog(app, per_widget, "dark")
+    opening = time.perf_counter() - start
+
+    toggle = float('inf')
+    for theme in ("light", "dark", "light"):
+        start = time.perf_counter()
+        if per_widget:
+            for window in windows + [extra]:
+                window.setStyleSheet(stylesheet(theme))
+        else:
+            manager.apply(theme)
+        app.processEvents()
+        toggle = min(toggle, time.perf_counter() - start)
+
+    for window in windows + [extra]:
+        window.close()
+        window.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    return opening * 1000, toggle * 1000
+
+def bench_theme():
+    app = QApplication.instance() or QApplication(sys.argv)
+    manager = ThemeManager()
+    print("janelas   abrir diálogo (widget / app)   alternar tema (widget / app)")
+    for count in (1, 10, 50):
+        open_widget, toggle_widget = bench_windows(app, manager, count, per_widget=True)
+        open_app, toggle_app = bench_windows(app, manager, count, per_widget=False)
+        print(f"{count:7} {open_widget:12.2f} / {open_app:5.2f} ms {toggle_widget:19.1f} / {toggle_app:5.1f} ms")
+
+if __name__ == "__main__":
+    bench_theme()
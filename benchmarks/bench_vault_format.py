@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.crypto_manager import CryptoManager
+from src.models.password_model import PasswordDatabase
+from src.storage.vault_format import encode_vault, decode_vault, VaultReader
+from benchmarks.bench_search import make_entries
+import tempfile
+import time
+import tracemalloc
+
+def timed(function, rounds: int = 3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+def bench_formats(count: int = 50_000):
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    database = PasswordDatabase(make_entries(count))
+    
+    # Antes: JSON indentado dentro de um token Fernet (base64)
+    legacy, legacy_save = timed(lambda: crypto.encrypt_data(database.to_json()))
+    _, legacy_load = timed(lambda: decode_vault(legacy, crypto))
+    
+    # Agora: container binário colunar com AES-GCM
+    binary, binary_save = timed(lambda: encode_vault(database, crypto))
+    loaded, binary_load = timed(lambda: decode_vault(binary, crypto))
+    assert [e.title for e in loaded] == [e.title for e in database]
+    
+    print(f"{count} entradas")
+    print(f"JSON/Fernet: {len(legacy) / 1024:.0f} KiB, save {legacy_save:.0f} ms, load {legacy_load:.0f} ms")
+    print(f"Binário:     {len(binary) / 1024:.0f} KiB, save {binary_save:.0f} ms, load {binary_load:.0f} ms")
+
+def peak_memory(function) -> float:
+    """Pico de memória alocada (MiB) durante a chamada"""
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+def bench_streaming(count: int = 50_000):
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    data = encode_vault(PasswordDatabase(make_entries(count)), crypto)
+    
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        del data
+        
+        def read_all():
+            with open(f.name, 'rb') as vault:
+                return decode_vault(vault.read(), crypto)
+        
+        def stream():
+            with open(f.name, 'rb') as vault:
+                # Consumir os blocos sem guardar: só o custo da leitura em si
+                return sum(len(batch) for batch in VaultReader(vault, crypto).batches())
+        
+        print(f"Pico lendo o arquivo inteiro: {peak_memory(read_all):.1f} MiB (inclui o database)")
+        print(f"Pico lendo bloco a bloco:     {peak_memory(stream):.1f} MiB")
+
+if __name__ == "__main__":
+    bench_formats()
+    bench_streaming()
@@ -1,5 +1,7 @@
 import sys
 import os
+import threading
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 
 # Adicionar src ao path para imports
@@ -8,35 +10,70 @@ src_dir = os.path.join(current_dir, 'src')
 sys.path.insert(0, current_dir)
 sys.path.insert(0, src_dir)
 
+# Só o necessário para a tela de login; janela principal e cryptography são
+# importados depois da primeira pintura (warm_up) ou quando forem usados
 from storage.storage_manager import StorageManager
 from ui.login_window import LoginWindow
-from ui.main_window import MainWindow
+from ui.theme_manager import ThemeManager
+
+# Espera antes de aquecer: a primeira pintura do login chega depois dos timers
+# imediatos, e ninguém digita a senha em menos que isto
+WARM_UP_DELAY_MS = 100
 
 class PasswordManagerApp:
     def __init__(self):
         self.app = QApplication(sys.argv)
-        self.storage_manager = StorageManager()
+        self.storage_manager = StorageManager(journal_mode=True)
+        self.theme_manager = ThemeManager()
+        self.theme_manager.apply()  # Uma vez para todas as janelas
         self.master_password = None
+        self.login_window = None
         self.main_window = None
 
+        # Concluir gravações pendentes e zerar chave da sessão ao sair
+        self.app.aboutToQuit.connect(self.on_quit)
+
     def run(self):
         """Executa aplicação"""
-        # Mostrar tela de login
-        login_window = LoginWindow(self.storage_manager)
-        login_window.login_successful.connect(self.on_login_success)
-        login_window.show()
+        self.show_login()
 
         # Executar aplicação
         return self.app.exec()
 
-    def on_login_success(self, master_password):
+    def show_login(self):
+        """Mostra a tela de login e agenda o aquecimento para depois da primeira pintura"""
+        self.login_window = LoginWindow(self.storage_manager)
+        self.login_window.login_successful.connect(self.on_login_success)
+        self.login_window.show()
+        QTimer.singleShot(WARM_UP_DELAY_MS, self.warm_up)
+
+    def warm_up(self):
+        """Importa o restante enquanto o usuário digita a senha
+
+        O cryptography (sem Qt) vai para uma thread; os módulos de interface são
+        importados aqui, na thread principal, num único passo curto.
+        """
+        from src.crypto.crypto_manager import preload_backend
+        threading.Thread(target=preload_backend, name="warm-up", daemon=True).start()
+        import src.models.search_index  # noqa: F401
+        import ui.main_window  # noqa: F401
+
+    def on_login_success(self, master_password, database, search_index):
         """Callback quando login é bem-sucedido"""
+        from ui.main_window import MainWindow  # Já importado pelo warm_up, em geral
         self.master_password = master_password
 
-        # Abrir tela principal
-        self.main_window = MainWindow(self.storage_manager, master_password)
+        # Abrir tela principal com o database já desbloqueado
+        self.main_window = MainWindow(self.storage_manager, master_password, database, search_index,
+                                      self.theme_manager)
         self.main_window.show()
 
+    def on_quit(self):
+        """Grava alterações pendentes antes de encerrar"""
+        if self.main_window:
+            self.main_window.flush_pending_saves()
+        self.storage_manager.close()
+
 if __name__ == "__main__":
     app = PasswordManagerApp()
     sys.exit(app.run())
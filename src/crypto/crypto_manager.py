@@ -1,44 +1,210 @@
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from src.crypto.kdf import KdfParams, LEGACY_PARAMS, preload_kdfs
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Sequence, Union
 import base64
+import hmac
 import os
+import threading
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+# Lotes menores que isto por thread não compensam a troca de thread
+MIN_PARALLEL_BATCH = 64
+
+_pools: dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    """Pool de threads compartilhada por tamanho (criada no primeiro uso)"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(workers, thread_name_prefix="crypto")
+        return pool
+
+# O cryptography é importado no primeiro uso, não no import deste módulo: a tela
+# de login abre sem ele (preload_backend() o aquece enquanto a senha é digitada)
+
+def preload_backend():
+    """Importa as primitivas usadas no desbloqueio e na descriptografia"""
+    import cryptography.fernet
+    import cryptography.hazmat.primitives.ciphers.aead
+    import cryptography.hazmat.primitives.kdf.hkdf
+    preload_kdfs()
+
+def _hkdf_subkey(key: bytes, info: bytes) -> bytes:
+    """Subchave de 32 bytes derivada da chave do cofre"""
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info)
+    return hkdf.derive(base64.urlsafe_b64decode(key))
+
+def _slices(count: int, workers: int) -> list[range]:
+    """Divide `count` itens em até `workers` faixas contíguas"""
+    workers = max(1, min(workers, count // MIN_PARALLEL_BATCH))
+    size = -(-count // workers)
+    return [range(start, min(start + size, count)) for start in range(0, count, size)]
 
 class CryptoManager:
-    def __init__(self):
+    def __init__(self, workers: int = 0):
         self.salt = None
         self.key = None
+        self.workers = workers  # Threads das operações em lote (0 = na thread atual)
+        self._aead = None
+        self._aead_key = None
+        self._aead_raw_key = None
+        self._fernet = None
+        self._fernet_key = None
+        self._index_key = None
+        self._index_key_for = None
     
-    def generate_key_from_password(self, password: str, salt: bytes = None) -> bytes:
-        """Gera chave de criptografia a partir da senha mestre"""
+    def generate_key_from_password(self, password: str, salt: bytes = None,
+                                   params: KdfParams = None) -> bytes:
+        """Gera chave de criptografia a partir da senha mestre
+        
+        Sem `params`, usa o PBKDF2 com 100.000 iterações dos cofres antigos.
+        """
         if salt is None:
             salt = os.urandom(16)
         
         self.salt = salt
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        key = base64.urlsafe_b64encode((params or LEGACY_PARAMS).derive(password, salt))
         self.key = key
         return key
     
+    def use_key(self, key: bytes, salt: bytes = None):
+        """Usa uma chave já derivada (ex: vinda de uma sessão desbloqueada)"""
+        self.key = key
+        self.salt = salt
+        if key is None:
+            self._aead = self._aead_key = self._aead_raw_key = None
+            self._fernet = self._fernet_key = None
+            self._index_key = self._index_key_for = None
+    
     def encrypt_data(self, data: str) -> bytes:
         """Criptografa dados"""
+        return self._get_fernet().encrypt(data.encode())
+    
+    def decrypt_data(self, encrypted_data: bytes) -> str:
+        """Descriptografa dados"""
+        return self._get_fernet().decrypt(encrypted_data).decode()
+    
+    def _get_fernet(self) -> "Fernet":
+        """Fernet da chave atual (criado uma vez por chave)"""
         if not self.key:
             raise ValueError("Chave não foi gerada")
         
-        fernet = Fernet(self.key)
-        return fernet.encrypt(data.encode())
+        if self._fernet_key != self.key:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(self.key)
+            self._fernet_key = self.key
+        return self._fernet
     
-    def decrypt_data(self, encrypted_data: bytes) -> str:
-        """Descriptografa dados"""
+    def _get_aead(self) -> "AESGCM":
+        """Cifra AES-GCM com subchave derivada da chave atual (criada uma vez por chave)"""
         if not self.key:
             raise ValueError("Chave não foi gerada")
         
-        fernet = Fernet(self.key)
-        return fernet.decrypt(encrypted_data).decode()
+        if self._aead_key != self.key:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+            self._aead_raw_key = _hkdf_subkey(self.key, b"picoword-two aead")
+            self._aead = AESGCM(self._aead_raw_key)
+            self._aead_key = self.key
+        return self._aead
+    
+    def keyed_hash(self, data: bytes) -> bytes:
+        """HMAC-SHA256 com subchave derivada da chave atual (igualdade sem revelar o valor)"""
+        if not self.key:
+            raise ValueError("Chave não foi gerada")
+        
+        if self._index_key_for != self.key:
+            self._index_key = _hkdf_subkey(self.key, b"picoword-two index")
+            self._index_key_for = self.key
+        return hmac.digest(self._index_key, data, 'sha256')
+    
+    def encrypt_bytes(self, data: bytes, associated_data: bytes = None) -> bytes:
+        """Criptografa bytes com AES-GCM (retorna nonce + texto cifrado, sem base64)"""
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self._get_aead().encrypt(nonce, data, associated_data)
+    
+    def decrypt_bytes(self, sealed: bytes, associated_data: bytes = None) -> bytes:
+        """Descriptografa o resultado de encrypt_bytes"""
+        aead = self._get_aead()
+        return aead.decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], associated_data)
+    
+    def decrypt_into(self, sealed, out: bytearray, associated_data: bytes = None) -> int:
+        """Como decrypt_bytes, mas escreve em `out` (len(sealed) bytes ou mais) sem copiar a entrada
+        
+        Aceita memoryview (ex: páginas de um arquivo mapeado). Retorna o tamanho
+        do texto claro; ValueError/InvalidTag se a autenticação falhar.
+        """
+        self._get_aead()
+        if len(sealed) < NONCE_SIZE + TAG_SIZE:
+            raise ValueError("Dados criptografados incompletos")
+        
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        mode = modes.GCM(bytes(sealed[:NONCE_SIZE]), bytes(sealed[-TAG_SIZE:]))
+        decryptor = Cipher(algorithms.AES(self._aead_raw_key), mode).decryptor()
+        if associated_data:
+            decryptor.authenticate_additional_data(associated_data)
+        size = decryptor.update_into(sealed[NONCE_SIZE:-TAG_SIZE], out)
+        decryptor.finalize()  # Confere a tag; `out` não deve ser usado se falhar
+        return size
+    
+    def encrypt_many(self, payloads: Sequence, associated_data: Union[bytes, Sequence, None] = None,
+                     workers: Optional[int] = None) -> list[bytes]:
+        """Criptografa vários payloads com a mesma cifra (cada um vira nonce + texto cifrado)
+        
+        Aceita bytes ou memoryview sem copiar. `associated_data` é um valor para
+        todos ou uma sequência com um por payload. Com `workers` (padrão: self.workers)
+        acima de 1, lotes grandes são divididos numa pool de threads: o OpenSSL
+        solta o GIL enquanto cifra.
+        """
+        aead = self._get_aead()
+        count = len(payloads)
+        nonces = os.urandom(NONCE_SIZE * count)  # Uma chamada ao sistema para o lote
+        shared = associated_data is None or isinstance(associated_data, (bytes, bytearray, memoryview))
+        
+        def run(items: range) -> list[bytes]:
+            encrypt = aead.encrypt
+            sealed = []
+            for i in items:
+                nonce = nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE]
+                aad = associated_data if shared else associated_data[i]
+                sealed.append(nonce + encrypt(nonce, payloads[i], aad))
+            return sealed
+        
+        return self._run_batch(run, count, workers)
+    
+    def decrypt_many(self, sealed: Sequence, associated_data: Union[bytes, Sequence, None] = None,
+                     workers: Optional[int] = None) -> list[bytes]:
+        """Inverso de encrypt_many (InvalidTag se qualquer um falhar na autenticação)"""
+        aead = self._get_aead()
+        shared = associated_data is None or isinstance(associated_data, (bytes, bytearray, memoryview))
+        
+        def run(items: range) -> list[bytes]:
+            decrypt = aead.decrypt
+            opened = []
+            for i in items:
+                view = memoryview(sealed[i])
+                aad = associated_data if shared else associated_data[i]
+                opened.append(decrypt(view[:NONCE_SIZE], view[NONCE_SIZE:], aad))
+            return opened
+        
+        return self._run_batch(run, len(sealed), workers)
+    
+    def _run_batch(self, run, count: int, workers: Optional[int]) -> list[bytes]:
+        """Executa `run` sobre faixas do lote, em paralelo se houver threads configuradas"""
+        workers = self.workers if workers is None else workers
+        if workers <= 1 or count < 2 * MIN_PARALLEL_BATCH:
+            return run(range(count))
+        
+        results = []
+        for part in _pool(workers).map(run, _slices(count, workers)):
+            results.extend(part)
+        return results
@@ -0,0 +1,193 @@
+import base64
+import os
+import struct
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+KDF_PBKDF2 = "pbkdf2-sha256"
+KDF_SCRYPT = "scrypt"
+KDF_ARGON2ID = "argon2id"
+
+# Tempo de desbloqueio que a calibração tenta atingir na máquina atual
+DEFAULT_UNLOCK_SECONDS = 0.5
+# Teto de memória dos KDFs memory-hard (acima disso só o tempo aumenta)
+MAX_MEMORY_KIB = 256 * 1024
+
+SALT_SIZE = 16
+_ALGORITHM_IDS = {KDF_PBKDF2: 1, KDF_SCRYPT: 2, KDF_ARGON2ID: 3}
+_ALGORITHMS = {number: name for name, number in _ALGORITHM_IDS.items()}
+_SLOT = struct.Struct('<BIIIB')  # algoritmo, tempo, memória, paralelismo, tamanho do salt
+
+# O cryptography só é importado ao derivar ou abrir uma chave (ver crypto_manager)
+
+@lru_cache(maxsize=None)
+def _argon2id():
+    """Classe Argon2id do cryptography (None em versões sem suporte)"""
+    try:
+        from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+    except ImportError:  # cryptography < 44
+        return None
+    return Argon2id
+
+def preload_kdfs():
+    """Importa os KDFs e o AES-GCM da proteção da chave"""
+    import cryptography.hazmat.primitives.ciphers.aead
+    import cryptography.hazmat.primitives.kdf.pbkdf2
+    import cryptography.hazmat.primitives.kdf.scrypt
+    _argon2id()
+
+@dataclass(frozen=True)
+class KdfParams:
+    """Algoritmo e custo do KDF da senha mestre
+
+    pbkdf2-sha256: time_cost = iterações
+    scrypt: memory_cost = n (potência de 2), time_cost = r, parallelism = p
+    argon2id: time_cost = passadas, memory_cost = KiB, parallelism = lanes
+    """
+    algorithm: str = KDF_SCRYPT
+    time_cost: int = 8
+    memory_cost: int = 2 ** 17
+    parallelism: int = 1
+
+    def derive(self, password: str, salt: bytes) -> bytes:
+        """32 bytes derivados da senha"""
+        if self.algorithm == KDF_PBKDF2:
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+            kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=self.time_cost)
+        elif self.algorithm == KDF_SCRYPT:
+            from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+            kdf = Scrypt(salt=salt, length=32, n=self.memory_cost, r=self.time_cost, p=self.parallelism)
+        elif self.algorithm == KDF_ARGON2ID and _argon2id() is not None:
+            kdf = _argon2id()(salt=salt, length=32, iterations=self.time_cost,
+                           lanes=self.parallelism, memory_cost=self.memory_cost)
+        else:
+            raise ValueError(f"KDF não suportado: {self.algorithm}")
+        return kdf.derive(password.encode())
+
+    @property
+    def work(self) -> int:
+        """Custo relativo (só comparável entre parâmetros do mesmo algoritmo)"""
+        return self.time_cost * max(self.memory_cost, 1) * self.parallelism
+
+    def weaker_than(self, other: "KdfParams") -> bool:
+        """Se vale trocar estes parâmetros por `other` (outro algoritmo ou bem mais barato)"""
+        # Folga de 2x: a calibração varia um pouco a cada medição
+        return self.algorithm != other.algorithm or self.work * 2 <= other.work
+
+# Parâmetros fixos de antes dos cabeçalhos com KDF (chave derivada direto da senha)
+LEGACY_PARAMS = KdfParams(KDF_PBKDF2, time_cost=100000, memory_cost=0)
+
+# Ponto de partida da calibração (nunca abaixo disto)
+_MINIMUM_PARAMS = {
+    KDF_PBKDF2: LEGACY_PARAMS,
+    KDF_SCRYPT: KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 14),
+    KDF_ARGON2ID: KdfParams(KDF_ARGON2ID, time_cost=2, memory_cost=19 * 1024),
+}
+
+def available_algorithms() -> list[str]:
+    """KDFs suportados pela versão instalada do cryptography"""
+    return [name for name in _ALGORITHM_IDS if name != KDF_ARGON2ID or _argon2id() is not None]
+
+def _timed(params: KdfParams) -> float:
+    start = time.perf_counter()
+    params.derive("calibração", bytes(SALT_SIZE))
+    return time.perf_counter() - start
+
+def _doubled(params: KdfParams) -> KdfParams:
+    """Próximo degrau de custo: memória até o teto, depois tempo"""
+    if params.algorithm == KDF_SCRYPT:
+        # Memória do scrypt: 128 * r * n bytes
+        if 128 * params.time_cost * params.memory_cost * 2 <= MAX_MEMORY_KIB * 1024:
+            return replace(params, memory_cost=params.memory_cost * 2)
+        return replace(params, parallelism=params.parallelism * 2)
+    if params.algorithm == KDF_ARGON2ID and params.memory_cost * 2 <= MAX_MEMORY_KIB:
+        return replace(params, memory_cost=params.memory_cost * 2)
+    return replace(params, time_cost=params.time_cost * 2)
+
+@lru_cache(maxsize=None)
+def calibrate(algorithm: str = KDF_SCRYPT, target_seconds: float = DEFAULT_UNLOCK_SECONDS) -> KdfParams:
+    """Parâmetros cujo desbloqueio leva perto de `target_seconds` nesta máquina
+
+    Dobra o custo a partir do mínimo enquanto o dobro ainda cabe no alvo.
+    O resultado é guardado: a máquina não muda durante a execução.
+    """
+    if algorithm not in available_algorithms():
+        raise ValueError(f"KDF não suportado: {algorithm}")
+
+    params = _MINIMUM_PARAMS[algorithm]
+    elapsed = _timed(params)
+    if algorithm == KDF_PBKDF2:
+        # Custo linear nas iterações: uma medição basta
+        iterations = int(params.time_cost * target_seconds / max(elapsed, 1e-6))
+        return replace(params, time_cost=max(params.time_cost, iterations))
+
+    while elapsed * 2 <= target_seconds:
+        params = _doubled(params)
+        elapsed = _timed(params)
+    return params
+
+@dataclass(frozen=True)
+class KeySlot:
+    """Chave do cofre protegida pela senha mestre (guardada no cabeçalho do arquivo)
+
+    A senha, via KDF, abre a chave do cofre; trocar o KDF ou seus parâmetros
+    só recriptografa esta chave, não as entradas.
+    """
+    params: KdfParams
+    salt: bytes
+    wrapped_key: bytes
+
+    @classmethod
+    def create(cls, password: str, key: bytes, params: KdfParams) -> "KeySlot":
+        """Protege `key` (chave no formato do Fernet) com a senha mestre"""
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        salt = os.urandom(SALT_SIZE)
+        slot = cls(params, salt, b"")
+        nonce = os.urandom(12)
+        kek = AESGCM(params.derive(password, salt))
+        wrapped = nonce + kek.encrypt(nonce, base64.urlsafe_b64decode(key), slot._associated_data())
+        return replace(slot, wrapped_key=wrapped)
+
+    def open(self, password: str) -> bytes:
+        """Chave do cofre; ValueError se a senha estiver errada"""
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        kek = AESGCM(self.params.derive(password, self.salt))
+        try:
+            key = kek.decrypt(self.wrapped_key[:12], self.wrapped_key[12:], self._associated_data())
+        except InvalidTag:
+            raise ValueError("Senha mestre incorreta")
+        return base64.urlsafe_b64encode(key)
+
+    def _associated_data(self) -> bytes:
+        """Parâmetros e salt autenticados junto com a chave"""
+        params = self.params
+        return _SLOT.pack(_ALGORITHM_IDS[params.algorithm], params.time_cost, params.memory_cost,
+                          params.parallelism, len(self.salt)) + self.salt
+
+    def to_bytes(self) -> bytes:
+        return self._associated_data() + bytes([len(self.wrapped_key)]) + self.wrapped_key
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> "KeySlot":
+        """Inverso de to_bytes"""
+        if len(data) < offset + _SLOT.size:
+            raise ValueError("Cabeçalho do cofre truncado")
+        algorithm, time_cost, memory_cost, parallelism, salt_size = _SLOT.unpack_from(data, offset)
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(f"KDF desconhecido: {algorithm}")
+        offset += _SLOT.size
+        salt = bytes(data[offset:offset + salt_size])
+        offset += salt_size
+        wrapped_size = data[offset] if offset < len(data) else 0
+        wrapped_key = bytes(data[offset + 1:offset + 1 + wrapped_size])
+        if len(salt) != salt_size or not wrapped_size or len(wrapped_key) != wrapped_size:
+            raise ValueError("Cabeçalho do cofre truncado")
+        params = KdfParams(_ALGORITHMS[algorithm], time_cost, memory_cost, parallelism)
+        return cls(params, salt, wrapped_key)
+
+def new_vault_key() -> bytes:
+    """Chave aleatória para um cofre novo (mesmo formato da derivada da senha)"""
+    return base64.urlsafe_b64encode(os.urandom(32))
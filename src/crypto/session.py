@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import os
+import time
+from typing import Optional
+from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import KeySlot
+
+class VaultSession:
+    """Sessão desbloqueada: deriva a chave uma vez por (salt, senha) e a mantém em memória"""
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout  # Segundos sem uso até bloquear (None = sem expiração)
+        self.salt: Optional[bytes] = None
+        self._key: Optional[bytearray] = None
+        self._fingerprint: Optional[bytes] = None
+        self._nonce = os.urandom(16)
+        self._last_used = 0.0
+
+    def _password_fingerprint(self, password: str, salt: bytes) -> bytes:
+        """Identifica (salt, senha) sem guardar a senha nem rodar o KDF"""
+        return hmac.new(self._nonce, salt + password.encode(), hashlib.sha256).digest()
+
+    def unlock(self, password: str, salt: bytes, slot: Optional[KeySlot] = None) -> bytes:
+        """Deriva a chave (se necessário) e desbloqueia a sessão
+
+        Com `slot`, a senha abre a chave guardada no cabeçalho do cofre (e `salt`
+        é o do slot); sem, a chave é derivada direto da senha, como nos cofres antigos.
+        """
+        if self.matches(password, salt):
+            self._last_used = time.monotonic()
+            return self.key
+
+        self.lock()
+        if slot is not None:
+            key = slot.open(password)
+        else:
+            key = CryptoManager().generate_key_from_password(password, salt)
+
+        self.adopt(password, salt, key)
+        return key
+
+    def adopt(self, password: str, salt: bytes, key: bytes):
+        """Passa a usar uma chave já conhecida (ex: protegida por um novo salt)"""
+        self.lock()
+        self.salt = salt
+        self._key = bytearray(key)
+        self._fingerprint = self._password_fingerprint(password, salt)
+        self._last_used = time.monotonic()
+
+    def matches(self, password: str, salt: Optional[bytes] = None) -> bool:
+        """Verifica se a sessão está desbloqueada para esta senha (e salt)"""
+        if not self.is_unlocked():
+            return False
+        if salt is not None and salt != self.salt:
+            return False
+        candidate = self._password_fingerprint(password, self.salt)
+        return hmac.compare_digest(candidate, self._fingerprint)
+
+    def is_unlocked(self) -> bool:
+        """Retorna se há chave em memória e ela não expirou"""
+        if self._key is None:
+            return False
+        if self.timeout is not None and time.monotonic() - self._last_used > self.timeout:
+            self.lock()
+            return False
+        return True
+
+    @property
+    def key(self) -> bytes:
+        """Chave derivada (renova o prazo de expiração)"""
+        if not self.is_unlocked():
+            raise ValueError("Sessão bloqueada")
+        self._last_used = time.monotonic()
+        return bytes(self._key)
+
+    def lock(self):
+        """Bloqueia a sessão e zera a chave em memória"""
+        # Cópias imutáveis (bytes) entregues ao Fernet não podem ser zeradas;
+        # zeramos o buffer que a sessão controla.
+        if self._key is not None:
+            for i in range(len(self._key)):
+                self._key[i] = 0
+        self._key = None
+        self._fingerprint = None
+        self.salt = None
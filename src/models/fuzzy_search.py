@@ -0,0 +1,219 @@
+from operator import itemgetter
+from typing import Optional
+from src.models.search_index import SearchIndex, tokenize
+
+# Pesos por campo (título > usuário > URL), na ordem do texto indexado
+FIELD_WEIGHTS = (30, 20, 10)
+
+# Acima disto os resultados exatos só são agrupados (prefixo do título primeiro),
+# sem pontuação individual; a cada tecla o conjunto encolhe e volta a ser ranqueado
+RANK_LIMIT = 2000
+# Busca tolerante a erros só quando a busca exata acha poucas entradas
+FUZZY_THRESHOLD = 100
+
+def typo_budget(token: str) -> int:
+    """Quantidade de erros tolerados numa palavra da consulta (números: nenhum)"""
+    if len(token) < 4 or token.isdigit():
+        return 0
+    if len(token) < 8:
+        return 1
+    return 2
+
+def approximate_distance(pattern: str, text: str) -> int:
+    """Menor distância de edição entre `pattern` e qualquer trecho de `text`
+
+    Conta inserção, remoção, troca e transposição de letras vizinhas ("socail").
+    Algoritmo bit-paralelo de Myers/Hyyrö: um passo de operações inteiras por caractere.
+    """
+    m = len(pattern)
+    if m == 0:
+        return 0
+
+    peq: dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp, vn = mask, 0
+    d0 = prev_eq = 0
+    score = best = m
+    for char in text:
+        eq = peq.get(char, 0)
+        transposed = (((~d0) & eq) << 1) & prev_eq
+        x = eq | vn
+        d0 = ((((x & vp) + vp) ^ vp) | x | transposed) & mask
+        hn = vp & d0
+        hp = (vn | ~(vp | d0)) & mask
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+            if score < best:
+                best = score
+                if best == 0:
+                    break
+        x = (hp << 1) & mask
+        vn = x & d0
+        vp = ((hn << 1) | ~(x | d0)) & mask
+        prev_eq = eq
+    return best
+
+def score_text(query: str, text: str) -> Optional[int]:
+    """Pontua um casamento exato (maior = melhor); None se não casar"""
+    best = None
+    for field, weight in zip(text.split("\n"), FIELD_WEIGHTS):
+        pos = field.find(query)
+        if pos < 0:
+            continue
+        if pos == 0:
+            score = 1000  # Prefixo do campo
+        elif not field[pos - 1].isalnum():
+            score = 800   # Início de palavra
+        else:
+            score = 600
+        # Trecho casado mais próximo do campo inteiro ranqueia antes
+        score += weight - min(len(field) - len(query), 100)
+        if best is None or score > best:
+            best = score
+    return best
+
+class FuzzySearch:
+    """Busca ranqueada: casamentos exatos primeiro, depois os com erros de digitação"""
+    def __init__(self, index: SearchIndex):
+        self.index = index
+        # Última consulta: permite refinar só sobre o resultado anterior
+        self._last_query = None
+        self._last_budgets = ()
+        self._last_version = None
+        self._last_complete = False
+        self._last_ids: list[str] = []
+
+    def search(self, query: str) -> Optional[list[str]]:
+        """Ids ranqueados (melhor primeiro); None para consulta vazia"""
+        query = query.lower()
+        if not query:
+            self._last_complete = False
+            return None
+
+        tokens = tokenize(query)
+        budgets = tuple(typo_budget(token) for token in tokens)
+
+        # Consulta que estende a anterior (mesma tolerância, índice inalterado)
+        # só pode casar com entradas que já casavam antes; com resultados demais,
+        # conferir um a um sai mais caro que consultar o índice de novo
+        narrow = (self._last_complete and len(self._last_ids) <= RANK_LIMIT and
+                  query.startswith(self._last_query) and
+                  budgets[:len(self._last_budgets)] == self._last_budgets and
+                  self.index.version == self._last_version)
+
+        if narrow:
+            text_of = self.index.text_of
+            exact = [entry_id for entry_id in self._last_ids if query in text_of(entry_id)]
+        else:
+            exact = self.index.search(query)
+
+        fuzzy = []
+        complete = True
+        if any(budgets):
+            if len(exact) < FUZZY_THRESHOLD:
+                fuzzy = self._fuzzy(tokens, budgets, set(exact), self._last_ids if narrow else None)
+            else:
+                complete = False  # Resultado sem as aproximadas: não serve para refinar
+
+        # Conjuntos muito grandes ficam na ordem do índice até a consulta estreitar
+        ids = exact if len(exact) > RANK_LIMIT else self._rank(query, exact)
+        ids += fuzzy
+
+        self._last_query = query
+        self._last_budgets = budgets
+        self._last_version = self.index.version
+        self._last_complete = complete
+        self._last_ids = ids
+        return ids
+
+    def _rank(self, query: str, exact: list[str]) -> list[str]:
+        """Pontua cada casamento exato e ordena pela qualidade"""
+        text_of = self.index.text_of
+        scored = []
+        for entry_id in exact:
+            text = text_of(entry_id)
+            scored.append((-score_text(query, text), text, entry_id))
+
+        # Melhor pontuação primeiro; empates em ordem alfabética
+        scored.sort()
+        return [entry_id for _, _, entry_id in scored]
+
+    def _matching_words(self, token: str, budget: int) -> list[tuple[str, int]]:
+        """Palavras do vocabulário próximas de `token` e suas distâncias"""
+        words = []
+        shortest = len(token) - budget
+        for word in self.index.vocabulary():
+            if len(word) >= shortest:
+                distance = approximate_distance(token, word)
+                if distance <= budget:
+                    words.append((word, distance))
+        return words
+
+    def _fuzzy(self, tokens, budgets, exclude: set, restrict) -> list[str]:
+        """Entradas em que cada palavra da consulta aparece, com até `budget` erros"""
+        fuzzy_tokens = [(token, budget) for token, budget in zip(tokens, budgets) if budget]
+        exact_tokens = [token for token, budget in zip(tokens, budgets) if not budget]
+
+        if restrict is not None:
+            # Refinamento: candidatos são o resultado anterior, conferidos por completo
+            text_of = self.index.text_of
+            candidates = [(0, entry_id, text) for entry_id in restrict
+                          if (text := text_of(entry_id)) is not None]
+            pending = fuzzy_tokens
+        else:
+            # Partir da palavra da consulta que casa com menos entradas
+            frequency = self.index.word_frequency
+            options = []
+            for i, (token, budget) in enumerate(fuzzy_tokens):
+                words = self._matching_words(token, budget)
+                options.append((sum(frequency(word) for word, _ in words), i, words))
+            _, seed, words = min(options)
+
+            # Maior distância primeiro: a palavra mais próxima da mesma entrada sobrescreve
+            found: dict[str, tuple[int, str]] = {}
+            for word, distance in sorted(words, key=itemgetter(1), reverse=True):
+                found.update((entry_id, (distance, text)) for entry_id, text in self.index.entries_with_word(word))
+            candidates = [(distance, entry_id, text) for entry_id, (distance, text) in found.items()]
+            pending = fuzzy_tokens[:seed] + fuzzy_tokens[seed + 1:]
+
+        # Filtros em lote sobre a lista inteira (milhares de candidatos por tecla)
+        if exclude:
+            candidates = [item for item in candidates if item[1] not in exclude]
+        # Números e palavras curtas: conferidos exatamente no texto
+        for token in exact_tokens:
+            candidates = [item for item in candidates if token in item[2]]
+
+        scored = candidates
+        if pending:
+            scored = []
+            for distance, entry_id, text in candidates:
+                for token, budget in pending:
+                    # Presente sem erros (o caso comum) dispensa o cálculo da distância
+                    found_distance = 0 if token in text else approximate_distance(token, text)
+                    if found_distance > budget:
+                        break
+                    distance += found_distance
+                else:
+                    scored.append((distance, entry_id, text))
+
+        if len(scored) > RANK_LIMIT:
+            # Muitos candidatos: só por número de erros, sem desempatar pelo texto
+            scored.sort(key=itemgetter(0))
+        else:
+            # Menos erros primeiro; empates em ordem alfabética
+            scored.sort(key=itemgetter(0, 2))
+        return [entry_id for _, entry_id, _ in scored]
+
+    def score(self, entry_id: str, query: str) -> Optional[int]:
+        """Pontuação do casamento exato de uma entrada (None se não casar)"""
+        text = self.index.text_of(entry_id)
+        query = query.lower()
+        if text is None or not query:
+            return None
+        return score_text(query, text)
@@ -1,37 +1,147 @@
-from dataclasses import dataclass
-from typing import Optional
+from collections.abc import Sequence
+from typing import Callable, Iterable, Iterator, Optional, Union
 import json
-from datetime import datetime
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+def now_timestamp() -> int:
+    """Microssegundos desde 1970 em UTC (comparáveis entre processos, máquinas e fusos)"""
+    return time.time_ns() // 1000
+
+def parse_timestamp(value: Union[str, int]) -> int:
+    """Converte data ISO (sem fuso = horário local, formato antigo) para microssegundos UTC; inteiros passam direto"""
+    if isinstance(value, int):
+        return value
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.astimezone()  # Interpreta no fuso local
+    return (moment - _EPOCH) // _MICROSECOND
+
+def format_timestamp(value: int) -> str:
+    """Data ISO no horário local, sem fuso (igual ao isoformat() de antes)"""
+    return (_EPOCH + timedelta(microseconds=value)).astimezone().replace(tzinfo=None).isoformat()
+
+def intern_value(value: Optional[str]) -> Optional[str]:
+    """Valores que se repetem entre entradas (usuários, URLs) compartilham um só objeto"""
+    return sys.intern(value) if type(value) is str else value
 
-@dataclass
 class PasswordEntry:
-    """Modelo para uma entrada de senha"""
-    id: str
-    title: str
-    username: str
-    password: str
-    url: Optional[str] = None
-    notes: Optional[str] = None
-    created_at: str = None
-    updated_at: str = None
-    
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now().isoformat()
-        if self.updated_at is None:
-            self.updated_at = self.created_at
+    """Modelo para uma entrada de senha
+    
+    Compacto: sem __dict__ (__slots__), datas em inteiros e usuário/URL internados.
+    `created_at`/`updated_at` continuam lidos e atribuídos como datas ISO.
+    """
+    __slots__ = ('id', 'title', '_username', 'password', '_url', 'notes',
+                 'created_ts', 'updated_ts', 'sealed_secret')
+    
+    def __init__(self, id: str, title: str, username: str, password: str,
+                 url: Optional[str] = None, notes: Optional[str] = None,
+                 created_at: Union[str, int, None] = None, updated_at: Union[str, int, None] = None,
+                 sealed_secret: Optional[bytes] = None):
+        self.id = id
+        self.title = title
+        self._username = intern_value(username)
+        self.password = password
+        self._url = intern_value(url)
+        self.notes = notes
+        # Microssegundos desde 1970, UTC
+        self.created_ts = now_timestamp() if created_at is None else parse_timestamp(created_at)
+        self.updated_ts = self.created_ts if updated_at is None else parse_timestamp(updated_at)
+        # Senha/notas ainda criptografadas (descriptografadas só quando pedidas)
+        self.sealed_secret = sealed_secret
+    
+    @classmethod
+    def restore(cls, id: str, title: str, username: str, url: Optional[str],
+                created_ts: int, updated_ts: int, sealed_secret: bytes) -> 'PasswordEntry':
+        """Recria uma entrada salva com os segredos fechados (usuário/URL já internados)"""
+        entry = cls.__new__(cls)
+        entry.id = id
+        entry.title = title
+        entry._username = username
+        entry.password = None
+        entry._url = url
+        entry.notes = None
+        entry.created_ts = created_ts
+        entry.updated_ts = updated_ts
+        entry.sealed_secret = sealed_secret
+        return entry
+    
+    @property
+    def username(self) -> str:
+        return self._username
+    
+    @username.setter
+    def username(self, value: str):
+        self._username = intern_value(value)
+    
+    @property
+    def url(self) -> Optional[str]:
+        return self._url
+    
+    @url.setter
+    def url(self, value: Optional[str]):
+        self._url = intern_value(value)
+    
+    @property
+    def created_at(self) -> str:
+        return format_timestamp(self.created_ts)
+    
+    @created_at.setter
+    def created_at(self, value: Union[str, int]):
+        self.created_ts = parse_timestamp(value)
+    
+    @property
+    def updated_at(self) -> str:
+        return format_timestamp(self.updated_ts)
+    
+    @updated_at.setter
+    def updated_at(self, value: Union[str, int]):
+        self.updated_ts = parse_timestamp(value)
+    
+    def _key(self) -> tuple:
+        return (self.id, self.title, self._username, self.password, self._url, self.notes,
+                self.created_ts, self.updated_ts)
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+    
+    __hash__ = None  # Mutável, como a dataclass de antes
+    
+    def __repr__(self):
+        return (f"PasswordEntry(id={self.id!r}, title={self.title!r}, username={self._username!r}, "
+                f"password={self.password!r}, url={self._url!r}, notes={self.notes!r}, "
+                f"created_at={self.created_at!r}, updated_at={self.updated_at!r})")
+    
+    @property
+    def is_sealed(self) -> bool:
+        """Indica se senha e notas ainda não foram descriptografadas"""
+        return self.sealed_secret is not None
+    
+    def unseal(self, password: str, notes: Optional[str]):
+        """Preenche os segredos descriptografados"""
+        self.password = password
+        self.notes = notes
+        self.sealed_secret = None
     
     def to_dict(self) -> dict:
         """Converte para dicionário"""
+        if self.sealed_secret is not None:
+            raise ValueError("Segredos da entrada não foram carregados")
         return {
             'id': self.id,
             'title': self.title,
-            'username': self.username,
+            'username': self._username,
             'password': self.password,
-            'url': self.url,
+            'url': self._url,
             'notes': self.notes,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at
+            'created_at': format_timestamp(self.created_ts),
+            'updated_at': format_timestamp(self.updated_ts)
         }
     
     @classmethod
@@ -41,22 +151,169 @@ class PasswordEntry:
     
     def update_timestamp(self):
         """Atualiza timestamp de modificação"""
-        self.updated_at = datetime.now().isoformat()
+        self.updated_ts = now_timestamp()
+
+# Eventos enviados aos observadores do PasswordDatabase: listener(evento, entrada)
+ENTRY_ABOUT_TO_BE_ADDED = "about_to_be_added"
+ENTRY_ADDED = "added"
+ENTRY_UPDATED = "updated"
+ENTRY_ABOUT_TO_BE_REMOVED = "about_to_be_removed"
+ENTRY_REMOVED = "removed"
+DATABASE_ABOUT_TO_BE_RESET = "about_to_be_reset"  # Entrada é None nos eventos de reset
+DATABASE_RESET = "reset"
+
+class EntryList(Sequence):
+    """Visão de lista sobre as entradas do database (compatível com o antigo `entries`)"""
+    def __init__(self, database: 'PasswordDatabase'):
+        self._database = database
+    
+    def __len__(self):
+        return len(self._database)
+    
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return list(self._database)[row]
+        if row < 0:
+            row += len(self._database)
+        return self._database.entry_at(row)
+    
+    def __iter__(self):
+        return iter(self._database)
+    
+    def __eq__(self, other):
+        return list(self) == list(other)
+    
+    def append(self, entry: PasswordEntry):
+        self._database.add(entry)
+    
+    def remove(self, entry: PasswordEntry):
+        if self._database.remove(entry.id) is None:
+            raise ValueError("Entrada não encontrada")
 
 class PasswordDatabase:
-    """Container para todas as senhas"""
-    def __init__(self):
-        self.entries: list[PasswordEntry] = []
+    """Container para todas as senhas, indexado por id (mantém a ordem de inclusão)"""
+    def __init__(self, entries: Iterable[PasswordEntry] = ()):
+        self._entries: dict[str, PasswordEntry] = {}
+        self._order: list[str] = []      # linha -> id
+        self._rows: dict[str, int] = {}  # id -> linha
+        self._order_dirty = False        # Remoções só invalidam; reconstruído quando consultado
+        self._listeners = []
+        for entry in entries:
+            self._entries[entry.id] = entry
+        self._order_dirty = bool(self._entries)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __iter__(self) -> Iterator[PasswordEntry]:
+        return iter(self._entries.values())
+    
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._entries
+    
+    @property
+    def entries(self) -> EntryList:
+        """Entradas como sequência (prefira get/add/update/remove)"""
+        return EntryList(self)
+    
+    @entries.setter
+    def entries(self, entries: Iterable[PasswordEntry]):
+        self.replace(entries)
+    
+    def subscribe(self, listener: Callable[[str, Optional[PasswordEntry]], None]):
+        """Registra observador de alterações (chamado na ordem de inscrição)"""
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        """Remove observador"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, event: str, entry: Optional[PasswordEntry]):
+        for listener in list(self._listeners):
+            listener(event, entry)
+    
+    def get(self, entry_id: str) -> Optional[PasswordEntry]:
+        """Retorna entrada pelo id (None se não existir)"""
+        return self._entries.get(entry_id)
+    
+    def add(self, entry: PasswordEntry):
+        """Inclui entrada no fim"""
+        if entry.id in self._entries:
+            raise ValueError(f"Entrada já existe: {entry.id}")
+        self._notify(ENTRY_ABOUT_TO_BE_ADDED, entry)
+        self._entries[entry.id] = entry
+        if not self._order_dirty:
+            self._rows[entry.id] = len(self._order)
+            self._order.append(entry.id)
+        self._notify(ENTRY_ADDED, entry)
+    
+    def update(self, entry: PasswordEntry):
+        """Substitui/avisa edição de uma entrada existente (mantém a posição)"""
+        if entry.id not in self._entries:
+            raise ValueError(f"Entrada não encontrada: {entry.id}")
+        self._entries[entry.id] = entry
+        self._notify(ENTRY_UPDATED, entry)
+    
+    def put(self, entry: PasswordEntry):
+        """Inclui ou atualiza, conforme o id já exista"""
+        if entry.id in self._entries:
+            self.update(entry)
+        else:
+            self.add(entry)
+    
+    def remove(self, entry_id: str) -> Optional[PasswordEntry]:
+        """Remove entrada pelo id; retorna a entrada removida (None se não existir)"""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return None
+        self._notify(ENTRY_ABOUT_TO_BE_REMOVED, entry)
+        del self._entries[entry_id]
+        self._order_dirty = True
+        self._notify(ENTRY_REMOVED, entry)
+        return entry
+    
+    def replace(self, entries: Iterable[PasswordEntry]):
+        """Troca todas as entradas de uma vez"""
+        self._notify(DATABASE_ABOUT_TO_BE_RESET, None)
+        self._entries = {entry.id: entry for entry in entries}
+        self._order_dirty = True
+        self._notify(DATABASE_RESET, None)
+    
+    def extend(self, entries: Iterable[PasswordEntry]):
+        """Inclui várias entradas no fim, com um só aviso (reset) aos observadores"""
+        entries = list(entries)
+        for entry in entries:
+            if entry.id in self._entries:
+                raise ValueError(f"Entrada já existe: {entry.id}")
+        self._notify(DATABASE_ABOUT_TO_BE_RESET, None)
+        self._entries.update((entry.id, entry) for entry in entries)
+        self._order_dirty = True
+        self._notify(DATABASE_RESET, None)
+    
+    def _ensure_order(self):
+        if self._order_dirty:
+            self._order = list(self._entries)
+            self._rows = {entry_id: row for row, entry_id in enumerate(self._order)}
+            self._order_dirty = False
+    
+    def entry_at(self, row: int) -> PasswordEntry:
+        """Retorna entrada pela posição (ordem de inclusão)"""
+        self._ensure_order()
+        return self._entries[self._order[row]]
+    
+    def row_of(self, entry_id: str) -> int:
+        """Retorna posição da entrada (-1 se não existir)"""
+        self._ensure_order()
+        return self._rows.get(entry_id, -1)
     
     def to_json(self) -> str:
         """Serializa para JSON"""
-        data = [entry.to_dict() for entry in self.entries]
+        data = [entry.to_dict() for entry in self]
         return json.dumps(data, indent=2)
     
     @classmethod
     def from_json(cls, json_str: str) -> 'PasswordDatabase':
         """Deserializa do JSON"""
-        db = cls()
         data = json.loads(json_str)
-        db.entries = [PasswordEntry.from_dict(entry_data) for entry_data in data]
-        return db
+        return cls(PasswordEntry.from_dict(entry_data) for entry_data in data)
@@ -0,0 +1,193 @@
+import re
+from array import array
+from typing import Iterable, Optional, Union
+from src.models.password_model import (PasswordEntry, PasswordDatabase, ENTRY_ADDED,
+                                       ENTRY_UPDATED, ENTRY_REMOVED, DATABASE_RESET)
+
+_TOKEN = re.compile(r'[^\W\d_]+|\d+')
+SHORT_QUERY_LIMIT = 256  # Consultas de 1-2 caracteres com lista guardada
+
+def _trigrams(text: str) -> set[str]:
+    """Trigramas distintos de um texto"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def tokenize(text: str) -> list[str]:
+    """Palavras do texto: sequências de letras ou de dígitos"""
+    return _TOKEN.findall(text)
+
+def searchable_text(entry: PasswordEntry) -> str:
+    """Título, usuário e URL em minúsculas (separados para não casar entre campos)"""
+    return "\n".join([entry.title.lower(), entry.username.lower(), (entry.url or "").lower()])
+
+class SearchIndex:
+    """Índice invertido de trigramas sobre título, usuário e URL"""
+    def __init__(self, entries: Iterable[PasswordEntry] = ()):
+        self._postings: dict[str, array] = {}  # trigrama -> documentos (ordem crescente)
+        self._short: dict[str, array] = {}     # consulta de 1-2 caracteres -> documentos (no primeiro uso)
+        self._words: dict[str, Union[int, array]] = {}  # palavra -> documento ou documentos (busca aproximada)
+        self._vocabulary: list[str] = []        # palavras sem números, na ordem em que surgiram
+        self._texts: list[Optional[str]] = []   # documento -> texto (None = removido)
+        self._doc_ids: list[Optional[str]] = []  # documento -> id da entrada
+        self._docs: dict[str, int] = {}          # id da entrada -> documento
+        self._removed = 0
+        self.version = 0  # Incrementado a cada alteração (invalida caches de quem consulta)
+
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, entry: PasswordEntry):
+        """Indexa uma entrada nova (ou reindexa se já existir)"""
+        if entry.id in self._docs:
+            self.remove(entry.id)
+
+        self._index_text(entry.id, searchable_text(entry))
+        self.version += 1
+
+    def _index_text(self, entry_id: str, text: str):
+        """Cria documento e acrescenta às listas de cada trigrama"""
+        doc = len(self._texts)
+        self._texts.append(text)
+        self._doc_ids.append(entry_id)
+        self._docs[entry_id] = doc
+
+        postings = self._postings
+        for gram in _trigrams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(doc)
+        for query, posting in self._short.items():
+            if query in text:
+                posting.append(doc)
+
+        words = self._words
+        for word in set(tokenize(text)):
+            posting = words.get(word)
+            if posting is None:
+                # A maioria das palavras é de uma entrada só: o número dispensa um array (objeto a mais para o GC)
+                words[word] = doc
+                if not word.isdigit():
+                    self._vocabulary.append(word)
+            elif type(posting) is int:
+                words[word] = array('I', (posting, doc))
+            else:
+                posting.append(doc)
+
+    def watch(self, database: PasswordDatabase):
+        """Mantém o índice em dia com as alterações do database"""
+        database.subscribe(lambda event, entry: self._on_database_changed(database, event, entry))
+
+    def _on_database_changed(self, database: PasswordDatabase, event: str, entry: Optional[PasswordEntry]):
+        if event == ENTRY_ADDED or event == ENTRY_UPDATED:
+            self.add(entry)
+        elif event == ENTRY_REMOVED:
+            self.remove(entry.id)
+        elif event == DATABASE_RESET:
+            for entry_id in list(self._docs):
+                self.remove(entry_id)
+            for entry in database:
+                self.add(entry)
+
+    def update(self, entry: PasswordEntry):
+        """Reindexa uma entrada editada"""
+        self.add(entry)
+
+    def remove(self, entry_id: str):
+        """Remove uma entrada do índice"""
+        doc = self._docs.pop(entry_id, None)
+        if doc is None:
+            return
+
+        # Documento vira lápide; as listas são reconstruídas quando acumulam muitas
+        self._texts[doc] = None
+        self._doc_ids[doc] = None
+        self._removed += 1
+        self.version += 1
+        if self._removed > 1024 and self._removed > len(self._docs):
+            self._rebuild()
+
+    def _rebuild(self):
+        """Reconstrói as listas descartando documentos removidos"""
+        live = [(entry_id, self._texts[doc]) for entry_id, doc in self._docs.items()]
+        self._postings = {}
+        self._short = {}
+        self._words = {}
+        self._vocabulary = []
+        self._texts = []
+        self._doc_ids = []
+        self._docs = {}
+        self._removed = 0
+
+        for entry_id, text in live:
+            self._index_text(entry_id, text)
+
+    def search(self, query: str) -> Optional[list[str]]:
+        """Ids das entradas que contêm `query`, na ordem do índice (None = consulta vazia)"""
+        query = query.lower()
+        if not query:
+            return None
+
+        texts = self._texts
+        doc_ids = self._doc_ids
+        if len(query) < 3:
+            return [doc_ids[doc] for doc in self._short_posting(query) if texts[doc] is not None]
+
+        postings = []
+        for gram in _trigrams(query):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        # Interseção (em C) das duas menores listas; as demais não compensam, já
+        # que trigramas em comum não garantem a substring e ela é conferida no texto
+        postings.sort(key=len)
+        candidates = postings[0]
+        if len(postings) > 1:
+            candidates = sorted(set(candidates).intersection(postings[1]))
+        return [doc_ids[doc] for doc in candidates
+                if texts[doc] is not None and query in texts[doc]]
+
+    def _short_posting(self, query: str) -> array:
+        """Documentos com a consulta curta: uma varredura no primeiro uso, depois mantida pelo _index_text"""
+        posting = self._short.get(query)
+        if posting is None:
+            if len(self._short) >= SHORT_QUERY_LIMIT:
+                del self._short[next(iter(self._short))]  # A mais antiga
+            posting = self._short[query] = array('I', [doc for doc, text in enumerate(self._texts)
+                                                       if text is not None and query in text])
+        return posting
+
+    def vocabulary(self) -> list[str]:
+        """Palavras distintas indexadas, sem números (pode incluir palavras só de entradas removidas)"""
+        return self._vocabulary
+
+    def entries_with_word(self, word: str) -> list[tuple[str, str]]:
+        """Ids e textos das entradas que contêm a palavra inteira"""
+        texts = self._texts
+        doc_ids = self._doc_ids
+        return [(doc_ids[doc], texts[doc]) for doc in self._word_docs(word) if texts[doc] is not None]
+
+    def word_frequency(self, word: str) -> int:
+        """Quantidade de documentos com a palavra (conta os removidos ainda não descartados)"""
+        return len(self._word_docs(word))
+
+    def _word_docs(self, word: str):
+        """Documentos com a palavra"""
+        posting = self._words.get(word, ())
+        return (posting,) if type(posting) is int else posting
+
+    def text_of(self, entry_id: str) -> Optional[str]:
+        """Texto indexado de uma entrada (campos separados por quebra de linha)"""
+        doc = self._docs.get(entry_id)
+        return None if doc is None else self._texts[doc]
+
+    def entry_matches(self, entry_id: str, query: str) -> bool:
+        """Verifica se uma entrada indexada contém `query`"""
+        doc = self._docs.get(entry_id)
+        if doc is None:
+            return False
+        return query.lower() in self._texts[doc]
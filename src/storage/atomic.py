@@ -0,0 +1,110 @@
+import os
+import threading
+from typing import Iterable
+
+# Níveis de durabilidade
+DURABILITY_FULL = "full"    # fsync a cada escrita
+DURABILITY_BATCH = "batch"  # fsync de anexos/diretórios a cada `batch_size` escritas ou em flush()
+DURABILITY_NONE = "none"    # sem fsync (cache do sistema operacional)
+DURABILITY_LEVELS = (DURABILITY_FULL, DURABILITY_BATCH, DURABILITY_NONE)
+
+def _write_all(f, data: bytes):
+    """Escreve todos os bytes no arquivo"""
+    f.write(data)
+
+def fsync_dir(path: str):
+    """Sincroniza o diretório para que renomeações/remoções sejam duráveis"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return  # Windows não permite abrir diretórios
+    fd = os.open(path or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class AtomicWriter:
+    """Escritas seguras contra quedas: arquivo temporário, fsync e rename atômico"""
+    def __init__(self, durability: str = DURABILITY_FULL, batch_size: int = 64):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Durabilidade inválida: {durability}")
+        self.durability = durability
+        self.batch_size = batch_size
+        self._pending_files: set[str] = set()
+        self._pending_dirs: set[str] = set()
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+
+    def write(self, path: str, data: bytes):
+        """Substitui o conteúdo de `path` atomicamente"""
+        self.write_chunks(path, (data,))
+
+    def write_chunks(self, path: str, chunks: Iterable[bytes]):
+        """Como write, mas gravando os blocos à medida que são gerados"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                _write_all(f, chunk)
+            f.flush()
+            # Os dados precisam estar no disco antes do rename, senão uma queda
+            # pode deixar o arquivo vazio; só o modo "none" abre mão disso.
+            if self.durability != DURABILITY_NONE:
+                os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+        self._sync_dir(path)
+
+    def append(self, path: str, data: bytes):
+        """Acrescenta bytes ao final de `path`"""
+        with open(path, 'ab') as f:
+            _write_all(f, data)
+            f.flush()
+            if self.durability == DURABILITY_FULL:
+                os.fsync(f.fileno())
+
+        if self.durability == DURABILITY_BATCH:
+            self._defer(path, None)
+
+    def remove(self, path: str):
+        """Remove `path` de forma durável"""
+        if os.path.exists(path):
+            os.remove(path)
+            self._sync_dir(path)
+
+    def _sync_dir(self, path: str):
+        """Sincroniza (ou agenda) o diretório após rename/remoção"""
+        directory = os.path.dirname(os.path.abspath(path))
+        if self.durability == DURABILITY_FULL:
+            fsync_dir(directory)
+        elif self.durability == DURABILITY_BATCH:
+            self._defer(None, directory)
+
+    def _defer(self, path, directory):
+        """Registra sincronização pendente (modo em lote)"""
+        with self._lock:
+            if path:
+                self._pending_files.add(path)
+            if directory:
+                self._pending_dirs.add(directory)
+            self._pending_writes += 1
+            due = self._pending_writes >= self.batch_size
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Sincroniza escritas pendentes do modo em lote"""
+        with self._lock:
+            files, self._pending_files = self._pending_files, set()
+            dirs, self._pending_dirs = self._pending_dirs, set()
+            self._pending_writes = 0
+
+        for path in files:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # Removido desde a escrita
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for directory in dirs:
+            fsync_dir(directory)
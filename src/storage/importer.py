@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import os
+import uuid
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+from urllib.parse import urlsplit
+from src.crypto.crypto_manager import CryptoManager
+from src.models.password_model import PasswordEntry
+from src.storage.vault_format import seal_secrets
+
+# Importação de exportações de navegadores e gerenciadores (CSV, JSON e o
+# PasswordDatabase.to_json deste app), lidas em fluxo: só um lote de linhas em
+# texto claro por vez; cada lote já sai com os segredos criptografados.
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 1000
+
+# Nomes de coluna/chave aceitos para cada campo (minúsculos, espaços e hífens como "_")
+FIELD_ALIASES = {
+    'title': ('title', 'name', 'account', 'site', 'label'),
+    'username': ('username', 'login_username', 'login_name', 'login', 'user', 'user_name', 'email'),
+    'password': ('password', 'login_password', 'pass'),
+    'url': ('url', 'login_uri', 'uri', 'website', 'web_site', 'origin_url', 'hostname'),
+    'notes': ('notes', 'note', 'extra', 'comments', 'comment'),
+    'created_at': ('created_at',),  # Só o formato deste app: datas ISO
+    'updated_at': ('updated_at',),
+}
+# Chaves de JSON com a lista de itens (ex: Bitwarden: {"items": [...]})
+ITEM_KEYS = ('items', 'entries', 'passwords', 'logins')
+
+class ImportResult(NamedTuple):
+    imported: int
+    duplicates: int  # Mesma URL e usuário de uma entrada existente ou já importada
+    skipped: int     # Sem senha (notas seguras, cartões...) ou linha inválida
+
+class _JsonStream:
+    """Lê valores JSON em sequência de um texto em blocos (sem carregar o arquivo todo)"""
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Traz mais um bloco, descartando o que já foi consumido"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere que não é espaço ('' no fim)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON inválido: esperado '{char}'")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica o próximo valor completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Número no fim do bloco pode continuar no próximo
+            if end < len(self.buffer) or self.eof or not self._fill():
+                self.pos = end
+                return value
+
+    def array(self) -> Iterator:
+        """Elementos de um array, um por vez"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError("JSON inválido: esperado ',' ou ']'")
+
+def read_csv_rows(f) -> Iterator[dict]:
+    """Linhas de um CSV com cabeçalho (Chrome, Firefox, Bitwarden, LastPass, KeePass...)"""
+    yield from csv.DictReader(f)
+
+def read_json_rows(f, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Itens de um JSON: array no topo (PasswordDatabase.to_json) ou em "items" e similares"""
+    stream = _JsonStream(f, chunk_size)
+    first = stream.peek()
+    if first == '[':
+        yield from stream.array()
+        return
+    stream.expect('{')
+    while True:
+        char = stream.peek()
+        if char == '}':
+            return
+        if char == ',':
+            stream.pos += 1
+            continue
+        key = stream.value()
+        stream.expect(':')
+        if key in ITEM_KEYS and stream.peek() == '[':
+            yield from stream.array()
+        else:
+            stream.value()  # Pastas, metadados da exportação...
+
+class _Prefixed:
+    """Devolve o caractere já lido para detectar o formato antes do resto do texto"""
+    def __init__(self, prefix: str, f):
+        self.prefix = prefix
+        self.f = f
+
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ""
+        if size < 0:
+            return prefix + self.f.read()
+        return prefix + self.f.read(size - len(prefix)) if size > len(prefix) else prefix
+
+    def __iter__(self):
+        if self.prefix:
+            line, self.prefix = self.prefix + self.f.readline(), ""
+            yield line
+        yield from self.f
+
+def read_rows(path: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[dict]:
+    """Linhas do arquivo de exportação, em fluxo; `progress(bytes lidos, total)`"""
+    total = os.path.getsize(path)
+    with open(path, 'rb') as raw:
+        # Posição do arquivo binário: bytes já entregues ao decodificador de texto
+        text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        first = text.read(1)
+        while first.isspace():
+            first = text.read(1)
+        text = _Prefixed(first, text)
+        rows = read_json_rows(text) if first in ('[', '{') else read_csv_rows(text)
+        for count, row in enumerate(rows, 1):
+            if progress is not None and not count % BATCH_SIZE:
+                progress(raw.tell(), total)
+            yield row
+        if progress is not None:
+            progress(total, total)
+
+def _normalize_key(key) -> str:
+    return str(key).strip().lower().replace(' ', '_').replace('-', '_')
+
+@lru_cache(maxsize=64)
+def _columns(keys: tuple) -> dict[str, object]:
+    """Campo -> chave da linha, resolvido uma vez por cabeçalho"""
+    normalized = {_normalize_key(key): key for key in keys}
+    columns = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized[alias]
+                break
+    return columns
+
+def _flatten(row: dict) -> dict:
+    """Itens aninhados (Bitwarden: login.username, login.uris[0].uri) viram uma linha plana"""
+    login = row.get('login')
+    if not isinstance(login, dict):
+        return row
+    flat = {key: value for key, value in row.items() if key != 'login'}
+    for key, value in login.items():
+        if key == 'uris':
+            if value and isinstance(value[0], dict):
+                flat.setdefault('url', value[0].get('uri'))
+        else:
+            flat.setdefault(key, value)
+    return flat
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def entry_fields(row: dict) -> Optional[dict]:
+    """Campos de PasswordEntry de uma linha exportada (None se não houver senha)"""
+    if not isinstance(row, dict):
+        return None
+    row = _flatten(row)
+    columns = _columns(tuple(row))
+    fields = {field: _text(row.get(key)) for field, key in columns.items()}
+    if not fields.get('password'):
+        return None
+
+    url = fields.get('url')
+    username = fields.get('username') or ""
+    if not fields.get('title'):
+        fields['title'] = urlsplit(url).hostname or url if url else username or "Sem título"
+    fields['username'] = username
+    return fields
+
+def dedupe_key(title: str, username: str, url: Optional[str]) -> tuple:
+    """Identidade de uma conta: URL e usuário (título no lugar da URL, se não houver)"""
+    site = url.strip().lower().rstrip('/') if url else "title:" + title.casefold()
+    return site, (username or "").casefold()
+
+def existing_keys(entries: Iterable[PasswordEntry]) -> set:
+    """Chaves de dedupe_key das entradas já no cofre (não abre os segredos)"""
+    return {dedupe_key(entry.title, entry.username, entry.url) for entry in entries}
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def import_entries(rows: Iterable[dict], crypto: CryptoManager, existing: set,
+                   batch_size: int = BATCH_SIZE) -> tuple[list[PasswordEntry], ImportResult]:
+    """Entradas novas das linhas, com segredos já criptografados
+
+    `existing` (chaves de dedupe_key das entradas atuais) é atualizado com as
+    importadas. Cada lote é selado com uma só chamada em lote ao CryptoManager.
+    """
+    imported = []
+    duplicates = skipped = 0
+    for batch in _batches(rows, batch_size):
+        fresh = []
+        for row in batch:
+            fields = entry_fields(row)
+            if fields is None:
+                skipped += 1
+                continue
+            key = dedupe_key(fields['title'], fields['username'], fields.get('url'))
+            if key in existing:
+                duplicates += 1
+                continue
+            try:
+                entry = PasswordEntry(id=str(uuid.uuid4()), **fields)
+            except ValueError:  # Data em formato desconhecido
+                skipped += 1
+                continue
+            existing.add(key)
+            fresh.append(entry)
+
+        for entry, sealed_secret in zip(fresh, seal_secrets(fresh, crypto)):
+            imported.append(PasswordEntry.restore(entry.id, entry.title, entry.username, entry.url,
+                                                  entry.created_ts, entry.updated_ts, sealed_secret))
+    return imported, ImportResult(len(imported), duplicates, skipped)
@@ -0,0 +1,63 @@
+import os
+from typing import Optional
+from src.storage.atomic import AtomicWriter
+
+class Journal:
+    """Diário append-only: uma linha por registro criptografado"""
+    def __init__(self, path: str, writer: Optional[AtomicWriter] = None):
+        self.path = path
+        self.writer = writer or AtomicWriter()
+        self.record_count = 0
+
+    def append(self, record: bytes):
+        """Acrescenta um registro ao final do diário"""
+        self.writer.append(self.path, record + b"\n")
+        self.record_count += 1
+
+    def read_records(self, end: Optional[int] = None, start: int = 0) -> list[bytes]:
+        """Lê os registros (de `start` até o byte `end`, se informados)"""
+        if not os.path.exists(self.path):
+            if not start:
+                self.record_count = 0
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start)
+
+        if end is None and data and not data.endswith(b"\n"):
+            # Registro final incompleto (queda durante a escrita): descartar
+            cut = data.rfind(b"\n") + 1
+            print("Aviso: registro final do diário incompleto descartado")
+            with open(self.path, 'r+b') as f:
+                f.truncate(start + cut)
+            data = data[:cut]
+
+        records = [line for line in data.split(b"\n") if line]
+        if end is None and not start:
+            self.record_count = len(records)
+        return records
+
+    def size(self) -> int:
+        """Tamanho atual do diário em bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def truncate_before(self, offset: int):
+        """Descarta registros anteriores a `offset` (já incorporados ao snapshot)"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+
+        self.writer.write(self.path, tail)
+        self.record_count = tail.count(b"\n")
+
+    def clear(self):
+        """Remove o diário"""
+        self.writer.remove(self.path)
+        self.record_count = 0
@@ -0,0 +1,55 @@
+from typing import Iterable, Mapping, Optional
+from src.models.password_model import PasswordDatabase, PasswordEntry
+
+# Mescla por entrada entre a versão em memória ("nossa") e a do disco ("deles"),
+# a partir da última versão sincronizada ("base": id -> updated_ts). Só o lado
+# que alterou uma entrada desde a base a modifica; se os dois alteraram, vence a
+# edição mais recente. Remoção sem edição do outro lado vence.
+
+def merge_entry(mine: Optional[PasswordEntry], theirs: Optional[PasswordEntry],
+                base_ts: Optional[int]) -> Optional[PasswordEntry]:
+    """Versão que fica de uma entrada (None = removida)"""
+    if theirs is None:
+        if mine is not None and mine.updated_ts == base_ts:
+            return None  # Removida lá, sem edição aqui
+        return mine
+    if mine is None:
+        if theirs.updated_ts == base_ts:
+            return None  # Removida aqui, sem edição lá
+        return theirs
+    if theirs.updated_ts in (mine.updated_ts, base_ts):
+        return mine  # Nada novo lá
+    if mine.updated_ts != base_ts and mine.updated_ts > theirs.updated_ts:
+        return mine  # Editada nos dois lados: a edição mais recente vence
+    return theirs
+
+def merge_into(database: PasswordDatabase, theirs: Mapping[str, Optional[PasswordEntry]],
+               base: Mapping[str, int]) -> bool:
+    """Aplica em `database` as alterações de `theirs` (id -> entrada ou None se removida)
+
+    Retorna se algo mudou. Usa put/remove, então observadores (lista, índice)
+    recebem só as entradas afetadas.
+    """
+    changed = False
+    for entry_id, entry in theirs.items():
+        mine = database.get(entry_id)
+        winner = merge_entry(mine, entry, base.get(entry_id))
+        if winner is mine:
+            continue
+        if winner is None:
+            database.remove(entry_id)
+        else:
+            database.put(winner)
+        changed = True
+    return changed
+
+def snapshot_changes(known: Iterable[str], snapshot: Iterable[PasswordEntry]) -> dict:
+    """Estado do disco para merge_into: todas as entradas do snapshot e None para os ids de `known` ausentes"""
+    theirs = {entry.id: entry for entry in snapshot}
+    for entry_id in known:
+        theirs.setdefault(entry_id, None)
+    return theirs
+
+def base_of(database: Iterable[PasswordEntry]) -> dict[str, int]:
+    """Versão sincronizada (id -> updated_ts) para as próximas mesclas"""
+    return {entry.id: entry.updated_ts for entry in database}
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import KeySlot
+from src.storage.atomic import AtomicWriter, DURABILITY_NONE, fsync_dir
+from src.storage.vault_format import (CHUNK_HEADER_SIZE, MappedVault, encode_prefix, open_chunk,
+                                      read_key_slot, read_prefix, reseal_block, scan_chunks, seal_chunk)
+
+# Blocos em andamento por thread (limita a memória do pipeline)
+WINDOW_PER_WORKER = 2
+
+def source_fingerprint(path: str) -> str:
+    """Identifica o snapshot de origem (o prefixo muda a cada save: salt e chave novos)"""
+    with open(path, 'rb') as f:
+        prefix = read_prefix(f.read(64 * 1024))
+        size = f.seek(0, os.SEEK_END)
+    return hashlib.sha256(prefix + size.to_bytes(8, 'little')).hexdigest()
+
+class ShadowRekey:
+    """Recriptografa o cofre num arquivo sombra, bloco a bloco, e o troca pelo original
+
+    Cada bloco do snapshot vira um bloco do arquivo sombra (mesmas entradas,
+    mesma posição). Se o processo for interrompido, os blocos já gravados e
+    autênticos são mantidos e a próxima execução continua de onde parou.
+    """
+    def __init__(self, db_file: str, writer: AtomicWriter, workers: int = 0):
+        self.db_file = db_file
+        self.shadow_file = db_file + ".rekey"
+        self.state_file = db_file + ".rekey.json"
+        self.writer = writer
+        self.workers = workers or os.cpu_count() or 1
+
+    def pending(self) -> bool:
+        """Se há uma troca de chave interrompida"""
+        return os.path.exists(self.shadow_file)
+
+    def resume_point(self, new_password: str) -> Optional[tuple[KeySlot, bytes]]:
+        """KeySlot e chave nova de uma troca interrompida sobre este mesmo snapshot (None = recomeçar)"""
+        if not self.pending() or not os.path.exists(self.state_file):
+            return None
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            if state.get('source') != source_fingerprint(self.db_file):
+                return None  # O cofre foi salvo depois da interrupção
+            with open(self.shadow_file, 'rb') as f:
+                key_slot = read_key_slot(f)
+            return key_slot, key_slot.open(new_password)
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def run(self, old_crypto: CryptoManager, new_crypto: CryptoManager, key_slot: KeySlot,
+            progress: Callable[[int, int], None] = lambda done, total: None):
+        """Recriptografa os blocos restantes e substitui o cofre atomicamente"""
+        with open(self.db_file, 'rb') as f:
+            source = MappedVault(f, old_crypto)
+        try:
+            prefix = encode_prefix(source.count, key_slot, source.generation + 1)
+            start = self._prepare_shadow(prefix, new_crypto)
+            total = len(source)
+            progress(start, total)
+
+            # Mesma chave (só a senha mudou): os segredos ficam como estão
+            reseal = old_crypto.key != new_crypto.key
+
+            def rekey(number: int) -> bytes:
+                block = source.decrypt_chunk(number)
+                if reseal:
+                    block = reseal_block(block, old_crypto, new_crypto)
+                return seal_chunk(block, number, source.is_last(number), prefix, new_crypto)
+
+            durable = self.writer.durability != DURABILITY_NONE
+            with open(self.shadow_file, 'ab') as shadow, ThreadPoolExecutor(self.workers) as pool:
+                # Blocos processados em paralelo, gravados na ordem
+                window = deque()
+                numbers = iter(range(start, total))
+                for number in numbers:
+                    window.append(pool.submit(rekey, number))
+                    if len(window) >= self.workers * WINDOW_PER_WORKER:
+                        break
+                done = start
+                while window:
+                    shadow.write(window.popleft().result())
+                    shadow.flush()
+                    if durable:
+                        os.fsync(shadow.fileno())  # Bloco gravado = ponto de retomada
+                    done += 1
+                    progress(done, total)
+                    number = next(numbers, None)
+                    if number is not None:
+                        window.append(pool.submit(rekey, number))
+        finally:
+            source.close()
+
+        os.replace(self.shadow_file, self.db_file)
+        if self.writer.durability != DURABILITY_NONE:
+            fsync_dir(os.path.dirname(os.path.abspath(self.db_file)))
+        self.writer.remove(self.state_file)
+
+    def _prepare_shadow(self, prefix: bytes, new_crypto: CryptoManager) -> int:
+        """Blocos já prontos no arquivo sombra; cria o arquivo se for recomeçar"""
+        if self.pending():
+            done = self._completed_chunks(prefix, new_crypto)
+            if done is not None:
+                count, end = done
+                with open(self.shadow_file, 'r+b') as f:
+                    f.truncate(end)
+                return count
+
+        self.writer.write(self.state_file, json.dumps({'source': source_fingerprint(self.db_file)}).encode())
+        self.writer.write(self.shadow_file, prefix)
+        return 0
+
+    def _completed_chunks(self, prefix: bytes, new_crypto: CryptoManager) -> Optional[tuple[int, int]]:
+        """Blocos autênticos no arquivo sombra e onde terminam (None = outro prefixo)"""
+        if os.path.getsize(self.shadow_file) < len(prefix):
+            return None
+        # Mapeado: só os cabeçalhos dos blocos e o último deles saem do disco
+        with open(self.shadow_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            if view[:len(prefix)] != prefix:
+                return None
+            chunks, end = scan_chunks(view, len(prefix))
+            # Só o último bloco gravado pode ter ficado corrompido numa queda
+            if chunks:
+                try:
+                    open_chunk(view, chunks[-1], len(chunks) - 1, prefix, new_crypto)
+                except Exception:
+                    end = chunks.pop()[0] - CHUNK_HEADER_SIZE
+        return len(chunks), end
+
+    def discard(self):
+        """Descarta uma troca interrompida"""
+        self.writer.remove(self.shadow_file)
+        self.writer.remove(self.state_file)
@@ -0,0 +1,387 @@
+import base64
+import hmac
+import json
+import os
+import struct
+import uuid
+import zlib
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import KeySlot
+from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.storage.atomic import AtomicWriter
+from src.storage.file_lock import FileLock
+from src.storage.vault_format import open_secrets, parse_secret
+
+# Snapshots de backup (em <data_dir>/backups):
+#
+#   packs/<id>.pack       PW2K | versão (u8), depois objetos: endereço (32) | tipo (u8) | tamanho (u32) | dados
+#   snapshots/<id>.json   manifesto: data, rótulo, KeySlot, endereços dos grupos e MAC
+#
+# O endereço de um objeto é o HMAC do seu conteúdo em texto claro (subchave da
+# chave do cofre): uma entrada igual tem o mesmo endereço em todos os snapshots e
+# é gravada uma única vez. Cada snapshot acrescenta no máximo um pack, só com os
+# objetos que ainda não existiam.
+#
+# Objeto de entrada: AES-GCM (endereço como dado associado) dos metadados em JSON,
+# "\n" e o registro de segredos. Objeto de grupo: endereços, em ordem, das
+# entradas cujo id cai no grupo; fica sem criptografia (só HMACs) para que a
+# limpeza de objetos não precise da senha. Uma entrada alterada muda só o seu
+# grupo: o snapshot seguinte grava a entrada, o grupo e o manifesto.
+
+PACK_MAGIC = b"PW2K"
+PACK_VERSION = 1
+MANIFEST_VERSION = 1
+ADDRESS_SIZE = 32
+OBJECT_ENTRY = 1
+OBJECT_GROUP = 2
+GROUP_ENTRIES = 256   # Entradas por grupo, em média (grupos em potência de 2)
+BATCH_ENTRIES = 1024  # Segredos em texto claro por vez
+_PACK_HEADER = PACK_MAGIC + bytes([PACK_VERSION])
+_OBJECT = struct.Struct('<32sBI')
+_ENTRY_DOMAIN = b"picoword-two snapshot entry\n"
+_GROUP_DOMAIN = b"picoword-two snapshot group\n"
+_MANIFEST_DOMAIN = b"picoword-two snapshot manifest\n"
+_METADATA_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+class SnapshotInfo(NamedTuple):
+    id: str
+    created_at: str  # Data ISO, horário local
+    label: Optional[str]
+    count: int       # Quantidade de entradas
+
+def _group_count(count: int) -> int:
+    """Quantidade de grupos para `count` entradas (potência de 2)"""
+    groups = 1
+    while groups * GROUP_ENTRIES < count:
+        groups *= 2
+    return groups
+
+def _group_of(entry_id: str, groups: int) -> int:
+    return zlib.crc32(entry_id.encode()) % groups
+
+def _entry_plaintext(entry: PasswordEntry, secret) -> bytes:
+    """Conteúdo de um objeto de entrada (determinístico: mesma entrada, mesmos bytes)"""
+    metadata = [entry.id, entry.title, entry.username, entry.url, entry.created_ts, entry.updated_ts]
+    return _METADATA_ENCODER.encode(metadata).encode('utf-8') + b"\n" + secret
+
+def _parse_entry(plaintext: bytes) -> PasswordEntry:
+    metadata, _, secret = plaintext.partition(b"\n")
+    entry_id, title, username, url, created_ts, updated_ts = json.loads(metadata)
+    secret = parse_secret(secret)
+    return PasswordEntry(id=entry_id, title=title, username=username, password=secret['password'],
+                         url=url, notes=secret['notes'], created_at=created_ts, updated_at=updated_ts)
+
+def _split_addresses(data: bytes) -> list[bytes]:
+    return [bytes(data[i:i + ADDRESS_SIZE]) for i in range(0, len(data), ADDRESS_SIZE)]
+
+def _manifest_mac(manifest: dict, crypto: CryptoManager) -> str:
+    body = {key: value for key, value in manifest.items() if key != 'mac'}
+    return crypto.keyed_hash(_MANIFEST_DOMAIN + json.dumps(body, sort_keys=True).encode()).hex()
+
+def _retained(infos: list[SnapshotInfo], keep_last: int, keep_daily: int,
+              keep_weekly: int, keep_monthly: int) -> set[str]:
+    """Ids mantidos pela política: os `keep_last` mais recentes e o mais recente de cada
+    um dos últimos `keep_daily` dias, `keep_weekly` semanas e `keep_monthly` meses"""
+    newest_first = sorted(infos, key=lambda info: info.created_at, reverse=True)
+    kept = {info.id for info in newest_first[:keep_last]}
+    periods = (
+        (keep_daily, lambda moment: moment.date()),
+        (keep_weekly, lambda moment: moment.isocalendar()[:2]),
+        (keep_monthly, lambda moment: (moment.year, moment.month)),
+    )
+    for limit, period_of in periods:
+        seen = set()
+        for info in newest_first:
+            if len(seen) >= limit:
+                break
+            period = period_of(datetime.fromisoformat(info.created_at))
+            if period not in seen:
+                seen.add(period)
+                kept.add(info.id)
+    return kept
+
+class SnapshotStore:
+    """Snapshots do cofre em objetos endereçados pelo conteúdo (só o que mudou é gravado)"""
+    def __init__(self, root: str, writer: AtomicWriter):
+        self.root = root
+        self.packs_dir = os.path.join(root, "packs")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        self.writer = writer
+        self.lock_path = os.path.join(root, "backups.lock")
+        self._lock: Optional[FileLock] = None
+        # endereço -> (pack, posição dos dados, tamanho, tipo); lido dos packs sob demanda
+        self._index: dict[bytes, tuple[str, int, int, int]] = {}
+        self._indexed: set[str] = set()
+
+    def _locked(self) -> FileLock:
+        """Lock entre processos dos backups (criar, podar e ler não se misturam)"""
+        if self._lock is None:
+            os.makedirs(self.packs_dir, exist_ok=True)
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            self._lock = FileLock(self.lock_path, timeout=60.0)
+        return self._lock
+
+    def _pack_names(self) -> set[str]:
+        try:
+            return {name for name in os.listdir(self.packs_dir) if name.endswith(".pack")}
+        except FileNotFoundError:
+            return set()
+
+    def _scan_pack(self, name: str) -> Iterator[tuple[bytes, int, int, int]]:
+        """Objetos de um pack: endereço, posição dos dados, tamanho e tipo (sem ler os dados)"""
+        with open(os.path.join(self.packs_dir, name), 'rb') as f:
+            if f.read(len(_PACK_HEADER)) != _PACK_HEADER:
+                raise ValueError(f"Pack inválido: {name}")
+            offset = len(_PACK_HEADER)
+            while header := f.read(_OBJECT.size):
+                if len(header) < _OBJECT.size:
+                    raise ValueError(f"Pack truncado: {name}")
+                address, kind, size = _OBJECT.unpack(header)
+                offset += _OBJECT.size
+                yield address, offset, size, kind
+                offset += size
+                f.seek(offset)
+
+    def _refresh_index(self):
+        """Acrescenta ao índice os packs novos (de outros processos também)"""
+        names = self._pack_names()
+        if self._indexed - names:
+            # Pack removido por uma limpeza: reconstruir
+            self._index = {}
+            self._indexed = set()
+        for name in sorted(names - self._indexed):
+            for address, offset, size, kind in self._scan_pack(name):
+                self._index.setdefault(address, (name, offset, size, kind))
+            self._indexed.add(name)
+
+    def _read_objects(self, addresses: list[bytes]) -> list[bytes]:
+        """Dados dos objetos (na ordem pedida), lendo cada pack em sequência"""
+        order = sorted(range(len(addresses)), key=lambda i: self._index[addresses[i]][:2])
+        data = [b""] * len(addresses)
+        f = None
+        current = None
+        try:
+            for i in order:
+                name, offset, size, _ = self._index[addresses[i]]
+                if name != current:
+                    if f is not None:
+                        f.close()
+                    f = open(os.path.join(self.packs_dir, name), 'rb')
+                    current = name
+                f.seek(offset)
+                data[i] = f.read(size)
+        finally:
+            if f is not None:
+                f.close()
+        return data
+
+    def _locate(self, addresses: Iterable[bytes]):
+        missing = [address for address in addresses if address not in self._index]
+        if missing:
+            raise ValueError(f"Backup incompleto: {len(missing)} objetos ausentes")
+
+    def snapshots(self) -> list[SnapshotInfo]:
+        """Snapshots existentes, do mais antigo ao mais recente"""
+        try:
+            names = sorted(name for name in os.listdir(self.snapshots_dir) if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        infos = []
+        for name in names:
+            manifest = self._read_manifest(name[:-len(".json")])
+            infos.append(SnapshotInfo(name[:-len(".json")], manifest['created_at'],
+                                      manifest['label'], manifest['count']))
+        return infos
+
+    def _read_manifest(self, snapshot_id: str) -> dict:
+        if os.path.basename(snapshot_id) != snapshot_id:
+            raise ValueError(f"Snapshot inválido: {snapshot_id}")
+        with open(os.path.join(self.snapshots_dir, snapshot_id + ".json"), 'rb') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Versão de snapshot não suportada: {manifest.get('version')}")
+        return manifest
+
+    def key_slot(self, snapshot_id: str) -> KeySlot:
+        """KeySlot da época do snapshot (abre com a senha mestre de então)"""
+        return KeySlot.from_bytes(base64.b64decode(self._read_manifest(snapshot_id)['key_slot']))
+
+    def verify(self, snapshot_id: str, crypto: CryptoManager) -> bool:
+        """Se o manifesto está íntegro e foi gravado com a chave de `crypto`"""
+        manifest = self._read_manifest(snapshot_id)
+        return hmac.compare_digest(manifest['mac'], _manifest_mac(manifest, crypto))
+
+    def create(self, database: PasswordDatabase, crypto: CryptoManager, key_slot: KeySlot,
+               label: Optional[str] = None) -> str:
+        """Grava um snapshot do database (segredos fechados com a chave de `crypto`)"""
+        with self._locked():
+            self._refresh_index()
+            groups = [[] for _ in range(_group_count(len(database)))]
+            pack = f"{uuid.uuid4().hex}.pack"
+            added = {}  # Objetos deste pack: endereço -> localização
+            group_addresses = []
+            records = self._new_objects(database, crypto, groups, group_addresses, pack, added)
+
+            # Nada novo (nenhuma entrada mudou): só o manifesto
+            first = next(records, None)
+            if first is not None:
+                self.writer.write_chunks(os.path.join(self.packs_dir, pack), self._chain(first, records))
+                self._index.update(added)
+                self._indexed.add(pack)
+
+            created = datetime.now()
+            snapshot_id = created.strftime("%Y%m%d-%H%M%S-%f")
+            manifest = {
+                'version': MANIFEST_VERSION,
+                'created_at': created.isoformat(),
+                'label': label,
+                'count': len(database),
+                'key_slot': base64.b64encode(key_slot.to_bytes()).decode('ascii'),
+                'groups': base64.b64encode(b"".join(group_addresses)).decode('ascii'),
+            }
+            manifest['mac'] = _manifest_mac(manifest, crypto)
+            self.writer.write(os.path.join(self.snapshots_dir, snapshot_id + ".json"),
+                              json.dumps(manifest, indent=1).encode('utf-8'))
+            return snapshot_id
+
+    @staticmethod
+    def _chain(first: bytes, records: Iterator[bytes]) -> Iterator[bytes]:
+        yield _PACK_HEADER
+        yield first
+        yield from records
+
+    def _new_objects(self, database: PasswordDatabase, crypto: CryptoManager, groups: list[list[bytes]],
+                     group_addresses: list[bytes], pack: str, added: dict) -> Iterator[bytes]:
+        """Registros do pack novo: entradas e grupos que ainda não estão em nenhum pack
+
+        Preenche `group_addresses` (na ordem dos grupos) e `added` com a localização
+        de cada objeto gravado.
+        """
+        offset = len(_PACK_HEADER)
+
+        def record(address: bytes, kind: int, data: bytes) -> bytes:
+            nonlocal offset
+            added[address] = (pack, offset + _OBJECT.size, len(data), kind)
+            offset += _OBJECT.size + len(data)
+            return _OBJECT.pack(address, kind, len(data)) + data
+
+        entries = iter(database)
+        while batch := list(islice(entries, BATCH_ENTRIES)):
+            fresh = []
+            for entry, secret in zip(batch, open_secrets(batch, crypto)):
+                plaintext = _entry_plaintext(entry, secret)
+                address = crypto.keyed_hash(_ENTRY_DOMAIN + plaintext)
+                groups[_group_of(entry.id, len(groups))].append(address)
+                if address not in self._index and address not in added:
+                    added[address] = None  # Reservado: mesma entrada duas vezes no lote
+                    fresh.append((address, plaintext))
+            if fresh:
+                sealed = crypto.encrypt_many([plaintext for _, plaintext in fresh],
+                                             [address for address, _ in fresh])
+                for (address, _), data in zip(fresh, sealed):
+                    yield record(address, OBJECT_ENTRY, data)
+
+        for members in groups:
+            data = b"".join(sorted(members))
+            address = crypto.keyed_hash(_GROUP_DOMAIN + data)
+            group_addresses.append(address)
+            if address not in self._index and address not in added:
+                yield record(address, OBJECT_GROUP, data)
+
+    def read(self, snapshot_id: str, crypto: CryptoManager) -> Iterator[list[PasswordEntry]]:
+        """Entradas do snapshot em lotes, com segredos abertos (ValueError se algo não confere)"""
+        with self._locked():
+            manifest = self._read_manifest(snapshot_id)
+            if not hmac.compare_digest(manifest['mac'], _manifest_mac(manifest, crypto)):
+                raise ValueError("Snapshot corrompido ou de outra chave do cofre")
+            self._refresh_index()
+
+            group_addresses = _split_addresses(base64.b64decode(manifest['groups']))
+            self._locate(group_addresses)
+            addresses = []
+            for address, data in zip(group_addresses, self._read_objects(group_addresses)):
+                if not hmac.compare_digest(crypto.keyed_hash(_GROUP_DOMAIN + data), address):
+                    raise ValueError("Grupo de backup corrompido")
+                addresses.extend(_split_addresses(data))
+            self._locate(addresses)
+            if len(addresses) != manifest['count']:
+                raise ValueError("Backup incompleto")
+
+            for start in range(0, len(addresses), BATCH_ENTRIES):
+                batch = addresses[start:start + BATCH_ENTRIES]
+                from cryptography.exceptions import InvalidTag
+                try:
+                    plaintexts = crypto.decrypt_many(self._read_objects(batch), batch)
+                except InvalidTag:
+                    raise ValueError("Entrada de backup corrompida")
+                entries = []
+                for address, plaintext in zip(batch, plaintexts):
+                    if not hmac.compare_digest(crypto.keyed_hash(_ENTRY_DOMAIN + plaintext), address):
+                        raise ValueError("Entrada de backup corrompida")
+                    entries.append(_parse_entry(plaintext))
+                yield entries
+
+    def prune(self, keep_last: int, keep_daily: int, keep_weekly: int, keep_monthly: int) -> list[str]:
+        """Remove os snapshots fora da política e os objetos que só eles usavam"""
+        with self._locked():
+            infos = self.snapshots()
+            kept = _retained(infos, keep_last, keep_daily, keep_weekly, keep_monthly)
+            removed = [info.id for info in infos if info.id not in kept]
+            for snapshot_id in removed:
+                self.writer.remove(os.path.join(self.snapshots_dir, snapshot_id + ".json"))
+            if removed:
+                self._collect_garbage()
+            return removed
+
+    def _collect_garbage(self):
+        """Reescreve os packs com objetos sem uso, copiando só os vivos (sem descriptografar)"""
+        self._refresh_index()
+        live = set()
+        for info in self.snapshots():
+            group_addresses = _split_addresses(base64.b64decode(self._read_manifest(info.id)['groups']))
+            live.update(group_addresses)
+            present = [address for address in group_addresses if address in self._index]
+            for data in self._read_objects(present):
+                live.update(_split_addresses(data))
+
+        # Packs em que tudo continua em uso ficam como estão
+        keep, rewrite = [], []
+        for name in sorted(self._indexed):
+            objects = list(self._scan_pack(name))
+            if all(address in live for address, _, _, _ in objects):
+                keep.append(name)
+            else:
+                rewrite.append((name, objects))
+        if not rewrite:
+            return
+
+        # Objetos vivos dos packs reescritos (uma cópia de cada) vão para um pack novo
+        copied = {address for address, location in self._index.items() if location[0] in keep}
+        copy = []
+        for name, objects in rewrite:
+            moved = []
+            for address, offset, size, kind in objects:
+                if address in live and address not in copied:
+                    copied.add(address)
+                    moved.append((address, offset, size, kind))
+            if moved:
+                copy.append((name, moved))
+
+        def records() -> Iterator[bytes]:
+            yield _PACK_HEADER
+            for name, moved in copy:
+                with open(os.path.join(self.packs_dir, name), 'rb') as f:
+                    for address, offset, size, kind in moved:
+                        f.seek(offset)
+                        yield _OBJECT.pack(address, kind, size) + f.read(size)
+
+        if copy:
+            # Pack novo gravado antes de remover os antigos: uma queda não perde objetos
+            self.writer.write_chunks(os.path.join(self.packs_dir, f"{uuid.uuid4().hex}.pack"), records())
+        for name, _ in rewrite:
+            self.writer.remove(os.path.join(self.packs_dir, name))
+        self._index = {}
+        self._indexed = set()
@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
+from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import KeySlot
+from src.models.password_model import PasswordDatabase, PasswordEntry, intern_value
+from src.storage.atomic import DURABILITY_BATCH, DURABILITY_FULL, DURABILITY_NONE
+from src.storage.vault_format import SEALED_AEAD, seal_secrets
+
+# Cofre em SQLite: uma linha por entrada, gravada e lida individualmente.
+#
+#   meta: versão do esquema e KeySlot (KDF, salt e chave do cofre protegida)
+#   entries: posição (ordem de inclusão) | HMAC do id | HMAC do usuário | HMAC da URL |
+#            metadados (AES-GCM: id, título, usuário, URL e datas) | segredos
+#
+# Nenhum valor aparece em claro: as colunas indexadas guardam HMACs com uma
+# subchave da chave do cofre (busca por igualdade sem revelar o valor) e os
+# segredos usam o mesmo registro do arquivo do cofre (vinculado ao id da entrada).
+SCHEMA_VERSION = 1
+INDEXED_FIELDS = ('username', 'url')
+BATCH_ROWS = 1024  # Linhas descriptografadas/recriptografadas por lote
+
+_SYNCHRONOUS = {DURABILITY_FULL: "FULL", DURABILITY_BATCH: "NORMAL", DURABILITY_NONE: "OFF"}
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    position INTEGER PRIMARY KEY,
+    id_hash BLOB NOT NULL UNIQUE,
+    username_hash BLOB,
+    url_hash BLOB,
+    metadata BLOB NOT NULL,
+    secret BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_username ON entries (username_hash);
+CREATE INDEX IF NOT EXISTS entries_url ON entries (url_hash);
+"""
+_UPSERT = """
+INSERT INTO entries (id_hash, username_hash, url_hash, metadata, secret) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id_hash) DO UPDATE SET username_hash = excluded.username_hash,
+    url_hash = excluded.url_hash, metadata = excluded.metadata, secret = excluded.secret
+"""
+
+def field_hash(crypto: CryptoManager, field: str, value: Optional[str]) -> Optional[bytes]:
+    """HMAC de um campo (usuário e URL sem diferenciar maiúsculas)"""
+    if value is None:
+        return None
+    if field != 'id':
+        value = value.casefold()
+    return crypto.keyed_hash(f"{field}\0{value}".encode('utf-8'))
+
+def _metadata_plaintext(entry: PasswordEntry) -> bytes:
+    return json.dumps([entry.id, entry.title, entry.username, entry.url, entry.created_ts, entry.updated_ts],
+                      ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class SqliteVault:
+    """Cofre num arquivo SQLite (modo WAL), com uma linha criptografada por entrada
+
+    Incluir, editar ou remover uma entrada grava só a sua linha, numa transação;
+    desbloquear lê só o KeySlot. Todas as operações passam por uma única conexão,
+    protegida por um lock (usada também pela thread de gravação).
+    """
+    def __init__(self, path: str, durability: str = DURABILITY_FULL):
+        self.path = path
+        self.durability = durability
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._depth = 0  # Transações aninhadas viram parte da mais externa
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={_SYNCHRONOUS[self.durability]}")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def set_durability(self, durability: str):
+        """Nível de durabilidade dos commits (full = fsync a cada transação)"""
+        self.durability = durability
+        if self._connection is not None:
+            with self._lock:
+                self._connection.execute(f"PRAGMA synchronous={_SYNCHRONOUS[durability]}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Agrupa operações numa transação (tudo ou nada)"""
+        with self._lock:
+            connection = self._connect()
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield connection
+                finally:
+                    self._depth -= 1
+                return
+
+            connection.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    def data_version(self) -> int:
+        """Muda quando outra conexão (de outro processo) grava no cofre"""
+        with self._lock:
+            return self._connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def read_key_slot(self) -> Optional[KeySlot]:
+        """KeySlot do cofre, lido antes de desbloquear"""
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE name = 'key_slot'").fetchone()
+        return KeySlot.from_bytes(row[0]) if row else None
+
+    def write_key_slot(self, key_slot: KeySlot):
+        with self.transaction() as connection:
+            connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('key_slot', ?)",
+                               (key_slot.to_bytes(),))
+            connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('schema', ?)",
+                               (SCHEMA_VERSION,))
+
+    def _rows(self, entries: list[PasswordEntry], crypto: CryptoManager) -> list[tuple]:
+        """Linhas prontas para gravar (criptografadas em lote)"""
+        id_hashes = [field_hash(crypto, 'id', entry.id) for entry in entries]
+        metadata = crypto.encrypt_many([_metadata_plaintext(entry) for entry in entries], id_hashes)
+        secrets = seal_secrets(entries, crypto)
+        return [
+            (id_hash, field_hash(crypto, 'username', entry.username), field_hash(crypto, 'url', entry.url),
+             sealed_metadata, secret)
+            for entry, id_hash, sealed_metadata, secret in zip(entries, id_hashes, metadata, secrets)
+        ]
+
+    def _entries(self, rows: list[tuple], crypto: CryptoManager) -> list[PasswordEntry]:
+        """Entradas (segredos ainda fechados) a partir de linhas (HMAC do id, metadados, segredos)"""
+        opened = crypto.decrypt_many([row[1] for row in rows], [row[0] for row in rows])
+        metadata = json.loads(b"[" + b",".join(opened) + b"]")  # Um parse para o lote
+        entries = []
+        for values, row in zip(metadata, rows):
+            entry_id, title, username, url, created_ts, updated_ts = values
+            entries.append(PasswordEntry.restore(entry_id, title, intern_value(username), intern_value(url),
+                                                 created_ts, updated_ts, row[2]))
+        return entries
+
+    def load(self, crypto: CryptoManager,
+             progress: Callable[[int, int], None] = lambda done, total: None) -> PasswordDatabase:
+        """Todas as entradas, na ordem de inclusão (só os metadados são descriptografados)"""
+        with self._lock:
+            connection = self._connect()
+            total = connection.execute("SELECT count(*) FROM entries").fetchone()[0]
+            cursor = connection.execute("SELECT id_hash, metadata, secret FROM entries ORDER BY position")
+            entries = []
+            while rows := cursor.fetchmany(BATCH_ROWS):
+                entries += self._entries(rows, crypto)
+                progress(len(entries), total)
+        return PasswordDatabase(entries)
+
+    def get(self, entry_id: str, crypto: CryptoManager) -> Optional[PasswordEntry]:
+        """Uma entrada pelo id (None se não existir)"""
+        with self._lock:
+            row = self._connect().execute("SELECT id_hash, metadata, secret FROM entries WHERE id_hash = ?",
+                                          (field_hash(crypto, 'id', entry_id),)).fetchone()
+        return self._entries([row], crypto)[0] if row else None
+
+    def find(self, field: str, value: str, crypto: CryptoManager) -> list[PasswordEntry]:
+        """Entradas com usuário/URL igual a `value` (pelo índice, sem ler o cofre todo)"""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Campo sem índice: {field}")
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id_hash, metadata, secret FROM entries WHERE {field}_hash = ? ORDER BY position",
+                (field_hash(crypto, field, value),)).fetchall()
+        return self._entries(rows, crypto)
+
+    def put(self, entries: Iterable[PasswordEntry], crypto: CryptoManager):
+        """Inclui ou atualiza entradas (uma linha cada; editadas mantêm a posição)"""
+        rows = self._rows(list(entries), crypto)
+        with self.transaction() as connection:
+            connection.executemany(_UPSERT, rows)
+
+    def delete(self, entry_ids: Iterable[str], crypto: CryptoManager):
+        """Remove entradas pelo id"""
+        with self.transaction() as connection:
+            connection.executemany("DELETE FROM entries WHERE id_hash = ?",
+                                   [(field_hash(crypto, 'id', entry_id),) for entry_id in entry_ids])
+
+    def replace_all(self, database: PasswordDatabase, crypto: CryptoManager, key_slot: KeySlot):
+        """Substitui todo o conteúdo numa transação (save completo)"""
+        entries = list(database)
+        with self.transaction() as connection:
+            self.write_key_slot(key_slot)
+            connection.execute("DELETE FROM entries")
+            for start in range(0, len(entries), BATCH_ROWS):
+                batch = self._rows(entries[start:start + BATCH_ROWS], crypto)
+                connection.executemany(_UPSERT, batch)
+
+    def rekey(self, old_crypto: CryptoManager, new_crypto: CryptoManager, key_slot: KeySlot,
+              progress: Callable[[int, int], None] = lambda done, total: None):
+        """Troca a senha mestre e, se a chave do cofre mudou, recriptografa todas as linhas
+
+        Tudo numa transação: uma interrupção desfaz a troca inteira.
+        """
+        with self.transaction() as connection:
+            self.write_key_slot(key_slot)
+            if old_crypto.key == new_crypto.key:
+                return  # Só a senha mudou: a chave protegida no KeySlot basta
+
+            rows = connection.execute(
+                "SELECT position, id_hash, metadata, secret FROM entries ORDER BY position").fetchall()
+            for start in range(0, len(rows), BATCH_ROWS):
+                batch = rows[start:start + BATCH_ROWS]
+                entries = self._entries([row[1:] for row in batch], old_crypto)
+                # Segredos sempre em AES-GCM aqui (convertidos ao gravar): recriptografar sem abrir as entradas
+                ids = [entry.id.encode() for entry in entries]
+                opened = old_crypto.decrypt_many([memoryview(entry.sealed_secret)[1:] for entry in entries], ids)
+                for entry, secret in zip(entries, new_crypto.encrypt_many(opened, ids)):
+                    entry.sealed_secret = SEALED_AEAD + secret
+                connection.executemany(
+                    "UPDATE entries SET id_hash = ?, username_hash = ?, url_hash = ?, metadata = ?, secret = ?"
+                    " WHERE position = ?",
+                    [row + (old[0],) for row, old in zip(self._rows(entries, new_crypto), batch)])
+                progress(start + len(batch), len(rows))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,84 +1,845 @@
 import os
 import json
-from typing import Optional
+import threading
+from operator import attrgetter
+from typing import Callable, Iterable, Optional
 from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import DEFAULT_UNLOCK_SECONDS, KDF_SCRYPT, KdfParams, KeySlot, calibrate, new_vault_key
+from src.crypto.session import VaultSession
 from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.storage.atomic import AtomicWriter, DURABILITY_FULL
+from src.storage.file_lock import FileLock
+from src.storage.importer import ImportResult, existing_keys, import_entries, read_rows
+from src.storage.journal import Journal
+from src.storage.merge import base_of, merge_entry, merge_into, snapshot_changes
+from src.storage.rekey import ShadowRekey
+from src.storage.snapshots import SnapshotInfo, SnapshotStore
+from src.storage.sqlite_vault import SqliteVault
+from src.storage.vault_format import encode_chunks, open_secret, open_reader, read_header, seal_secrets
+
+# Motores de armazenamento
+ENGINE_FILE = "file"      # passwords.encrypted (snapshot em blocos + diário opcional)
+ENGINE_SQLITE = "sqlite"  # passwords.sqlite (uma linha criptografada por entrada)
+ENGINES = (ENGINE_FILE, ENGINE_SQLITE)
 
 class StorageManager:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", session_timeout: Optional[float] = None,
+                 journal_mode: bool = False, compact_max_records: int = 500,
+                 compact_max_bytes: int = 1024 * 1024, durability: str = DURABILITY_FULL,
+                 kdf_algorithm: str = KDF_SCRYPT, unlock_seconds: float = DEFAULT_UNLOCK_SECONDS,
+                 kdf_params: Optional[KdfParams] = None, crypto_workers: int = 0,
+                 engine: str = ENGINE_FILE):
+        if engine not in ENGINES:
+            raise ValueError(f"Motor de armazenamento inválido: {engine}")
         self.data_dir = data_dir
-        self.db_file = os.path.join(data_dir, "passwords.encrypted")
+        self.engine = engine
+        if engine == ENGINE_SQLITE:
+            self.db_file = os.path.join(data_dir, "passwords.sqlite")
+        else:
+            self.db_file = os.path.join(data_dir, "passwords.encrypted")
         self.salt_file = os.path.join(data_dir, "salt.bin")
-        self.crypto = CryptoManager()
+        self.crypto = CryptoManager(workers=crypto_workers)  # Threads para cifrar em lote
+        self.session = VaultSession(timeout=session_timeout)
+        
+        # KDF da senha mestre: parâmetros fixos ou calibrados para `unlock_seconds`
+        # nesta máquina; cofres com KDF antigo/mais fraco são protegidos de novo no save
+        self.kdf_algorithm = kdf_algorithm
+        self.unlock_seconds = unlock_seconds
+        self.kdf_params = kdf_params
+        self.key_slot: Optional[KeySlot] = None  # None = cofre ainda não aberto
+        
+        # Escritas atômicas (temporário + fsync + rename)
+        self.writer = AtomicWriter(durability)
+        
+        # Modo diário: cada alteração vira um registro pequeno no diário
+        self.journal_mode = journal_mode
+        self.journal = Journal(os.path.join(data_dir, "passwords.journal"), self.writer)
+        self.compact_max_records = compact_max_records
+        self.compact_max_bytes = compact_max_bytes
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._snapshot_generation = 0
+        
+        # Vários processos no mesmo cofre: escritas sob lock consultivo e, antes de
+        # gravar, comparação com o estado do disco visto por último (stat, geração
+        # do snapshot, diário); se outro processo gravou, mescla por entrada
+        self.file_lock = FileLock(os.path.join(data_dir, "passwords.lock"))
+        self._synced_state: Optional[tuple] = None  # Estado do disco refletido em memória
+        self._base: dict[str, int] = {}             # id -> updated_ts nesse estado
         
         # Criar diretório se não existir
         os.makedirs(data_dir, exist_ok=True)
+        
+        # Motor SQLite: transações e modo WAL do próprio SQLite no lugar do diário
+        self.vault = SqliteVault(self.db_file, durability) if engine == ENGINE_SQLITE else None
+        
+        # Backups: snapshots em objetos endereçados pelo conteúdo (só o que mudou ocupa espaço)
+        self.snapshots = SnapshotStore(os.path.join(data_dir, "backups"), self.writer)
     
     def save_database(self, database: PasswordDatabase, master_password: str) -> bool:
         """Salva database criptografado"""
         try:
-            # Gerar/carregar salt
-            salt = self._get_or_create_salt()
-            
-            # Gerar chave da senha mestre
-            self.crypto.generate_key_from_password(master_password, salt)
-            
-            # Serializar e criptografar
-            json_data = database.to_json()
-            encrypted_data = self.crypto.encrypt_data(json_data)
+            # Reusar chave da sessão ou derivar da senha mestre
+            self._ensure_key(master_password)
+            key_slot = self._refresh_key_slot(master_password)
             
-            # Salvar arquivo
-            with open(self.db_file, 'wb') as f:
-                f.write(encrypted_data)
+            with self.file_lock:
+                merged = self._changed_on_disk()
+                if merged:
+                    # Outro processo gravou depois da última sincronização: mesclar em vez de sobrescrever
+                    disk, _ = self._read_current()
+                    database = PasswordDatabase(database)
+                    merge_into(database, snapshot_changes((entry.id for entry in database), disk), self._base)
+                    disk_slot = self._disk_key_slot()
+                    if disk_slot is not None and disk_slot != key_slot:
+                        # Senha mestre trocada por outro processo (a chave do cofre é a
+                        # mesma, já que o disco abriu com ela): não desfazer a troca
+                        key_slot = self.key_slot = disk_slot
+                
+                self._write_snapshot(database, key_slot)
+                if not merged:
+                    # Sem mescla, o disco tem exatamente o que está em memória
+                    self._mark_synced(self._disk_state(), base_of(database))
             
             return True
         except Exception as e:
             print(f"Erro ao salvar: {e}")
             return False
     
-    def load_database(self, master_password: str) -> Optional[PasswordDatabase]:
+    def _write_snapshot(self, database: PasswordDatabase, key_slot: KeySlot,
+                        crypto: Optional[CryptoManager] = None):
+        """Grava o database inteiro (chamado com o file_lock)"""
+        crypto = crypto or self.crypto
+        if self.vault is not None:
+            self.vault.replace_all(database, crypto, key_slot)
+            return
+        
+        # Serializar e criptografar bloco a bloco direto no arquivo temporário
+        # (snapshot completo torna o diário obsoleto)
+        with self._lock:
+            chunks = encode_chunks(database, crypto, key_slot=key_slot,
+                                   generation=self._disk_generation() + 1)
+            self.writer.write_chunks(self.db_file, chunks)
+            self.journal.clear()
+            self._snapshot_generation += 1
+    
+    def load_database(self, master_password: str,
+                      progress: Optional[Callable[[str], None]] = None) -> Optional[PasswordDatabase]:
         """Carrega database descriptografado"""
+        report = progress or (lambda stage: None)
         try:
-            # Verificar se arquivos existem
-            if not os.path.exists(self.db_file) or not os.path.exists(self.salt_file):
+            # Verificar se arquivo existe
+            if not os.path.exists(self.db_file):
                 return PasswordDatabase()  # Database vazio
             
-            # Carregar salt
-            salt = self._load_salt()
-            if not salt:
+            # Abrir a chave do cofre com a senha mestre (uma vez por sessão)
+            report("Derivando chave...")
+            if not self._unlock_vault(master_password):
                 return None
             
-            # Gerar chave da senha mestre
-            self.crypto.generate_key_from_password(master_password, salt)
+            report("Lendo cofre...")
+            database, state = self._read_current(report)
+            self._mark_synced(state, base_of(database))
+            return database
+        except Exception as e:
+            print(f"Erro ao carregar: {e}")
+            self.lock()
+            return None
+    
+    def _read_current(self, report: Callable[[str], None] = lambda stage: None) -> tuple[PasswordDatabase, tuple]:
+        """Database atual no disco e o estado correspondente (chave já aberta)"""
+        if self.vault is not None:
+            state = self._disk_state()  # Antes de ler: um commit no meio só causa uma nova mescla
+            database = self.vault.load(self.crypto,
+                                       lambda done, total: report(f"Descriptografando... {done} de {total}"))
+            return database, state
+        
+        # Snapshot e diário consistentes: o arquivo aberto continua sendo este
+        # snapshot mesmo que um save o substitua durante a leitura
+        with self.file_lock, self._lock:
+            f = open(self.db_file, 'rb')
+            records = self.journal.read_records()
+            state = self._disk_state()
+        
+        with f:
+            database = self._read_snapshot(f, self.crypto, report)
+        if records:
+            report("Aplicando alterações...")
+            self._replay_journal(database, records, self.crypto)
+        return database, state
+    
+    def _read_snapshot(self, f, crypto: CryptoManager,
+                       report: Callable[[str], None] = lambda stage: None) -> PasswordDatabase:
+        """Descriptografa o snapshot bloco a bloco, sem carregar o arquivo inteiro"""
+        reader = open_reader(f, crypto)
+        try:
+            database = PasswordDatabase()
+            report("Descriptografando...")
+            for batch in reader.batches():
+                for entry in batch:
+                    database.put(entry)
+                if reader.count:
+                    report(f"Descriptografando... {len(database)} de {reader.count}")
+            return database
+        finally:
+            reader.close()
+    
+    def reveal_entry(self, entry: PasswordEntry, master_password: str) -> PasswordEntry:
+        """Descriptografa senha e notas de uma entrada sob demanda"""
+        if entry.is_sealed:
+            self._ensure_key(master_password)
+            secret = open_secret(entry, self.crypto)
+            entry.unseal(secret['password'], secret['notes'])
+        return entry
+    
+    def load_entry(self, entry_id: str, master_password: str) -> Optional[PasswordEntry]:
+        """Lê uma entrada do cofre (segredos fechados; None se não existir ou falhar)"""
+        try:
+            if not os.path.exists(self.db_file):
+                return None
+            self._ensure_key(master_password)
+            if self.vault is not None:
+                return self.vault.get(entry_id, self.crypto)
+            database, _ = self._read_current()
+            return database.get(entry_id)
+        except Exception as e:
+            print(f"Erro ao carregar: {e}")
+            return None
+    
+    def find_entries(self, field: str, value: str, master_password: str) -> list[PasswordEntry]:
+        """Entradas com usuário/URL igual a `value`, sem diferenciar maiúsculas (índice no SQLite)"""
+        try:
+            if not os.path.exists(self.db_file):
+                return []
+            self._ensure_key(master_password)
+            if self.vault is not None:
+                return self.vault.find(field, value, self.crypto)
+            database, _ = self._read_current()
+            value = value.casefold()
+            return [entry for entry in database if (getattr(entry, field) or "").casefold() == value]
+        except Exception as e:
+            print(f"Erro ao carregar: {e}")
+            return []
+    
+    def prepare_import(self, path: str, master_password: str, existing: set,
+                       progress: Optional[Callable[[int, int], None]] = None) -> tuple[list[PasswordEntry], ImportResult]:
+        """Lê uma exportação CSV/JSON em fluxo e devolve as entradas novas já criptografadas
+        
+        `existing` são as chaves (URL, usuário) das entradas atuais; levanta exceção
+        se o arquivo não puder ser lido.
+        """
+        self._ensure_key(master_password)
+        return import_entries(read_rows(path, progress), self.crypto, existing)
+    
+    def import_file(self, database: PasswordDatabase, path: str, master_password: str,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Optional[ImportResult]:
+        """Importa uma exportação para o database com uma única gravação (None se falhar)"""
+        try:
+            entries, result = self.prepare_import(path, master_password, existing_keys(database), progress)
+        except Exception as e:
+            print(f"Erro ao importar: {e}")
+            return None
+        if entries:
+            database.extend(entries)
+            if not self.save_database(database, master_password):
+                return None
+        return result
+    
+    def create_snapshot(self, master_password: str, label: Optional[str] = None) -> Optional[str]:
+        """Grava um snapshot de backup do cofre como está no disco; retorna o id (None se falhar)
+        
+        Entradas iguais às de snapshots anteriores não são gravadas de novo.
+        """
+        try:
+            if not os.path.exists(self.db_file):
+                raise ValueError("Cofre não encontrado")
+            self._ensure_key(master_password)
+            key_slot = self._refresh_key_slot(master_password)
+            database, _ = self._read_current()
+            return self.snapshots.create(database, self.crypto, key_slot, label)
+        except Exception as e:
+            print(f"Erro ao criar snapshot: {e}")
+            return None
+    
+    def list_snapshots(self) -> list[SnapshotInfo]:
+        """Snapshots de backup, do mais antigo ao mais recente"""
+        try:
+            return self.snapshots.snapshots()
+        except Exception as e:
+            print(f"Erro ao listar snapshots: {e}")
+            return []
+    
+    def load_snapshot(self, snapshot_id: str, master_password: str,
+                      snapshot_password: Optional[str] = None) -> Optional[PasswordDatabase]:
+        """Database de um snapshot, com os segredos fechados na chave atual do cofre
+        
+        `snapshot_password` é a senha mestre da época do snapshot, se a chave do
+        cofre foi trocada depois dele (padrão: a senha atual).
+        """
+        try:
+            crypto = self._snapshot_crypto(snapshot_id, master_password, snapshot_password)
+            entries = []
+            for batch in self.snapshots.read(snapshot_id, crypto):
+                # Texto claro só um lote por vez
+                for entry, sealed_secret in zip(batch, seal_secrets(batch, self.crypto)):
+                    entries.append(PasswordEntry.restore(entry.id, entry.title, entry.username, entry.url,
+                                                         entry.created_ts, entry.updated_ts, sealed_secret))
+            entries.sort(key=attrgetter('created_ts', 'id'))
+            return PasswordDatabase(entries)
+        except Exception as e:
+            print(f"Erro ao carregar snapshot: {e}")
+            return None
+    
+    def _snapshot_crypto(self, snapshot_id: str, master_password: str,
+                         snapshot_password: Optional[str]) -> CryptoManager:
+        """CryptoManager que abre o snapshot (o do cofre, se a chave for a mesma)"""
+        exists = os.path.exists(self.db_file)
+        if exists:
+            self._ensure_key(master_password)
+            if self.snapshots.verify(snapshot_id, self.crypto):
+                return self.crypto
+        
+        key_slot = self.snapshots.key_slot(snapshot_id)
+        key = key_slot.open(snapshot_password or master_password)
+        if not exists:
+            # Cofre perdido: o restaurado usa a chave do snapshot, protegida pela senha atual
+            if snapshot_password is not None and snapshot_password != master_password:
+                key_slot = KeySlot.create(master_password, key, self._target_kdf_params())
+            self._adopt_key_slot(master_password, key_slot, key)
+            return self.crypto
+        crypto = CryptoManager(workers=self.crypto.workers)
+        crypto.use_key(key, key_slot.salt)
+        return crypto
+    
+    def restore_snapshot(self, snapshot_id: str, master_password: str,
+                         snapshot_password: Optional[str] = None) -> Optional[PasswordDatabase]:
+        """Substitui o cofre pelo snapshot e retorna o database restaurado (None se falhar)
+        
+        O estado atual vira antes um snapshot ("Antes de restaurar"), então a
+        restauração pode ser desfeita.
+        """
+        database = self.load_snapshot(snapshot_id, master_password, snapshot_password)
+        if database is None:
+            return None
+        if os.path.exists(self.db_file) and self.create_snapshot(master_password, "Antes de restaurar") is None:
+            return None
+        try:
+            with self.file_lock:
+                self._write_snapshot(database, self._refresh_key_slot(master_password))
+                self._mark_synced(self._disk_state(), base_of(database))
+            return database
+        except Exception as e:
+            print(f"Erro ao restaurar snapshot: {e}")
+            return None
+    
+    def prune_snapshots(self, keep_last: int = 10, keep_daily: int = 7, keep_weekly: int = 4,
+                        keep_monthly: int = 12) -> Optional[list[str]]:
+        """Remove snapshots fora da política de retenção; retorna os ids removidos
+        
+        Mantém os `keep_last` mais recentes e o mais recente de cada um dos últimos
+        `keep_daily` dias, `keep_weekly` semanas e `keep_monthly` meses. Não precisa
+        da senha: os objetos sem uso são copiados/removidos sem descriptografar.
+        """
+        try:
+            return self.snapshots.prune(keep_last, keep_daily, keep_weekly, keep_monthly)
+        except Exception as e:
+            print(f"Erro ao podar snapshots: {e}")
+            return None
+    
+    def export_vault(self, path: str, master_password: str, snapshot_id: Optional[str] = None) -> bool:
+        """Grava o cofre (ou um snapshot) num único arquivo portátil, bloco a bloco
+        
+        O arquivo tem o formato do passwords.encrypted e abre com a senha mestre
+        atual: basta colocá-lo como passwords.encrypted em outra pasta de dados.
+        """
+        try:
+            if snapshot_id is None:
+                self._ensure_key(master_password)
+                database, _ = self._read_current()
+            else:
+                database = self.load_snapshot(snapshot_id, master_password)
+                if database is None:
+                    return False
+            key_slot = self._refresh_key_slot(master_password)
+            self.writer.write_chunks(path, encode_chunks(database, self.crypto, key_slot=key_slot))
+            return True
+        except Exception as e:
+            print(f"Erro ao exportar: {e}")
+            return False
+    
+    def save_entry(self, database: PasswordDatabase, entry: PasswordEntry, master_password: str) -> bool:
+        """Persiste a inclusão/edição de uma entrada"""
+        return self._record_change(database, 'put', entry, master_password)
+    
+    def delete_entry(self, database: PasswordDatabase, entry_id: str, master_password: str) -> bool:
+        """Persiste a remoção de uma entrada"""
+        return self._record_change(database, 'delete', entry_id, master_password)
+    
+    def writes_entries(self) -> bool:
+        """Se alterações de uma entrada são gravadas sozinhas (sem regravar o database)"""
+        return (self.vault is not None or self.journal_mode) and self.database_exists()
+    
+    def needs_full_save(self) -> bool:
+        """Se a próxima alteração de entrada vai regravar o database inteiro
+        
+        Além de quando não há diário/SQLite, o snapshot em arquivo é regravado
+        para levar um KeySlot com KDF desatualizado para o cabeçalho novo.
+        """
+        if not self.writes_entries():
+            return True
+        return self.vault is None and self.key_slot is not None and self._key_slot_outdated()
+    
+    def _record_change(self, database: PasswordDatabase, op: str, value, master_password: str) -> bool:
+        """Grava uma alteração no diário/SQLite (ou o database inteiro, se preciso)"""
+        if not self.writes_entries():
+            return self.save_database(database, master_password)
+        if self.vault is None:
+            try:
+                self._ensure_key(master_password)
+            except Exception as e:
+                print(f"Erro ao salvar: {e}")
+                return False
+            if self._key_slot_outdated():
+                # KDF antigo: grava o snapshot com a chave protegida de novo
+                return self.save_database(database, master_password)
+        return self.write_change(op, value, master_password)
+    
+    def write_change(self, op: str, value, master_password: str) -> bool:
+        """Grava só a alteração de uma entrada ('put' com a entrada, 'delete' com o id)
+        
+        Não lê o database em memória, então pode rodar fora da thread da interface;
+        quem chama consulta needs_full_save() antes.
+        """
+        try:
+            if op == 'put':
+                entry, change = value, {'op': 'put', 'entry': value.to_dict()}
+            else:
+                entry, change = None, {'op': 'delete', 'id': value}
+            if self.vault is not None:
+                return self._write_row(change, master_password, entry)
             
-            # Carregar e descriptografar
-            with open(self.db_file, 'rb') as f:
-                encrypted_data = f.read()
+            self._ensure_key(master_password)
+            record = self.crypto.encrypt_data(json.dumps(change, separators=(',', ':')))
+            with self.file_lock:
+                changed = self._changed_on_disk()
+                if changed and self._superseded(change, entry):
+                    return True
+                with self._lock:
+                    self.journal.append(record)
+                self._note_entry_write(change, entry, changed)
             
-            json_data = self.crypto.decrypt_data(encrypted_data)
-            database = PasswordDatabase.from_json(json_data)
+            self._maybe_compact()
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar: {e}")
+            return False
+    
+    def _write_row(self, change: dict, master_password: str, entry: Optional[PasswordEntry]) -> bool:
+        """Grava só a linha da entrada no cofre SQLite (e o KeySlot, se estiver desatualizado)"""
+        try:
+            self._ensure_key(master_password)
+            with self.vault.transaction():
+                changed = self._changed_on_disk()
+                if changed and self._superseded(change, entry):
+                    return True
+                if self._key_slot_outdated():
+                    self.vault.write_key_slot(self._refresh_key_slot(master_password))
+                if change['op'] == 'put':
+                    self.vault.put([entry], self.crypto)
+                else:
+                    self.vault.delete([change['id']], self.crypto)
+            self._note_entry_write(change, entry, changed)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar: {e}")
+            return False
+    
+    def _superseded(self, change: dict, entry: Optional[PasswordEntry]) -> bool:
+        """Se outro processo gravou uma versão da entrada que vence a nossa na mescla"""
+        entry_id = entry.id if change['op'] == 'put' else change['id']
+        if self.vault is not None:
+            theirs = {entry_id: self.vault.get(entry_id, self.crypto)}
+        else:
+            theirs, _, _ = self._read_changes((entry_id,))
+            if entry_id not in theirs:
+                return False
+        return merge_entry(entry, theirs[entry_id], self._base.get(entry_id)) is not entry
+    
+    def _note_entry_write(self, change: dict, entry: Optional[PasswordEntry], changed: bool):
+        """Atualiza a versão sincronizada depois de gravar uma entrada"""
+        if change['op'] == 'put':
+            self._base[entry.id] = entry.updated_ts
+        else:
+            self._base.pop(change['id'], None)
+        if not changed:
+            # Só a nossa gravação mudou o disco desde a última sincronização
+            self._synced_state = self._disk_state()
+    
+    def _replay_journal(self, database: PasswordDatabase, records: list[bytes], crypto: CryptoManager):
+        """Aplica os registros do diário sobre o snapshot"""
+        for record in records:
+            change = json.loads(crypto.decrypt_data(record))
             
-            return database
+            if change['op'] == 'put':
+                database.put(PasswordEntry.from_dict(change['entry']))
+            elif change['op'] == 'delete':
+                database.remove(change['id'])
+    
+    def _journal_changes(self, records: list[bytes], crypto: CryptoManager) -> dict:
+        """Estado final de cada entrada alterada nos registros (id -> entrada ou None se removida)"""
+        changes = {}
+        for record in records:
+            change = json.loads(crypto.decrypt_data(record))
+            if change['op'] == 'put':
+                changes[change['entry']['id']] = PasswordEntry.from_dict(change['entry'])
+            elif change['op'] == 'delete':
+                changes[change['id']] = None
+        return changes
+    
+    def refresh_database(self, database: PasswordDatabase, master_password: str) -> bool:
+        """Incorpora em `database` o que outros processos gravaram, entrada por entrada
+        
+        Sem gravações novas custa só um stat e a leitura do cabeçalho. Se só o
+        diário cresceu, lê apenas os registros novos; senão relê o cofre (segredos
+        continuam fechados). Retorna se o database mudou.
+        """
+        changes = self.read_external_changes((entry.id for entry in database), master_password)
+        return changes is not None and self.apply_external_changes(database, changes)
+    
+    def read_external_changes(self, known: Iterable[str], master_password: str) -> Optional[tuple]:
+        """Primeira metade do refresh_database: lê as gravações de outros processos (None = nada novo)
+        
+        `known` são os ids em memória (os que sumiram do disco foram removidos lá).
+        Não toca no database, então roda fora da thread da interface.
+        """
+        try:
+            if not self._changed_on_disk():
+                return None
+            self._ensure_key(master_password)
+            return self._read_changes(known)
         except Exception as e:
             print(f"Erro ao carregar: {e}")
             return None
     
-    def _get_or_create_salt(self) -> bytes:
-        """Obtém salt existente ou cria novo"""
-        if os.path.exists(self.salt_file):
-            return self._load_salt()
+    def apply_external_changes(self, database: PasswordDatabase, changes: tuple) -> bool:
+        """Segunda metade do refresh_database: mescla o que foi lido em `database`"""
+        theirs, state, full = changes
+        changed = merge_into(database, theirs, self._base)
+        
+        base = {} if full else dict(self._base)
+        for entry_id, entry in theirs.items():
+            if entry is None:
+                base.pop(entry_id, None)
+            else:
+                base[entry_id] = entry.updated_ts
+        self._mark_synced(state, base)
+        return changed
+    
+    def _read_changes(self, known: Iterable[str]) -> tuple[dict, tuple, bool]:
+        """Alterações do disco desde a última sincronização: (id -> entrada ou None, estado, releu tudo?)"""
+        if self.vault is None:
+            with self.file_lock, self._lock:
+                state = self._disk_state()
+                start = self._journal_growth(state)
+                if start is not None:
+                    records = self.journal.read_records(start=start)
+                    return self._journal_changes(records, self.crypto), state, False
+        
+        disk, state = self._read_current()
+        return snapshot_changes(known, disk), state, True
+    
+    def _journal_growth(self, state: tuple) -> Optional[int]:
+        """Posição a partir da qual o diário cresceu, se o snapshot for o mesmo (None = reler tudo)"""
+        synced_snapshot, synced_journal = self._synced_state
+        snapshot, journal = state
+        if snapshot != synced_snapshot or journal is None:
+            return None
+        if synced_journal is None:
+            return 0
+        if journal[0] != synced_journal[0] or journal[1] < synced_journal[1]:
+            return None  # Diário regravado (compactação)
+        return synced_journal[1]
+    
+    def _disk_state(self) -> Optional[tuple]:
+        """Identidade do cofre no disco, sem descriptografar (None = não existe)
+        
+        Arquivo: (inode, mtime, tamanho e geração do snapshot), (inode e tamanho do diário).
+        SQLite: contador de commits de outras conexões.
+        """
+        if self.vault is not None:
+            return (self.vault.data_version(),) if self.vault.exists() else None
+        try:
+            with open(self.db_file, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                header = read_header(f)
+        except FileNotFoundError:
+            return None
+        snapshot = (stat.st_ino, stat.st_mtime_ns, stat.st_size, header.generation if header else 0)
+        try:
+            journal_stat = os.stat(self.journal.path)
+            journal = (journal_stat.st_ino, journal_stat.st_size)
+        except FileNotFoundError:
+            journal = None
+        return snapshot, journal
+    
+    def _disk_generation(self) -> int:
+        """Geração do snapshot no disco (0 se não existir ou for de formato antigo)"""
+        state = self._disk_state()
+        return state[0][3] if state else 0
+    
+    def _changed_on_disk(self) -> bool:
+        """Se outro processo gravou depois da última sincronização"""
+        return self._synced_state is not None and self._disk_state() != self._synced_state
+    
+    def _mark_synced(self, state: Optional[tuple], base: dict[str, int]):
+        """Registra o estado do disco que o database em memória reflete"""
+        self._synced_state = state
+        self._base = base
+    
+    def watched_paths(self) -> list[str]:
+        """Arquivos que mudam quando o cofre é gravado (para um observador de arquivos)"""
+        if self.vault is not None:
+            return [self.db_file, self.db_file + "-wal"]
+        return [self.db_file, self.journal.path]
+    
+    def _maybe_compact(self):
+        """Dispara compactação em segundo plano ao atingir os limites do diário"""
+        if (self.journal.record_count < self.compact_max_records and
+                self.journal.size() < self.compact_max_bytes):
+            return
+        
+        with self._lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return
+            
+            crypto = CryptoManager(workers=self.crypto.workers)
+            crypto.use_key(self.session.key, self.session.salt)
+            self._compaction_thread = threading.Thread(
+                target=self._compact, args=(crypto, self.key_slot), daemon=True
+            )
+            self._compaction_thread.start()
+    
+    def _compact(self, crypto: CryptoManager, key_slot: Optional[KeySlot]):
+        """Incorpora o diário ao snapshot sem bloquear novas gravações"""
+        try:
+            with self.file_lock, self._lock:
+                generation = self._snapshot_generation
+                offset = self.journal.size()
+                f = open(self.db_file, 'rb')
+                snapshot = self._disk_state()[0]
+            
+            # Registros após `offset` continuam no diário; reaplicar um registro
+            # já incorporado é idempotente, então uma queda aqui não perde dados.
+            with f:
+                database = self._read_snapshot(f, crypto)
+            self._replay_journal(database, self.journal.read_records(offset), crypto)
+            
+            with self.file_lock, self._lock:
+                # Um save completo durante a compactação (deste ou de outro processo)
+                # já tornou este snapshot obsoleto
+                before = self._disk_state()
+                if generation != self._snapshot_generation or before[0] != snapshot:
+                    return
+                self.writer.write_chunks(self.db_file, encode_chunks(database, crypto, key_slot=key_slot,
+                                                                     generation=snapshot[3] + 1))
+                self.journal.truncate_before(offset)
+                self._keep_synced(before)
+        except Exception as e:
+            print(f"Erro ao compactar: {e}")
+    
+    def wait_for_compaction(self):
+        """Aguarda compactação em andamento"""
+        thread = self._compaction_thread
+        if thread:
+            thread.join()
+    
+    def change_master_password(self, master_password: str, new_password: str, rotate_key: bool = False,
+                               progress: Optional[Callable[[str], None]] = None) -> bool:
+        """Troca a senha mestre (e, com `rotate_key`, a chave do cofre)
+        
+        Os blocos são recriptografados em paralelo num arquivo sombra que substitui
+        o cofre ao final; uma troca interrompida continua de onde parou na próxima
+        chamada. Com `rotate_key`, entradas já carregadas continuam seladas com a
+        chave antiga: recarregue o database depois.
+        """
+        report = progress or (lambda stage: None)
+        self.wait_for_compaction()
+        try:
+            with self.file_lock, self._lock:
+                if not os.path.exists(self.db_file):
+                    raise ValueError("Cofre não encontrado")
+                self._ensure_key(master_password)
+                before = self._disk_state()
+                
+                if self.vault is not None:
+                    # Transação única do SQLite: uma interrupção desfaz tudo
+                    key = new_vault_key() if rotate_key else self.crypto.key
+                    key_slot = KeySlot.create(new_password, key, self._target_kdf_params())
+                    new_crypto = CryptoManager(workers=self.crypto.workers)
+                    new_crypto.use_key(key, key_slot.salt)
+                    self.vault.rekey(self.crypto, new_crypto, key_slot,
+                                     lambda done, total: report(f"Recriptografando... {done} de {total} entradas"))
+                    self._adopt_key_slot(new_password, key_slot, key)
+                    self._keep_synced(before)
+                    return True
+                
+                # Partir de um snapshot em blocos com KeySlot e sem diário pendente
+                # (registros do diário estão na chave antiga)
+                if self.journal.size():
+                    report("Salvando alterações...")
+                    database, _ = self._read_current()
+                    self._write_snapshot(database, self._refresh_key_slot(master_password))
+                
+                rekey = ShadowRekey(self.db_file, self.writer, self.crypto.workers)
+                resumed = rekey.resume_point(new_password)
+                if resumed is not None and (resumed[1] != self.crypto.key) == rotate_key:
+                    key_slot, key = resumed
+                else:
+                    rekey.discard()
+                    key = new_vault_key() if rotate_key else self.crypto.key
+                    key_slot = KeySlot.create(new_password, key, self._target_kdf_params())
+                
+                new_crypto = CryptoManager(workers=self.crypto.workers)
+                new_crypto.use_key(key, key_slot.salt)
+                rekey.run(self.crypto, new_crypto, key_slot,
+                          lambda done, total: report(f"Recriptografando... {done} de {total} blocos"))
+                
+                self._adopt_key_slot(new_password, key_slot, key)
+                self._snapshot_generation += 1
+                self._keep_synced(before)
+            return True
+        except Exception as e:
+            print(f"Erro ao trocar senha: {e}")
+            return False
+    
+    def _keep_synced(self, before: Optional[tuple]):
+        """Após regravar sem mudar o conteúdo: continua sincronizado se já estava"""
+        if self._synced_state is not None and self._synced_state == before:
+            self._synced_state = self._disk_state()
+    
+    def _adopt_key_slot(self, master_password: str, key_slot: KeySlot, key: bytes):
+        """Passa a usar `key_slot` e sua chave na sessão e no CryptoManager"""
+        self.key_slot = key_slot
+        self.session.adopt(master_password, key_slot.salt, key)
+        self.crypto.use_key(key, key_slot.salt)
+    
+    def _ensure_key(self, master_password: str):
+        """Usa a chave da sessão ou abre a chave do cofre de novo se ela expirou"""
+        if self.session.matches(master_password):
+            self.crypto.use_key(self.session.key, self.session.salt)
+        elif os.path.exists(self.db_file):
+            if not self._unlock_vault(master_password):
+                raise ValueError("Salt não encontrado")
         else:
-            return self._create_salt()
+            # Cofre novo: chave aleatória protegida pela senha mestre
+            key = new_vault_key()
+            key_slot = KeySlot.create(master_password, key, self._target_kdf_params())
+            self._adopt_key_slot(master_password, key_slot, key)
+    
+    def _unlock_vault(self, master_password: str) -> bool:
+        """Abre a chave do cofre pelo KeySlot do cabeçalho (cofres antigos são convertidos antes)"""
+        key_slot = self._disk_key_slot()
+        if key_slot is None:
+            return self.vault is None and self._upgrade_legacy_vault(master_password)
+        
+        self._unlock(master_password, key_slot.salt, key_slot)
+        self.key_slot = key_slot
+        return True
+    
+    def _upgrade_legacy_vault(self, master_password: str) -> bool:
+        """Converte o cofre antigo (chave derivada do salt.bin) para o formato atual
+        
+        Todos os segredos são recriptografados na conversão, então o cofre ganha
+        uma chave aleatória nova; o salt.bin só é removido depois que o snapshot
+        novo foi gravado atomicamente.
+        """
+        with self.file_lock:
+            key_slot = self._disk_key_slot()
+            if key_slot is not None:
+                # Convertido por outro processo enquanto esperávamos o lock
+                self._unlock(master_password, key_slot.salt, key_slot)
+                self.key_slot = key_slot
+                return True
+            
+            salt = self._load_salt()
+            if not salt:
+                return False
+            self._unlock(master_password, salt)
+            database, _ = self._read_current()  # Segredos em texto claro no formato antigo
+            
+            key = new_vault_key()
+            key_slot = KeySlot.create(master_password, key, self._target_kdf_params())
+            crypto = CryptoManager(workers=self.crypto.workers)
+            crypto.use_key(key, key_slot.salt)
+            self._write_snapshot(database, key_slot, crypto)
+            self.writer.flush()
+            self.writer.remove(self.salt_file)
+            self._adopt_key_slot(master_password, key_slot, key)
+        return True
+    
+    def _unlock(self, master_password: str, salt: bytes, key_slot: Optional[KeySlot] = None):
+        """Desbloqueia a sessão e entrega a chave ao CryptoManager"""
+        key = self.session.unlock(master_password, salt, key_slot)
+        self.crypto.use_key(key, salt)
+    
+    def _target_kdf_params(self) -> KdfParams:
+        """Parâmetros do KDF para chaves protegidas a partir de agora"""
+        if self.kdf_params is None:
+            self.kdf_params = calibrate(self.kdf_algorithm, self.unlock_seconds)
+        return self.kdf_params
+    
+    def _disk_key_slot(self) -> Optional[KeySlot]:
+        """KeySlot gravado no cofre (None em cofres antigos)"""
+        if self.vault is not None:
+            return self.vault.read_key_slot()
+        with open(self.db_file, 'rb') as f:
+            header = read_header(f)
+        return header.key_slot if header else None
+    
+    def _key_slot_outdated(self) -> bool:
+        """Se a chave do cofre está protegida por um KDF mais fraco que o alvo"""
+        return self.key_slot.params.weaker_than(self._target_kdf_params())
+    
+    def _refresh_key_slot(self, master_password: str) -> KeySlot:
+        """KeySlot a gravar, protegendo a chave de novo se o KDF estiver desatualizado
+        
+        A chave do cofre não muda (segredos e diário continuam válidos); só o
+        KDF, o salt e a cópia protegida no cabeçalho são trocados.
+        """
+        if self._key_slot_outdated():
+            key = self.crypto.key
+            key_slot = KeySlot.create(master_password, key, self._target_kdf_params())
+            self._adopt_key_slot(master_password, key_slot, key)
+        return self.key_slot
+    
+    def lock(self):
+        """Bloqueia a sessão, zerando a chave em memória"""
+        self.session.lock()
+        self.crypto.use_key(None)
+    
+    def set_durability(self, durability: str):
+        """Altera o nível de durabilidade (ex: "batch" durante importações)"""
+        self.writer.flush()
+        self.writer = AtomicWriter(durability, self.writer.batch_size)
+        self.journal.writer = self.writer
+        self.snapshots.writer = self.writer
+        if self.vault is not None:
+            self.vault.set_durability(durability)
+    
+    def flush(self):
+        """Sincroniza escritas pendentes no disco"""
+        self.writer.flush()
     
-    def _create_salt(self) -> bytes:
-        """Cria novo salt"""
-        salt = os.urandom(16)
-        with open(self.salt_file, 'wb') as f:
-            f.write(salt)
-        return salt
+    def close(self):
+        """Finaliza tarefas pendentes e bloqueia a sessão"""
+        self.wait_for_compaction()
+        self.flush()
+        if self.vault is not None:
+            self.vault.close()
+        self.lock()
     
     def _load_salt(self) -> Optional[bytes]:
-        """Carrega salt existente"""
+        """Carrega o salt de um cofre antigo"""
         try:
             with open(self.salt_file, 'rb') as f:
                 return f.read()
@@ -87,4 +848,4 @@ class StorageManager:
     
     def database_exists(self) -> bool:
         """Verifica se já existe database"""
-        return os.path.exists(self.db_file) and os.path.exists(self.salt_file)
+        return os.path.exists(self.db_file)
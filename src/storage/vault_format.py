@@ -0,0 +1,466 @@
+import io
+import mmap
+import struct
+import sys
+from array import array
+from itertools import chain, islice
+from operator import attrgetter
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+from src.crypto.crypto_manager import CryptoManager
+from src.crypto.kdf import KeySlot
+from src.models.password_model import PasswordDatabase, PasswordEntry, intern_value
+
+# Formato binário (versão 4):
+#
+#   PW2B | versão (u8) | tamanho do cabeçalho (u32) | cabeçalho
+#   cabeçalho: quantidade de entradas (u32) | geração (u64) | KeySlot (KDF, salt e chave do cofre protegida)
+#   blocos: último? (u8) | tamanho (u32) | AES-GCM com nonce próprio
+#
+# Cada bloco traz até CHUNK_ENTRIES entradas e é autenticado junto com o
+# cabeçalho, o número do bloco e a marca de último bloco, então pode ser
+# descriptografado e convertido em entradas assim que é lido. A geração aumenta
+# a cada snapshot gravado (detecta gravações de outros processos).
+#
+# Conteúdo de um bloco: índice colunar (uma tabela de strings sem repetições,
+# posição 0 = None, e para cada campo de texto uma coluna com a posição do valor
+# de cada entrada na tabela; depois uma coluna i64 por data, em microssegundos, e
+# por último o tamanho do registro de segredos de cada entrada) seguido dos
+# registros de segredos. Inteiros em little-endian.
+#
+# Formato antigo (convertido ao abrir, com uma chave nova): um único token
+# Fernet com o JSON completo do database, chave derivada do salt.bin.
+VAULT_MAGIC = b"PW2B"
+FORMAT_VERSION = 4
+CHUNKED_VERSIONS = (4,)
+CHUNK_ENTRIES = 1024
+STRING_FIELDS = ('id', 'title', 'username', 'url')
+
+# Registros de segredos começam com este byte (identifica o algoritmo)
+SEALED_AEAD = b"\x01"
+
+_PREFIX = struct.Struct('<4sBI')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_CHUNK = struct.Struct('<BI')
+CHUNK_HEADER_SIZE = _CHUNK.size
+_CHUNK_AAD = struct.Struct('<QB')  # número do bloco, último?
+_SECRET = struct.Struct('<BI')  # tem notas, tamanho da senha em bytes
+_strings = attrgetter(*STRING_FIELDS)
+
+def _little_endian(values: array) -> array:
+    """Array em little-endian, pronta para gravar"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+def _read_array(typecode: str, data: bytes, offset: int, count: int) -> array:
+    """Lê `count` inteiros little-endian a partir de `offset`"""
+    values = array(typecode)
+    values.frombytes(data[offset:offset + count * values.itemsize])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _pack_strings(values: list[str]) -> bytes:
+    """Quantidade, fim de cada string (em caracteres) e o texto concatenado em UTF-8"""
+    ends = array('I')
+    end = 0
+    for value in values:
+        end += len(value)
+        ends.append(end)
+    blob = "".join(values).encode('utf-8')
+    return _U32.pack(len(values)) + _U32.pack(len(blob)) + _little_endian(ends).tobytes() + blob
+
+def _unpack_strings(data: bytes, offset: int) -> tuple[list[str], int]:
+    """Inverso de _pack_strings; retorna as strings e a posição seguinte"""
+    count, = _U32.unpack_from(data, offset)
+    blob_size, = _U32.unpack_from(data, offset + 4)
+    offset += 8
+    ends = _read_array('I', data, offset, count)
+    offset += count * ends.itemsize
+    text = str(data[offset:offset + blob_size], 'utf-8')  # Aceita bytes ou memoryview
+    return [text[start:end] for start, end in zip(chain((0,), ends), ends)], offset + blob_size
+
+def is_legacy_vault(data: bytes) -> bool:
+    """Formatos antigos (Fernet com JSON), convertidos para o binário ao abrir"""
+    return not data.startswith(VAULT_MAGIC)
+
+def _secret_plaintext(password: str, notes: Optional[str]) -> bytes:
+    """Registro de segredos antes de criptografar"""
+    password = password.encode('utf-8')
+    plaintext = _SECRET.pack(notes is not None, len(password)) + password
+    if notes is not None:
+        plaintext += notes.encode('utf-8')
+    return plaintext
+
+def seal_secret(entry: PasswordEntry, crypto: CryptoManager) -> bytes:
+    """Criptografa senha e notas de uma entrada (vinculadas ao id da entrada)"""
+    return SEALED_AEAD + crypto.encrypt_bytes(_secret_plaintext(entry.password, entry.notes), entry.id.encode())
+
+def open_secret(entry: PasswordEntry, crypto: CryptoManager) -> dict:
+    """Descriptografa senha e notas de uma entrada"""
+    return parse_secret(crypto.decrypt_bytes(entry.sealed_secret[1:], entry.id.encode()))
+
+def parse_secret(plaintext: bytes) -> dict:
+    """Senha e notas de um registro de segredos em texto claro"""
+    has_notes, size = _SECRET.unpack_from(plaintext, 0)
+    password = bytes(plaintext[_SECRET.size:_SECRET.size + size]).decode('utf-8')
+    notes = bytes(plaintext[_SECRET.size + size:]).decode('utf-8') if has_notes else None
+    return {'password': password, 'notes': notes}
+
+def open_secrets(entries: list[PasswordEntry], crypto: CryptoManager) -> list[bytes]:
+    """Registros de segredos das entradas em texto claro, descriptografando em lote"""
+    secrets = []
+    pending = []  # Posições dos registros AES-GCM, descriptografados juntos
+    for entry in entries:
+        sealed_secret = entry.sealed_secret
+        if sealed_secret is None:
+            secrets.append(_secret_plaintext(entry.password, entry.notes))
+        else:
+            pending.append(len(secrets))
+            secrets.append(memoryview(sealed_secret)[1:])
+
+    if pending:
+        opened = crypto.decrypt_many([secrets[i] for i in pending],
+                                     [entries[i].id.encode() for i in pending])
+        for i, plaintext in zip(pending, opened):
+            secrets[i] = plaintext
+    return secrets
+
+def seal_secrets(entries: list[PasswordEntry], crypto: CryptoManager) -> list[bytes]:
+    """Registros de segredos das entradas, criptografando em lote só os que mudaram"""
+    secrets = []
+    pending = []  # Posições dos segredos a criptografar, em lote
+    for entry in entries:
+        if entry.is_sealed:
+            secrets.append(entry.sealed_secret)  # Nunca aberto: regravado sem descriptografar
+        else:
+            pending.append(len(secrets))
+            secrets.append(_secret_plaintext(entry.password, entry.notes))
+
+    if pending:
+        # Uma cifra para o lote todo (e threads, se o CryptoManager tiver)
+        sealed = crypto.encrypt_many([secrets[i] for i in pending],
+                                     [entries[i].id.encode() for i in pending])
+        for i, sealed_secret in zip(pending, sealed):
+            secrets[i] = SEALED_AEAD + sealed_secret
+    return secrets
+
+def _encode_block(entries: list[PasswordEntry], crypto: CryptoManager) -> tuple[list[bytes], list[bytes]]:
+    """Índice colunar de um grupo de entradas e seus registros de segredos"""
+    positions = {None: 0}  # string -> posição na tabela
+    strings = []
+    columns = [array('I') for _ in STRING_FIELDS]
+    created = array('q')
+    updated = array('q')
+
+    for entry in entries:
+        for column, value in zip(columns, _strings(entry)):
+            position = positions.get(value)
+            if position is None:
+                strings.append(value)
+                position = positions[value] = len(strings)
+            column.append(position)
+        created.append(entry.created_ts)
+        updated.append(entry.updated_ts)
+
+    secrets = seal_secrets(entries, crypto)
+    secret_sizes = array('I', map(len, secrets))
+    index = [_U32.pack(len(secrets)), _pack_strings(strings)]
+    index += [_little_endian(column).tobytes() for column in columns + [created, updated, secret_sizes]]
+    return index, secrets
+
+def _decode_index(index: bytes, offset: int = 0):
+    """Colunas de metadados, tamanhos dos segredos e a posição após o índice"""
+    count, = _U32.unpack_from(index, offset)
+    strings, position = _unpack_strings(index, offset + _U32.size)
+    strings.insert(0, None)
+    typecodes = 'I' * len(STRING_FIELDS) + 'qqI'
+    columns = []
+    for typecode in typecodes:
+        column = _read_array(typecode, index, position, count)
+        position += count * column.itemsize
+        columns.append(column)
+    secret_sizes = columns.pop()
+    dates = columns[len(STRING_FIELDS):]
+
+    # Usuários e URLs se repetem entre blocos: internados uma vez por valor do bloco
+    for column in columns[2:4]:
+        for item in set(column):
+            strings[item] = intern_value(strings[item])
+    values = [[strings[item] for item in column] for column in columns[:len(STRING_FIELDS)]]
+    return values + dates, secret_sizes, position
+
+def _split_secrets(data: bytes, offset: int, secret_sizes: array) -> list[bytes]:
+    """Registros de segredos em sequência a partir de `offset`"""
+    if offset + sum(secret_sizes) > len(data):
+        raise ValueError("Arquivo do cofre truncado")
+
+    secrets = []
+    for size in secret_sizes:
+        secrets.append(bytes(data[offset:offset + size]))  # Cópia: `data` pode ser reaproveitado
+        offset += size
+    return secrets
+
+def _build_entries(values: list[list], secrets: list[bytes]) -> list[PasswordEntry]:
+    """Cria as entradas (segredos ainda fechados) a partir das colunas"""
+    restore = PasswordEntry.restore
+    return list(map(restore, *values, secrets))
+
+def reseal_block(block, old_crypto: CryptoManager, new_crypto: CryptoManager) -> bytes:
+    """Bloco descriptografado com os segredos recriptografados na nova chave
+
+    O índice não muda: um registro AES-GCM recriptografado tem o mesmo tamanho.
+    """
+    values, secret_sizes, position = _decode_index(block)
+    ids = [entry_id.encode() for entry_id in values[0]]
+    secrets = _split_secrets(block, position, secret_sizes)
+
+    opened = old_crypto.decrypt_many([memoryview(secret)[1:] for secret in secrets], ids, workers=0)
+    resealed = new_crypto.encrypt_many(opened, ids, workers=0)
+    return b"".join(chain((bytes(block[:position]),), *((SEALED_AEAD, secret) for secret in resealed)))
+
+def _decode_block(block) -> list[PasswordEntry]:
+    """Entradas de um bloco já descriptografado"""
+    values, secret_sizes, position = _decode_index(block)
+    return _build_entries(values, _split_secrets(block, position, secret_sizes))
+
+class VaultHeader(NamedTuple):
+    version: int
+    count: int
+    generation: int
+    key_slot: Optional[KeySlot]
+
+def _parse_header(header, version: int) -> VaultHeader:
+    """Campos do cabeçalho de um cofre em blocos"""
+    if len(header) < _U32.size + _U64.size:
+        raise ValueError("Arquivo do cofre truncado")
+    count, = _U32.unpack_from(header, 0)
+    generation, = _U64.unpack_from(header, _U32.size)
+    offset = _U32.size + _U64.size
+    key_slot = KeySlot.from_bytes(header, offset) if len(header) > offset else None
+    return VaultHeader(version, count, generation, key_slot)
+
+def encode_prefix(count: int, key_slot: Optional[KeySlot] = None, generation: int = 0) -> bytes:
+    """Início do arquivo: identificação, versão e cabeçalho"""
+    header = _U32.pack(count) + _U64.pack(generation)  # Quantidade de entradas e geração
+    if key_slot is not None:
+        header += key_slot.to_bytes()
+    return _PREFIX.pack(VAULT_MAGIC, FORMAT_VERSION, len(header)) + header
+
+def seal_chunk(block: bytes, number: int, last: bool, prefix: bytes, crypto: CryptoManager) -> bytes:
+    """Registro de um bloco, autenticado com o prefixo do arquivo, sua posição e a marca de último"""
+    sealed = crypto.encrypt_bytes(block, prefix + _CHUNK_AAD.pack(number, last))
+    return _CHUNK.pack(last, len(sealed)) + sealed
+
+def encode_chunks(database: PasswordDatabase, crypto: CryptoManager, chunk_entries: int = CHUNK_ENTRIES,
+                  key_slot: Optional[KeySlot] = None, generation: int = 0) -> Iterator[bytes]:
+    """Gera o arquivo do cofre bloco a bloco (só um bloco em memória por vez)"""
+    prefix = encode_prefix(len(database), key_slot, generation=generation)
+    yield prefix
+
+    entries = iter(database)
+    batch = list(islice(entries, chunk_entries))
+    number = 0
+    while True:
+        # Olhar o próximo grupo para saber se este é o último bloco
+        following = list(islice(entries, chunk_entries))
+        last = not following
+
+        index, secrets = _encode_block(batch, crypto)
+        yield seal_chunk(b"".join(index + secrets), number, last, prefix, crypto)
+
+        if last:
+            return
+        batch = following
+        number += 1
+
+def encode_vault(database: PasswordDatabase, crypto: CryptoManager,
+                 key_slot: Optional[KeySlot] = None) -> bytes:
+    """Serializa o database no formato binário"""
+    return b"".join(encode_chunks(database, crypto, key_slot=key_slot))
+
+def decode_vault(data: bytes, crypto: CryptoManager) -> PasswordDatabase:
+    """Carrega o database a partir do conteúdo completo do arquivo"""
+    reader = VaultReader(io.BytesIO(data), crypto)
+    return PasswordDatabase(chain.from_iterable(reader.batches()))
+
+def read_header(f: BinaryIO) -> Optional[VaultHeader]:
+    """Cabeçalho de um cofre em blocos, lido sem descriptografar (None = formato antigo)"""
+    start = f.read(_PREFIX.size)
+    try:
+        if len(start) < _PREFIX.size or not start.startswith(VAULT_MAGIC):
+            return None
+        _, version, header_size = _PREFIX.unpack(start)
+        if version not in CHUNKED_VERSIONS:
+            return None
+        header = f.read(header_size)
+        if len(header) < header_size:
+            raise ValueError("Arquivo do cofre truncado")
+        return _parse_header(header, version)
+    finally:
+        f.seek(0)
+
+def read_key_slot(f: BinaryIO) -> Optional[KeySlot]:
+    """KeySlot do cabeçalho, lido antes de desbloquear (None = formato antigo)"""
+    header = read_header(f)
+    return header.key_slot if header is not None else None
+
+class VaultReader:
+    """Lê o cofre de um arquivo aberto, descriptografando um bloco por vez"""
+    def __init__(self, stream: BinaryIO, crypto: CryptoManager):
+        self.stream = stream
+        self.crypto = crypto
+        self.count = None  # Quantidade de entradas (None = só conhecida ao final)
+
+        start = stream.read(_PREFIX.size)
+        if not start.startswith(VAULT_MAGIC) or len(start) < _PREFIX.size:
+            self.version = 0
+            self._start = start
+            return
+
+        _, self.version, header_size = _PREFIX.unpack(start)
+        if self.version not in CHUNKED_VERSIONS:
+            raise ValueError(f"Versão do cofre não suportada: {self.version}")
+        header = self._read(header_size)
+        self._start = start + header
+        self.count, = _U32.unpack_from(header, 0)
+
+    def close(self):
+        pass  # O arquivo pertence a quem o abriu
+
+    def _read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        if len(data) < size:
+            raise ValueError("Arquivo do cofre truncado")
+        return data
+
+    def batches(self) -> Iterator[list[PasswordEntry]]:
+        """Entradas em grupos, na ordem do arquivo"""
+        if self.version in CHUNKED_VERSIONS:
+            yield from self._read_chunks()
+            return
+
+        # Formato antigo, sem blocos: precisa do arquivo inteiro
+        data = self._start + self.stream.read()
+        entries = list(PasswordDatabase.from_json(self.crypto.decrypt_data(data)))
+        self.count = len(entries)
+        yield entries
+
+    def _read_chunks(self) -> Iterator[list[PasswordEntry]]:
+        number = 0
+        while True:
+            last, size = _CHUNK.unpack(self._read(_CHUNK.size))
+            # Número e marca de último bloco autenticados: blocos fora de ordem,
+            # repetidos ou um arquivo cortado entre blocos não passam
+            aad = self._start + _CHUNK_AAD.pack(number, bool(last))
+            block = self.crypto.decrypt_bytes(self._read(size), aad)
+
+            yield _decode_block(block)
+
+            if last:
+                if self.stream.read(1):
+                    raise ValueError("Dados após o fim do cofre")
+                return
+            number += 1
+
+class MappedVault:
+    """Cofre mapeado em memória: os blocos são descriptografados direto das páginas do arquivo
+
+    Só lê as versões em blocos; a tabela de blocos é montada lendo apenas
+    os cabeçalhos, então é possível descriptografar só os blocos necessários.
+    """
+    def __init__(self, f: BinaryIO, crypto: CryptoManager):
+        self.crypto = crypto
+        # O mapeamento continua válido mesmo que o arquivo seja substituído depois
+        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        try:
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+        self._buffer = bytearray(max((size for _, size, _ in self._chunks), default=0))
+
+    def _scan(self):
+        """Monta a tabela de blocos (posição, tamanho, último?) sem descriptografar"""
+        view = self._view
+        self._prefix = read_prefix(view)
+        self.version = self._prefix[len(VAULT_MAGIC)]
+        header = _parse_header(self._prefix[_PREFIX.size:], self.version)
+        self.count = header.count
+        self.generation = header.generation
+
+        self._chunks, end = scan_chunks(view, len(self._prefix))
+        if not self._chunks or not self._chunks[-1][2]:
+            raise ValueError("Arquivo do cofre truncado")
+        if end != len(view):
+            raise ValueError("Dados após o fim do cofre")
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def read_chunk(self, number: int) -> list[PasswordEntry]:
+        """Descriptografa um bloco no buffer reaproveitado e devolve suas entradas"""
+        offset, size, last = self._chunks[number]
+        aad = self._prefix + _CHUNK_AAD.pack(number, last)
+        plaintext_size = self.crypto.decrypt_into(self._view[offset:offset + size], self._buffer, aad)
+        with memoryview(self._buffer)[:plaintext_size] as block:
+            return _decode_block(block)
+
+    def decrypt_chunk(self, number: int) -> bytes:
+        """Conteúdo de um bloco numa cópia própria (pode ser chamado de várias threads)"""
+        return open_chunk(self._view, self._chunks[number], number, self._prefix, self.crypto)
+
+    def is_last(self, number: int) -> bool:
+        return self._chunks[number][2]
+
+    def batches(self, numbers: Optional[Iterable[int]] = None) -> Iterator[list[PasswordEntry]]:
+        """Entradas dos blocos pedidos (todos, por padrão), um bloco por vez"""
+        for number in range(len(self._chunks)) if numbers is None else numbers:
+            yield self.read_chunk(number)
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+def read_prefix(view) -> bytes:
+    """Prefixo (identificação, versão e cabeçalho) de um cofre em blocos"""
+    if len(view) < _PREFIX.size:
+        raise ValueError("Arquivo do cofre truncado")
+    magic, version, header_size = _PREFIX.unpack_from(view, 0)
+    if magic != VAULT_MAGIC or version not in CHUNKED_VERSIONS:
+        raise ValueError("Formato do cofre sem blocos")
+    if _PREFIX.size + header_size > len(view):
+        raise ValueError("Arquivo do cofre truncado")
+    return bytes(view[:_PREFIX.size + header_size])
+
+def scan_chunks(view, offset: int) -> tuple[list[tuple[int, int, bool]], int]:
+    """Blocos completos a partir de `offset` (posição, tamanho, último?) e onde terminam
+
+    Para no último bloco ou no primeiro incompleto (arquivo cortado no meio).
+    """
+    chunks = []
+    last = False
+    while not last and offset + _CHUNK.size <= len(view):
+        last, size = _CHUNK.unpack_from(view, offset)
+        if offset + _CHUNK.size + size > len(view):
+            break
+        offset += _CHUNK.size
+        chunks.append((offset, size, bool(last)))
+        offset += size
+    return chunks, offset
+
+def open_chunk(data, chunk: tuple[int, int, bool], number: int, prefix: bytes, crypto: CryptoManager) -> bytes:
+    """Descriptografa um bloco encontrado por scan_chunks"""
+    offset, size, last = chunk
+    return crypto.decrypt_bytes(data[offset:offset + size], prefix + _CHUNK_AAD.pack(number, last))
+
+def open_reader(f: BinaryIO, crypto: CryptoManager):
+    """Leitor mapeado em memória para a versão atual; leitura sequencial para as demais"""
+    try:
+        return MappedVault(f, crypto)
+    except (ValueError, OSError):
+        f.seek(0)  # Formato antigo (ou arquivo vazio): leitura sequencial
+        return VaultReader(f, crypto)
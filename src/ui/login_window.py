@@ -1,52 +1,51 @@
+import gc
 import sys
+from functools import partial
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-                               QLabel, QLineEdit, QPushButton, QMessageBox)
+                               QLabel, QLineEdit, QPushButton, QMessageBox, QProgressBar)
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
+from src.ui.worker import Worker
+
+def unlock_vault(storage_manager, master_password, report):
+    """Carrega o database e monta o índice de busca (na thread do Worker)"""
+    from src.models.search_index import SearchIndex  # Fora do caminho até a primeira pintura
+    database = storage_manager.load_database(master_password, progress=report)
+    if database is None:
+        raise ValueError("Senha incorreta ou arquivo corrompido")
+    report("Indexando...")
+    search_index = SearchIndex(database)
+    # Coleta completa ainda na tela de progresso: senão a primeira, sobre tudo o que
+    # acabou de ser carregado, cai no meio da digitação
+    gc.collect()
+    return database, search_index
+
+def create_vault(storage_manager, master_password, report):
+    """Grava um cofre vazio (calibração do KDF e derivação da chave levam segundos)"""
+    from src.models.password_model import PasswordDatabase
+    from src.models.search_index import SearchIndex
+    database = PasswordDatabase()
+    if not storage_manager.save_database(database, master_password):
+        raise ValueError("Falha ao criar cofre")
+    return database, SearchIndex(database)
 
 class LoginWindow(QWidget):
     # Signal emitido quando login é bem-sucedido
-    login_successful = Signal(str)  # passa a senha mestre
+    login_successful = Signal(str, object, object)  # senha mestre, database e índice de busca
     
     def __init__(self, storage_manager):
         super().__init__()
         self.storage_manager = storage_manager
+        self.unlock_worker = None
+        self.create_worker = None
+        self.pending_password = None
         self.setup_ui()
     
     def setup_ui(self):
         self.setWindowTitle("Picoword Two - Login")
-        self.setFixedSize(350, 200)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2b2b2b;
-                color: white;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 2px solid #444;
-                border-radius: 4px;
-                background-color: #3c3c3c;
-                color: white;
-                font-size: 12px;
-            }
-            QLineEdit:focus {
-                border-color: #0078d4;
-            }
-            QPushButton {
-                background-color: #0078d4;
-                border: none;
-                padding: 10px;
-                border-radius: 4px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #106ebe;
-            }
-            QPushButton:pressed {
-                background-color: #005a9e;
-            }
-        """)
+        self.setFixedSize(350, 250)
+        self.setObjectName("loginWindow")  # Estilo vem do tema da aplicação
+        self.setAttribute(Qt.WA_StyledBackground, True)
         
         layout = QVBoxLayout()
         
@@ -81,6 +80,23 @@ class LoginWindow(QWidget):
         
         layout.addLayout(button_layout)
         
+        # Progresso do desbloqueio (oculto até o login começar)
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # Indicador de ocupado
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumHeight(6)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+        
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.clicked.connect(self.cancel_login)
+        self.cancel_button.hide()
+        layout.addWidget(self.cancel_button)
+        
         self.setLayout(layout)
         
         # Foco no campo de senha
@@ -93,19 +109,65 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Erro", "Digite a senha mestre")
             return
         
-        # Tentar carregar database
-        database = self.storage_manager.load_database(password)
-        
-        if database is None:
-            QMessageBox.critical(self, "Erro", "Senha incorreta ou arquivo corrompido")
-            self.password_input.clear()
-            self.password_input.setFocus()
+        if self.unlock_worker and self.unlock_worker.is_running():
             return
         
+        # Carregar database fora da thread da interface
+        self.pending_password = password
+        self.unlock_worker = Worker(partial(unlock_vault, self.storage_manager, password), parent=self)
+        self.unlock_worker.progress.connect(self.status_label.setText)
+        self.unlock_worker.done.connect(self.on_unlocked)
+        self.unlock_worker.failed.connect(self.on_unlock_failed)
+        self.unlock_worker.cancelled.connect(self.on_unlock_cancelled)
+        self.set_busy(True)
+        self.unlock_worker.start()
+    
+    def set_busy(self, busy):
+        """Alterna entre formulário e indicador de progresso"""
+        self.password_input.setEnabled(not busy)
+        self.login_button.setEnabled(not busy)
+        if hasattr(self, 'create_button'):
+            self.create_button.setEnabled(not busy)
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        self.cancel_button.setEnabled(busy)
+        if not busy:
+            self.status_label.setText("")
+    
+    def cancel_login(self):
+        """Cancela desbloqueio em andamento"""
+        if self.unlock_worker:
+            self.unlock_worker.cancel()
+            self.status_label.setText("Cancelando...")
+            self.cancel_button.setEnabled(False)
+    
+    def on_unlocked(self, result):
+        """Desbloqueio concluído"""
+        database, search_index = result
+        password = self.pending_password
+        self.pending_password = None
+        self.set_busy(False)
+        
         # Login bem-sucedido
-        self.login_successful.emit(password)
+        self.login_successful.emit(password, database, search_index)
         self.close()
     
+    def on_unlock_failed(self, error):
+        """Senha errada ou arquivo inválido"""
+        self.pending_password = None
+        self.set_busy(False)
+        QMessageBox.critical(self, "Erro", str(error))
+        self.password_input.clear()
+        self.password_input.setFocus()
+    
+    def on_unlock_cancelled(self):
+        """Desbloqueio cancelado pelo usuário"""
+        # O KDF pode ter terminado antes do cancelamento: descartar a chave
+        self.storage_manager.lock()
+        self.pending_password = None
+        self.set_busy(False)
+        self.password_input.setFocus()
+    
     def handle_create(self):
         password = self.password_input.text().strip()
         
@@ -123,18 +185,34 @@ class LoginWindow(QWidget):
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            # Criar database vazio
-            from src.models.password_model import PasswordDatabase
-            empty_db = PasswordDatabase()
+            if self.create_worker and self.create_worker.is_running():
+                return
             
-            success = self.storage_manager.save_database(empty_db, password)
-            
-            if success:
-                QMessageBox.information(self, "Sucesso", "Cofre criado com sucesso!")
-                self.login_successful.emit(password)
-                self.close()
-            else:
-                QMessageBox.critical(self, "Erro", "Falha ao criar cofre")
+            # Calibrar o KDF e gravar o cofre vazio fora da thread da interface
+            self.pending_password = password
+            self.create_worker = Worker(partial(create_vault, self.storage_manager, password), parent=self)
+            self.create_worker.done.connect(self.on_created)
+            self.create_worker.failed.connect(self.on_create_failed)
+            self.set_busy(True)
+            self.cancel_button.setEnabled(False)  # A gravação não pode ser interrompida
+            self.status_label.setText("Criando cofre...")
+            self.create_worker.start()
+    
+    def on_created(self, result):
+        """Cofre criado"""
+        database, search_index = result
+        password = self.pending_password
+        self.pending_password = None
+        self.set_busy(False)
+        QMessageBox.information(self, "Sucesso", "Cofre criado com sucesso!")
+        self.login_successful.emit(password, database, search_index)
+        self.close()
+    
+    def on_create_failed(self, error):
+        """Falha ao gravar o cofre novo"""
+        self.pending_password = None
+        self.set_busy(False)
+        QMessageBox.critical(self, "Erro", str(error))
 
 if __name__ == "__main__":
     # Teste da tela de login
@@ -1,32 +1,40 @@
+import os
 import sys
 import uuid
+from functools import partial
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                               QHBoxLayout, QLineEdit, QPushButton, QListWidget,
-                               QListWidgetItem, QMessageBox, QDialog, QFormLayout,
-                               QLabel, QTextEdit, QMenuBar, QMenu)
-from PySide6.QtCore import Qt
+                               QHBoxLayout, QLineEdit, QPushButton, QListView,
+                               QMessageBox, QDialog, QFormLayout,
+                               QLabel, QTextEdit, QMenuBar, QMenu, QFileDialog)
+from PySide6.QtCore import QFileSystemWatcher, QTimer
 from PySide6.QtGui import QFont
 from src.models.password_model import PasswordEntry, PasswordDatabase
+from src.models.search_index import SearchIndex
+from src.storage.importer import existing_keys
+from src.storage.merge import base_of
 from src.ui.theme_manager import ThemeManager
+from src.ui.persistence_service import PersistenceService
+from src.ui.worker import Worker
+from src.ui.password_list_model import PasswordListModel, PasswordFilterModel
+
+def read_changes(storage_manager, master_password, known, report):
+    """Lê o que outro processo gravou no cofre (na thread do Worker; só lê, a mescla é na interface)"""
+    return storage_manager.read_external_changes(known, master_password)
+
+def prepare_import(storage_manager, master_password, path, existing, report):
+    """Lê e criptografa a exportação (na thread do Worker); progresso em (bytes lidos, total)"""
+    return storage_manager.prepare_import(path, master_password, existing,
+                                          progress=lambda done, total: report((done, total)))
 
 class PasswordDialog(QDialog):
+    """Formulário de inclusão/edição; a janela principal mantém um só e troca a entrada com bind()"""
     def __init__(self, entry=None, parent=None):
         super().__init__(parent)
-        self.entry = entry
-        self.is_edit = entry is not None
         self.parent_window = parent
         self.setup_ui()
-
-        if self.is_edit:
-            self.load_entry_data()
-
-        # Aplicar tema do parent
-        if hasattr(parent, 'theme_manager'):
-            self.apply_theme(parent.theme_manager.get_theme())
+        self.bind(entry)
 
     def setup_ui(self):
-        title = "Editar Senha" if self.is_edit else "Nova Senha"
-        self.setWindowTitle(title)
         self.setFixedSize(400, 350)
 
         layout = QFormLayout()
@@ -55,28 +63,11 @@ class PasswordDialog(QDialog):
         # Botões
         button_layout = QHBoxLayout()
 
-        # Botão deletar (só na edição)
-        if self.is_edit:
-            self.delete_button = QPushButton("🗑️ Deletar")
-            self.delete_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #d32f2f;
-                    border: none;
-                    padding: 8px 12px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #b71c1c;
-                }
-                QPushButton:pressed {
-                    background-color: #8b0000;
-                }
-            """)
-            self.delete_button.clicked.connect(self.delete_entry)
-            button_layout.addWidget(self.delete_button)
+        # Botão deletar (visível só na edição)
+        self.delete_button = QPushButton("🗑️ Deletar")
+        self.delete_button.setObjectName("deleteButton")  # Estilo vermelho vem do tema
+        self.delete_button.clicked.connect(self.delete_entry)
+        button_layout.addWidget(self.delete_button)
 
         button_layout.addStretch()  # Espaço no meio
 
@@ -91,16 +82,31 @@ class PasswordDialog(QDialog):
         layout.addRow(button_layout)
 
         self.setLayout(layout)
+
+    def bind(self, entry=None):
+        """Prepara o formulário para editar `entry` (None = nova entrada) sem recriar widgets"""
+        self.entry = entry
+        self.is_edit = entry is not None
+        self.setWindowTitle("Editar Senha" if self.is_edit else "Nova Senha")
+        self.delete_button.setVisible(self.is_edit)
+        if self.is_edit:
+            self.load_entry_data()
+        else:
+            self.clear()
         self.title_input.setFocus()
 
-    def apply_theme(self, theme):
-        """Aplica tema ao diálogo"""
-        if hasattr(self.parent_window, 'theme_manager'):
-            style = self.parent_window.theme_manager.get_dialog_style(theme)
-            self.setStyleSheet(style)
+    def clear(self):
+        """Esvazia o formulário (a senha não fica nos campos entre uma edição e outra)"""
+        for field in (self.title_input, self.username_input, self.password_input, self.url_input):
+            field.clear()
+        self.notes_input.clear()
 
     def load_entry_data(self):
         """Carrega dados da entrada para edição"""
+        # Segredos só são descriptografados quando a entrada é aberta
+        if hasattr(self.parent_window, 'reveal_entry'):
+            self.parent_window.reveal_entry(self.entry)
+
         self.title_input.setText(self.entry.title)
         self.username_input.setText(self.entry.username)
         self.password_input.setText(self.entry.password)
@@ -154,21 +160,36 @@ class PasswordDialog(QDialog):
             )
 
 class MainWindow(QMainWindow):
-    def __init__(self, storage_manager, master_password):
+    def __init__(self, storage_manager, master_password, database=None, search_index=None,
+                 theme_manager=None):
         super().__init__()
         self.storage_manager = storage_manager
         self.master_password = master_password
-        self.database = None
-        self.filtered_entries = []
+        self.database = database
 
-        # Adicionar theme manager
-        self.theme_manager = ThemeManager()
+        # Tema aplicado à aplicação inteira (diálogos herdam sem reaplicar)
+        self.theme_manager = theme_manager or ThemeManager()
         self.theme_manager.theme_changed.connect(self.apply_theme)
 
-        self.load_database()
+        # Gravações em segundo plano (UI não bloqueia em KDF, criptografia ou disco)
+        self.persistence = PersistenceService(storage_manager, master_password, parent=self)
+        self.persistence.saved.connect(self.on_saved)
+        self.persistence.save_failed.connect(self.on_save_failed)
+
+        # Database já vem carregado do login; só carrega se não vier
+        if self.database is None:
+            self.load_database()
+        self.search_index = search_index or SearchIndex(self.database)
+        # Índice antes da lista: o filtro consulta o índice ao receber os avisos de linha
+        self.search_index.watch(self.database)
+        self.persistence.watch(self.database)
         self.setup_ui()
         self.apply_theme(self.theme_manager.get_theme())  # Aplicar tema inicial
         self.filter_entries()
+        self.watch_vault()
+        # Formulário criado uma vez, fora do caminho da primeira pintura
+        self._entry_dialog = None
+        QTimer.singleShot(0, self.entry_dialog)
 
     def setup_ui(self):
         self.setWindowTitle("Picoword Two - Gerenciador de Senhas")
@@ -177,6 +198,12 @@ class MainWindow(QMainWindow):
         # Menu bar
         menubar = self.menuBar()
 
+        # Menu Arquivo
+        file_menu = menubar.addMenu('Arquivo')
+        self.import_action = file_menu.addAction('Importar...')
+        self.import_action.triggered.connect(self.import_passwords)
+        self.import_worker = None
+
         # Menu Visualizar
         view_menu = menubar.addMenu('Visualizar')
 
@@ -197,9 +224,15 @@ class MainWindow(QMainWindow):
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
 
-        # Lista de senhas
-        self.password_list = QListWidget()
-        self.password_list.itemDoubleClicked.connect(self.edit_selected_entry)
+        # Lista de senhas (modelo + filtro; só as linhas visíveis são desenhadas)
+        self.list_model = PasswordListModel(self.database, self)
+        self.filter_model = PasswordFilterModel(self.search_index, self)
+        self.filter_model.setSourceModel(self.list_model)
+
+        self.password_list = QListView()
+        self.password_list.setModel(self.filter_model)
+        self.password_list.setUniformItemSizes(True)
+        self.password_list.doubleClicked.connect(self.edit_selected_entry)
         layout.addWidget(self.password_list)
 
         # Botões inferiores
@@ -209,6 +242,10 @@ class MainWindow(QMainWindow):
         self.edit_button.clicked.connect(self.edit_selected_entry)
         button_layout.addWidget(self.edit_button)
 
+        self.copy_button = QPushButton("Copiar Senha")
+        self.copy_button.clicked.connect(self.copy_selected_password)
+        button_layout.addWidget(self.copy_button)
+
         button_layout.addStretch()  # Espaço no meio
 
         self.add_button = QPushButton("Adicionar")
@@ -226,9 +263,8 @@ class MainWindow(QMainWindow):
         self.toggle_theme_action.setText(f"{icon} Alternar Tema")
 
     def apply_theme(self, theme):
-        """Aplica tema à janela"""
-        style = self.theme_manager.get_main_window_style(theme)
-        self.setStyleSheet(style)
+        """Aplica tema à aplicação (um único re-polish, qualquer que seja o número de janelas)"""
+        self.theme_manager.apply(theme)
 
     def load_database(self):
         """Carrega database do storage"""
@@ -237,60 +273,167 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", "Falha ao carregar database")
             sys.exit(1)
 
-        # Inicializar lista filtrada
-        self.filtered_entries = self.database.entries[:]
-
     def save_database(self):
-        """Salva database no storage"""
-        success = self.storage_manager.save_database(self.database, self.master_password)
-        if not success:
-            QMessageBox.critical(self, "Erro", "Falha ao salvar database")
+        """Agenda gravação do database completo"""
+        self.persistence.save_database(self.database)
+
+    def watch_vault(self):
+        """Observa os arquivos do cofre para incorporar gravações de outros processos"""
+        self.vault_watcher = QFileSystemWatcher(self)
+        self.vault_watcher.addPath(self.storage_manager.data_dir)
+        self._watch_vault_files()
+        # Uma gravação dispara vários avisos (temporário, rename, diário): agrupar
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(200)
+        self.reload_timer.timeout.connect(self.reload_external_changes)
+        self.vault_watcher.fileChanged.connect(self.reload_timer.start)
+        self.vault_watcher.directoryChanged.connect(self.reload_timer.start)
+        self.refresh_worker = None
+
+    def _watch_vault_files(self):
+        """(Re)adiciona os arquivos existentes; um rename remove o arquivo do observador"""
+        watched = set(self.vault_watcher.files())
+        paths = [path for path in self.storage_manager.watched_paths()
+                 if path not in watched and os.path.exists(path)]
+        if paths:
+            self.vault_watcher.addPaths(paths)
+
+    def reload_external_changes(self):
+        """Lê em segundo plano só as entradas que outro processo alterou (nada se a gravação foi nossa)"""
+        self._watch_vault_files()
+        if self.refresh_worker and self.refresh_worker.is_running():
+            self.reload_timer.start()  # Gravação durante a leitura: ler de novo depois
+            return
 
-    def refresh_list(self):
-        """Atualiza lista de senhas"""
-        self.password_list.clear()
+        # A thread recebe só as versões (id -> updated_ts), nunca o database em uso
+        self.refresh_worker = Worker(partial(read_changes, self.storage_manager, self.master_password,
+                                             base_of(self.database)), parent=self)
+        self.refresh_worker.done.connect(self.on_external_changes)
+        self.refresh_worker.start()
+
+    def on_external_changes(self, changes):
+        """Mescla no database o que a thread de recarga leu"""
+        if changes is None:  # Nada novo ou falha na leitura
+            return
+        with self.persistence.paused():
+            changed = self.storage_manager.apply_external_changes(self.database, changes)
+        if changed:
+            self.statusBar().showMessage("Cofre atualizado por outro processo", 3000)
+
+    def import_passwords(self):
+        """Importa uma exportação CSV/JSON de outro gerenciador ou navegador"""
+        if self.import_worker and self.import_worker.is_running():
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Importar senhas", "",
+                                              "Exportações (*.csv *.json);;Todos os arquivos (*)")
+        if not path:
+            return
 
-        for entry in self.filtered_entries:
-            item_text = f"{entry.title} ({entry.username})"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, entry.id)
-            self.password_list.addItem(item)
+        # Leitura e criptografia fora da thread da interface
+        self.import_worker = Worker(partial(prepare_import, self.storage_manager, self.master_password, path,
+                                            existing_keys(self.database)), parent=self)
+        self.import_worker.progress.connect(self.on_import_progress)
+        self.import_worker.done.connect(self.on_imported)
+        self.import_worker.failed.connect(self.on_import_failed)
+        self.import_action.setEnabled(False)
+        self.statusBar().showMessage("Importando...")
+        self.import_worker.start()
+
+    def on_import_progress(self, progress):
+        """Progresso da importação (bytes do arquivo)"""
+        done, total = progress
+        percent = done * 100 // total if total else 100
+        self.statusBar().showMessage(f"Importando... {percent}%")
+
+    def on_imported(self, prepared):
+        """Inclui as entradas importadas de uma vez (lista e índice reconstruídos, uma gravação)"""
+        entries, result = prepared
+        self.import_action.setEnabled(True)
+        if entries:
+            self.database.extend(entries)
+        self.statusBar().clearMessage()
+        QMessageBox.information(self, "Importação concluída",
+                                f"{result.imported} importadas\n"
+                                f"{result.duplicates} já existentes (ignoradas)\n"
+                                f"{result.skipped} sem senha ou inválidas")
+
+    def on_import_failed(self, error):
+        """Arquivo ilegível ou em formato desconhecido"""
+        self.import_action.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Erro", f"Falha ao importar\n\n{error}")
+
+    def reveal_entry(self, entry):
+        """Descriptografa senha e notas da entrada sob demanda"""
+        return self.storage_manager.reveal_entry(entry, self.master_password)
+
+    def remove_entry(self, entry):
+        """Remove entrada do database (lista, índice e gravação acompanham)"""
+        self.database.remove(entry.id)
+
+    def on_saved(self):
+        """Gravação em segundo plano concluída"""
+        self.statusBar().showMessage("Salvo", 2000)
+
+    def on_save_failed(self, message):
+        """Gravação em segundo plano falhou"""
+        QMessageBox.critical(self, "Erro", f"Falha ao salvar database\n\n{message}")
+
+    def flush_pending_saves(self):
+        """Conclui gravações pendentes (chamado ao sair)"""
+        self.reload_timer.stop()
+        if self.refresh_worker:
+            self.refresh_worker.wait()
+        self.persistence.flush()
 
     def filter_entries(self):
         """Filtra entradas baseado na pesquisa"""
-        search_text = self.search_input.text().lower()
+        self.filter_model.set_search_text(self.search_input.text())
 
-        if not search_text:
-            self.filtered_entries = self.database.entries[:]
-        else:
-            self.filtered_entries = [
-                entry for entry in self.database.entries
-                if (search_text in entry.title.lower() or
-                    search_text in entry.username.lower() or
-                    (entry.url and search_text in entry.url.lower()))
-            ]
-
-        self.refresh_list()
+    def select_entry(self, entry):
+        """Seleciona entrada na lista (se visível no filtro atual)"""
+        index = self.filter_model.index_of(entry.id)
+        if index.isValid():
+            self.password_list.setCurrentIndex(index)
+            self.password_list.scrollTo(index)
 
     def get_selected_entry(self):
         """Retorna entrada selecionada"""
-        current_item = self.password_list.currentItem()
-        if not current_item:
+        index = self.password_list.currentIndex()
+        if not index.isValid():
             return None
 
-        entry_id = current_item.data(Qt.UserRole)
-        return next((entry for entry in self.database.entries if entry.id == entry_id), None)
+        return self.filter_model.entry_at(index)
+
+    def copy_selected_password(self):
+        """Copia senha da entrada selecionada"""
+        entry = self.get_selected_entry()
+        if not entry:
+            QMessageBox.information(self, "Info", "Selecione uma senha para copiar")
+            return
+
+        self.reveal_entry(entry)
+        QApplication.clipboard().setText(entry.password)
+
+    def entry_dialog(self, entry=None):
+        """Formulário de entrada reaproveitado: só os dados mudam a cada abertura"""
+        if self._entry_dialog is None:
+            self._entry_dialog = PasswordDialog(entry, parent=self)
+        else:
+            self._entry_dialog.bind(entry)
+        return self._entry_dialog
 
     def add_new_entry(self):
         """Adiciona nova entrada"""
-        dialog = PasswordDialog(parent=self)
+        dialog = self.entry_dialog()
 
         if dialog.exec() == QDialog.Accepted:
             new_entry = dialog.get_entry_data()
             if new_entry:
-                self.database.entries.append(new_entry)
-                self.save_database()
-                self.filter_entries()  # Refresh
+                self.database.add(new_entry)
+                self.select_entry(new_entry)
+        dialog.clear()
 
     def edit_selected_entry(self):
         """Edita entrada selecionada"""
@@ -299,18 +442,16 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Info", "Selecione uma senha para editar")
             return
 
-        dialog = PasswordDialog(entry, parent=self)
+        dialog = self.entry_dialog(entry)
         result = dialog.exec()
 
         if result == QDialog.Accepted:
             # Salvar edição
             updated_entry = dialog.get_entry_data()
             if updated_entry:
-                self.save_database()
-                self.filter_entries()  # Refresh
+                self.database.update(updated_entry)
         elif result == 2:  # Código de deletar
             # Remover entrada
-            self.database.entries = [e for e in self.database.entries if e.id != entry.id]
-            self.save_database()
-            self.filter_entries()  # Refresh
+            self.remove_entry(entry)
             QMessageBox.information(self, "Sucesso", f"'{entry.title}' foi deletada")
+        dialog.clear()
@@ -0,0 +1,205 @@
+from PySide6.QtCore import QAbstractListModel, QAbstractProxyModel, QModelIndex, Qt
+from src.models.fuzzy_search import FuzzySearch
+from src.models.password_model import (PasswordDatabase, PasswordEntry, ENTRY_ABOUT_TO_BE_ADDED,
+                                       ENTRY_ADDED, ENTRY_UPDATED, ENTRY_ABOUT_TO_BE_REMOVED,
+                                       ENTRY_REMOVED, DATABASE_ABOUT_TO_BE_RESET, DATABASE_RESET)
+from src.models.search_index import SearchIndex
+
+class PasswordListModel(QAbstractListModel):
+    """Modelo de lista sobre o PasswordDatabase (só as linhas visíveis são desenhadas)"""
+    def __init__(self, database: PasswordDatabase, parent=None):
+        super().__init__(parent)
+        self.database = None
+        self.set_database(database)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.database)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        entry = self.database.entry_at(index.row())
+        if role == Qt.DisplayRole:
+            return f"{entry.title} ({entry.username})"
+        if role == Qt.UserRole:
+            return entry.id
+        return None
+
+    def entry_at(self, row: int) -> PasswordEntry:
+        """Retorna entrada da linha"""
+        return self.database.entry_at(row)
+
+    def row_of(self, entry_id: str) -> int:
+        """Retorna linha da entrada (-1 se não existir)"""
+        return self.database.row_of(entry_id)
+
+    def set_database(self, database: PasswordDatabase):
+        """Troca o database exibido"""
+        self.beginResetModel()
+        if self.database is not None:
+            self.database.unsubscribe(self._on_database_changed)
+        self.database = database
+        database.subscribe(self._on_database_changed)
+        self.endResetModel()
+
+    def _on_database_changed(self, event: str, entry):
+        """Traduz as alterações do database em avisos de linha para a view"""
+        if event == ENTRY_ABOUT_TO_BE_ADDED:
+            row = len(self.database)
+            self.beginInsertRows(QModelIndex(), row, row)
+        elif event == ENTRY_ADDED:
+            self.endInsertRows()
+        elif event == ENTRY_UPDATED:
+            index = self.index(self.database.row_of(entry.id))
+            self.dataChanged.emit(index, index)
+        elif event == ENTRY_ABOUT_TO_BE_REMOVED:
+            row = self.database.row_of(entry.id)
+            self.beginRemoveRows(QModelIndex(), row, row)
+        elif event == ENTRY_REMOVED:
+            self.endRemoveRows()
+        elif event == DATABASE_ABOUT_TO_BE_RESET:
+            self.beginResetModel()
+        elif event == DATABASE_RESET:
+            self.endResetModel()
+
+class PasswordFilterModel(QAbstractProxyModel):
+    """Mostra as entradas que casam com a pesquisa, da melhor para a pior"""
+    def __init__(self, search_index: SearchIndex, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self.search = FuzzySearch(search_index)
+        self.search_text = ""
+        self._ids = None   # ids exibidos em ordem de relevância (None = todos, na ordem do database)
+        self._rows = {}    # id -> linha exibida
+        self._removing = None
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._on_model_reset)
+
+    def set_search_text(self, text: str):
+        """Atualiza o filtro (a seleção é mantida se a entrada continuar visível)"""
+        text = text.lower()
+        if text == self.search_text:
+            return
+        self.search_text = text
+        self._refilter()
+
+    def _refilter(self):
+        """Refaz a pesquisa e reordena as linhas, remapeando índices persistentes por id"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        ids = [self.entry_at(index).id for index in persistent]
+
+        self._set_ids(self.search.search(self.search_text))
+
+        moved = []
+        for entry_id in ids:
+            new_index = self.index_of(entry_id)
+            moved.append(new_index)
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def _set_ids(self, ids):
+        self._ids = None if ids is None else list(ids)
+        self._rows = {} if ids is None else {entry_id: row for row, entry_id in enumerate(self._ids)}
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._ids is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        if self._ids is None:
+            self.endInsertRows()
+        else:
+            self._refilter()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._ids is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+
+        # Remover só as linhas visíveis, uma a uma (podem não ser contíguas aqui)
+        source = self.sourceModel()
+        rows = [self._rows[entry.id] for entry in (source.entry_at(row) for row in range(first, last + 1))
+                if entry.id in self._rows]
+        self._removing = sorted(rows, reverse=True)
+
+    def _on_rows_removed(self, parent, first, last):
+        if self._ids is None:
+            self.endRemoveRows()
+            return
+
+        for row in self._removing:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._ids[row]
+            self._rows = {entry_id: i for i, entry_id in enumerate(self._ids)}
+            self.endRemoveRows()
+        self._removing = None
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        if self._ids is None:
+            self.dataChanged.emit(self.mapFromSource(top_left), self.mapFromSource(bottom_right), list(roles or []))
+        else:
+            # Edição pode incluir, excluir ou reposicionar a entrada
+            self._refilter()
+
+    def _on_model_reset(self):
+        self.search = FuzzySearch(self.search_index)
+        self._set_ids(self.search.search(self.search_text))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        if self._ids is None:
+            return self.sourceModel().rowCount()
+        return len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < self.rowCount() or column != 0:
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        source = self.sourceModel()
+        if self._ids is None:
+            return source.index(proxy_index.row())
+        return source.index(source.row_of(self._ids[proxy_index.row()]))
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._ids is None:
+            return self.index(source_index.row())
+        entry_id = self.sourceModel().entry_at(source_index.row()).id
+        row = self._rows.get(entry_id)
+        return QModelIndex() if row is None else self.index(row)
+
+    def entry_at(self, index) -> PasswordEntry:
+        """Retorna entrada de um índice da view"""
+        return self.sourceModel().entry_at(self.mapToSource(index).row())
+
+    def index_of(self, entry_id: str):
+        """Retorna índice da view para a entrada (inválido se filtrada)"""
+        if self._ids is None:
+            return self.index(self.sourceModel().row_of(entry_id))
+        row = self._rows.get(entry_id)
+        return QModelIndex() if row is None else self.index(row)
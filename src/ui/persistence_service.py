@@ -0,0 +1,185 @@
+import copy
+import threading
+from contextlib import contextmanager
+from PySide6.QtCore import QObject, QThread, QTimer, Qt, Signal, Slot
+from src.models.password_model import (PasswordDatabase, ENTRY_ADDED, ENTRY_UPDATED,
+                                       ENTRY_REMOVED, DATABASE_RESET)
+
+class _SaveWorker(QObject):
+    """Executa gravações na thread de persistência"""
+    batch_done = Signal(bool, str)
+    full_save_needed = Signal()
+
+    def __init__(self, storage_manager, master_password):
+        super().__init__()
+        self.storage_manager = storage_manager
+        self.master_password = master_password
+        self.idle = threading.Event()
+        self.idle.set()
+        self.wants_full_save = threading.Event()  # Lote por entrada recusado, à espera de uma cópia
+
+    @Slot(object)
+    def run_batch(self, batch):
+        """Grava um lote: database completo ou alterações por entrada"""
+        full_save = False
+        try:
+            ok = True
+            if batch['database'] is not None:
+                ok = self.storage_manager.save_database(batch['database'], self.master_password)
+            elif self.storage_manager.needs_full_save():
+                # Ex: KDF desatualizado no cabeçalho do snapshot; o database em uso só
+                # é lido na thread da interface, que manda uma cópia no próximo lote
+                full_save = True
+                self.wants_full_save.set()
+            else:
+                # Só as cópias do lote: o database em uso pertence à thread da interface
+                for op, value in batch['changes'].values():
+                    ok = self.storage_manager.write_change(op, value, self.master_password) and ok
+            message = "" if ok else "Falha ao salvar database"
+        except Exception as e:
+            ok, message = False, str(e)
+
+        # Liberar antes de avisar, para o próximo lote poder ser enviado
+        self.idle.set()
+        if full_save:
+            self.full_save_needed.emit()
+        else:
+            self.batch_done.emit(ok, message)
+
+class PersistenceService(QObject):
+    """Salva em segundo plano, agrupando rajadas de alterações em uma gravação"""
+    saved = Signal()
+    save_failed = Signal(str)
+    _submit = Signal(object)
+
+    def __init__(self, storage_manager, master_password, debounce_ms: int = 300, parent=None):
+        super().__init__(parent)
+        self.storage_manager = storage_manager
+        self._database = None
+        self._changes = {}  # id -> (op, valor); a última alteração vence
+        self._full_save = False
+        self._paused = 0
+
+        # Agrupar alterações próximas em uma única gravação
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._thread = QThread()
+        self._worker = _SaveWorker(storage_manager, master_password)
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.run_batch)
+        self._worker.batch_done.connect(self._on_batch_done)
+        # Sempre pelo laço de eventos: durante o flush o lote é retomado ali mesmo
+        self._worker.full_save_needed.connect(self._dispatch, Qt.QueuedConnection)
+        self._thread.start()
+
+    def save_database(self, database: PasswordDatabase):
+        """Agenda gravação do database completo"""
+        self._database = database
+        self._full_save = True
+        self._changes.clear()  # O snapshot completo já inclui tudo
+        self._timer.start()
+
+    def save_entry(self, database: PasswordDatabase, entry):
+        """Agenda gravação de uma entrada incluída/editada"""
+        self._database = database
+        if not self._full_save:
+            # Cópia congela o estado atual; a thread não vê edições posteriores
+            self._changes[entry.id] = ('put', copy.copy(entry))
+        self._timer.start()
+
+    def delete_entry(self, database: PasswordDatabase, entry_id: str):
+        """Agenda remoção de uma entrada"""
+        self._database = database
+        if not self._full_save:
+            self._changes[entry_id] = ('delete', entry_id)
+        self._timer.start()
+
+    def watch(self, database: PasswordDatabase):
+        """Agenda gravação a cada alteração do database"""
+        database.subscribe(lambda event, entry: self._on_database_changed(database, event, entry))
+
+    @contextmanager
+    def paused(self):
+        """Ignora alterações do database no bloco (ex: ao incorporar gravações de outro processo)"""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def _on_database_changed(self, database: PasswordDatabase, event: str, entry):
+        if self._paused:
+            return
+        if event == ENTRY_ADDED or event == ENTRY_UPDATED:
+            self.save_entry(database, entry)
+        elif event == ENTRY_REMOVED:
+            self.delete_entry(database, entry.id)
+        elif event == DATABASE_RESET:
+            self.save_database(database)
+
+    def has_pending(self) -> bool:
+        """Indica se há alterações ainda não gravadas"""
+        return (self._full_save or bool(self._changes) or not self._worker.idle.is_set() or
+                self._worker.wants_full_save.is_set())
+
+    def _take_batch(self):
+        """Retira as alterações pendentes como um lote"""
+        if self._worker.wants_full_save.is_set():
+            # A thread não pôde gravar só as entradas: vai o database inteiro
+            self._worker.wants_full_save.clear()
+            self._full_save = True
+            self._changes.clear()
+        if not self._full_save and not self._changes:
+            return None
+
+        # Sem diário/SQLite, qualquer alteração exige regravar o database inteiro
+        snapshot = None
+        if self._full_save or not self.storage_manager.writes_entries():
+            snapshot = PasswordDatabase(copy.copy(entry) for entry in self._database)
+
+        batch = {'database': snapshot, 'changes': self._changes}
+        self._changes = {}
+        self._full_save = False
+        return batch
+
+    def _dispatch(self):
+        """Envia o lote pendente à thread (uma gravação por vez)"""
+        if not self._worker.idle.is_set():
+            return  # Reenviado quando a gravação atual terminar
+
+        batch = self._take_batch()
+        if batch is None:
+            return
+        self._worker.idle.clear()
+        self._submit.emit(batch)
+
+    @Slot(bool, str)
+    def _on_batch_done(self, ok: bool, message: str):
+        """Recebe resultado da thread de persistência"""
+        if ok:
+            self.saved.emit()
+        else:
+            self.save_failed.emit(message)
+
+        if not self._timer.isActive():
+            self._dispatch()
+
+    def flush(self):
+        """Grava tudo que está pendente e encerra a thread (ex: ao sair)"""
+        if not self._thread.isRunning():
+            return
+        self._timer.stop()
+        self._worker.idle.wait()
+
+        # Thread ociosa: gravar o restante aqui mesmo (de novo, se virou gravação completa)
+        batch = self._take_batch()
+        while batch is not None:
+            self._worker.idle.clear()
+            self._worker.run_batch(batch)
+            batch = self._take_batch()
+
+        self._thread.quit()
+        self._thread.wait()
@@ -1,4 +1,133 @@
+from functools import lru_cache
+from string import Template
 from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+# Cores de cada tema; o stylesheet é gerado uma vez por tema a partir delas
+PALETTES = {
+    "dark": {
+        'background': "#2b2b2b",
+        'surface': "#3c3c3c",
+        'text': "white",
+        'border': "#444",
+        'divider': "#555",
+        'menubar': "#3c3c3c",
+        'menu_border': "#555",
+    },
+    "light": {
+        'background': "#ffffff",
+        'surface': "#ffffff",
+        'text': "#000000",
+        'border': "#cccccc",
+        'divider': "#eeeeee",
+        'menubar': "#f5f5f5",
+        'menu_border': "#cccccc",
+    },
+}
+
+# Cores comuns aos dois temas
+ACCENT = {
+    'accent': "#0078d4",
+    'accent_hover': "#106ebe",
+    'accent_pressed': "#005a9e",
+    'accent_text': "white",
+    'danger': "#d32f2f",
+    'danger_hover': "#b71c1c",
+    'danger_pressed': "#8b0000",
+}
+
+# Um stylesheet para a aplicação inteira: janelas e diálogos diferem só pelos seletores
+_STYLESHEET = Template("""
+QMainWindow, QDialog, QWidget#loginWindow {
+    background-color: $background;
+    color: $text;
+}
+QLabel {
+    color: $text;
+}
+QLineEdit, QTextEdit {
+    padding: 8px;
+    border: 2px solid $border;
+    border-radius: 4px;
+    background-color: $surface;
+    color: $text;
+}
+QWidget#loginWindow QLineEdit {
+    font-size: 12px;
+}
+QWidget#loginWindow QLineEdit:focus {
+    border-color: $accent;
+}
+QListView {
+    background-color: $surface;
+    border: 2px solid $border;
+    border-radius: 4px;
+    color: $text;
+    font-size: 12px;
+}
+QListView::item {
+    padding: 8px;
+    border-bottom: 1px solid $divider;
+}
+QListView::item:selected {
+    background-color: $accent;
+    color: $accent_text;
+}
+QPushButton {
+    background-color: $accent;
+    border: none;
+    padding: 10px 20px;
+    border-radius: 4px;
+    color: $accent_text;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: $accent_hover;
+}
+QPushButton:pressed {
+    background-color: $accent_pressed;
+}
+QDialog QPushButton {
+    padding: 8px 16px;
+}
+QWidget#loginWindow QPushButton {
+    padding: 10px;
+}
+QPushButton#deleteButton {
+    background-color: $danger;
+    padding: 8px 12px;
+    font-size: 11px;
+}
+QPushButton#deleteButton:hover {
+    background-color: $danger_hover;
+}
+QPushButton#deleteButton:pressed {
+    background-color: $danger_pressed;
+}
+QMenuBar {
+    background-color: $menubar;
+    color: $text;
+    border-bottom: 1px solid $menu_border;
+}
+QMenuBar::item {
+    background-color: transparent;
+    padding: 4px 8px;
+}
+QMenuBar::item:selected, QMenu::item:selected {
+    background-color: $accent;
+    color: $accent_text;
+}
+QMenu {
+    background-color: $surface;
+    color: $text;
+    border: 1px solid $menu_border;
+}
+""")
+
+@lru_cache(maxsize=None)
+def stylesheet(theme: str) -> str:
+    """Stylesheet do tema (gerado na primeira vez, depois reaproveitado)"""
+    return _STYLESHEET.substitute(PALETTES[theme], **ACCENT)
 
 class ThemeManager(QObject):
     theme_changed = Signal(str)  # Emite "dark" ou "light"
@@ -15,7 +144,7 @@ class ThemeManager(QObject):
 
     def set_theme(self, theme):
         """Define tema específico"""
-        if theme in ["dark", "light"]:
+        if theme in PALETTES:
             self.current_theme = theme
             self.theme_changed.emit(self.current_theme)
 
@@ -23,252 +152,13 @@ class ThemeManager(QObject):
         """Retorna tema atual"""
         return self.current_theme
 
-    def get_main_window_style(self, theme):
-        """Retorna CSS para janela principal"""
-        if theme == "dark":
-            return """
-                QMainWindow {
-                    background-color: #2b2b2b;
-                    color: white;
-                }
-                QLineEdit {
-                    padding: 8px;
-                    border: 2px solid #444;
-                    border-radius: 4px;
-                    background-color: #3c3c3c;
-                    color: white;
-                }
-                QListWidget {
-                    background-color: #3c3c3c;
-                    border: 2px solid #444;
-                    border-radius: 4px;
-                    color: white;
-                    font-size: 12px;
-                }
-                QListWidget::item {
-                    padding: 8px;
-                    border-bottom: 1px solid #555;
-                }
-                QListWidget::item:selected {
-                    background-color: #0078d4;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 10px 20px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QMenuBar {
-                    background-color: #3c3c3c;
-                    color: white;
-                    border-bottom: 1px solid #555;
-                }
-                QMenuBar::item {
-                    background-color: transparent;
-                    padding: 4px 8px;
-                }
-                QMenuBar::item:selected {
-                    background-color: #0078d4;
-                }
-                QMenu {
-                    background-color: #3c3c3c;
-                    color: white;
-                    border: 1px solid #555;
-                }
-                QMenu::item:selected {
-                    background-color: #0078d4;
-                }
-            """
-        else:  # light theme
-            return """
-                QMainWindow {
-                    background-color: #ffffff;
-                    color: #000000;
-                }
-                QLineEdit {
-                    padding: 8px;
-                    border: 2px solid #cccccc;
-                    border-radius: 4px;
-                    background-color: #ffffff;
-                    color: #000000;
-                }
-                QListWidget {
-                    background-color: #ffffff;
-                    border: 2px solid #cccccc;
-                    border-radius: 4px;
-                    color: #000000;
-                    font-size: 12px;
-                }
-                QListWidget::item {
-                    padding: 8px;
-                    border-bottom: 1px solid #eeeeee;
-                }
-                QListWidget::item:selected {
-                    background-color: #0078d4;
-                    color: white;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 10px 20px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QMenuBar {
-                    background-color: #f5f5f5;
-                    color: #000000;
-                    border-bottom: 1px solid #cccccc;
-                }
-                QMenuBar::item {
-                    background-color: transparent;
-                    padding: 4px 8px;
-                }
-                QMenuBar::item:selected {
-                    background-color: #0078d4;
-                    color: white;
-                }
-                QMenu {
-                    background-color: #ffffff;
-                    color: #000000;
-                    border: 1px solid #cccccc;
-                }
-                QMenu::item:selected {
-                    background-color: #0078d4;
-                    color: white;
-                }
-            """
-
-    def get_dialog_style(self, theme):
-        """Retorna CSS para diálogos"""
-        if theme == "dark":
-            return """
-                QDialog {
-                    background-color: #2b2b2b;
-                    color: white;
-                }
-                QLineEdit, QTextEdit {
-                    padding: 8px;
-                    border: 2px solid #444;
-                    border-radius: 4px;
-                    background-color: #3c3c3c;
-                    color: white;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QLabel {
-                    color: white;
-                }
-            """
-        else:  # light theme
-            return """
-                QDialog {
-                    background-color: #ffffff;
-                    color: #000000;
-                }
-                QLineEdit, QTextEdit {
-                    padding: 8px;
-                    border: 2px solid #cccccc;
-                    border-radius: 4px;
-                    background-color: #ffffff;
-                    color: #000000;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QLabel {
-                    color: #000000;
-                }
-            """
+    def apply(self, theme=None):
+        """Aplica o tema à aplicação inteira (janelas e diálogos abertos depois já nascem com ele)
 
-    def get_login_style(self, theme):
-        """Retorna CSS para tela de login"""
-        if theme == "dark":
-            return """
-                QWidget {
-                    background-color: #2b2b2b;
-                    color: white;
-                }
-                QLineEdit {
-                    padding: 8px;
-                    border: 2px solid #444;
-                    border-radius: 4px;
-                    background-color: #3c3c3c;
-                    color: white;
-                    font-size: 12px;
-                }
-                QLineEdit:focus {
-                    border-color: #0078d4;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 10px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QPushButton:pressed {
-                    background-color: #005a9e;
-                }
-            """
-        else:  # light theme
-            return """
-                QWidget {
-                    background-color: #ffffff;
-                    color: #000000;
-                }
-                QLineEdit {
-                    padding: 8px;
-                    border: 2px solid #cccccc;
-                    border-radius: 4px;
-                    background-color: #ffffff;
-                    color: #000000;
-                    font-size: 12px;
-                }
-                QLineEdit:focus {
-                    border-color: #0078d4;
-                }
-                QPushButton {
-                    background-color: #0078d4;
-                    border: none;
-                    padding: 10px;
-                    border-radius: 4px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QPushButton:pressed {
-                    background-color: #005a9e;
-                }
-            """
+        Só troca o stylesheet se ele mudou: cada troca faz o Qt reaplicar o estilo
+        em todos os widgets, uma única vez.
+        """
+        app = QApplication.instance()
+        style = stylesheet(theme or self.current_theme)
+        if app is not None and app.styleSheet() != style:
+            app.setStyleSheet(style)
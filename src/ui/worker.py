@@ -0,0 +1,81 @@
+from typing import Callable
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+class WorkerCancelled(Exception):
+    """Tarefa cancelada pelo usuário"""
+
+class _Task(QObject):
+    """Chama a função na thread do Worker"""
+    progress = Signal(object)
+    done = Signal(object, object)  # Resultado e exceção (None = concluída)
+
+    def __init__(self, fn, report):
+        super().__init__()
+        self.fn = fn
+        self.report = report
+
+    @Slot()
+    def run(self):
+        try:
+            result = self.fn(self.report)
+        except Exception as e:
+            self.done.emit(None, e)
+            return
+        self.done.emit(result, None)
+
+class Worker(QObject):
+    """Executa `fn(report)` numa QThread, fora da thread da interface
+
+    `report(valor)` repassa o progresso pelo sinal `progress` e, depois de
+    `cancel()`, interrompe a tarefa com WorkerCancelled. O resultado chega em
+    `done`, uma exceção em `failed` e o cancelamento em `cancelled` (o resultado
+    de uma tarefa cancelada é descartado).
+    """
+    progress = Signal(object)
+    done = Signal(object)
+    failed = Signal(object)
+    cancelled = Signal()
+
+    def __init__(self, fn: Callable[[Callable[[object], None]], object], parent=None):
+        super().__init__(parent)
+        self._cancelled = False
+        self._thread = QThread()
+        self._task = _Task(fn, self._report)
+        self._task.moveToThread(self._thread)
+        self._thread.started.connect(self._task.run)
+        self._task.progress.connect(self.progress)
+        self._task.done.connect(self._on_done)
+
+    def _report(self, value):
+        """Repassa a etapa atual e interrompe se houve cancelamento (thread do Worker)"""
+        if self._cancelled:
+            raise WorkerCancelled()
+        self._task.progress.emit(value)
+
+    def start(self):
+        """Inicia a tarefa"""
+        self._thread.start()
+
+    def cancel(self):
+        """Cancela a tarefa (interrompida no próximo `report`)"""
+        self._cancelled = True
+
+    def is_running(self) -> bool:
+        return self._thread.isRunning()
+
+    def wait(self):
+        """Aguarda a tarefa em andamento (ex: ao sair)"""
+        self._thread.quit()
+        self._thread.wait()
+
+    @Slot(object, object)
+    def _on_done(self, result, error):
+        self._thread.quit()
+        self._thread.wait()
+
+        if self._cancelled:
+            self.cancelled.emit()
+        elif error is not None:
+            self.failed.emit(error)
+        else:
+            self.done.emit(result)
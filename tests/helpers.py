@@ -0,0 +1,13 @@
+from src.crypto.kdf import KdfParams, KDF_SCRYPT
+from src.models.password_model import PasswordDatabase, PasswordEntry
+
+# KDF barato: os testes abrem e regravam cofres muitas vezes
+FAST_PARAMS = KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 10)
+
+def make_database(count: int) -> PasswordDatabase:
+    """Entradas "Site i" com senha e URL próprias (usuários se repetem a cada 3)"""
+    return PasswordDatabase(
+        PasswordEntry(id=str(i), title=f"Site {i}", username=f"user{i % 3}@mail.com",
+                      password=f"senha{i}", url=f"https://site{i}.com")
+        for i in range(count)
+    )
@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.atomic import AtomicWriter, DURABILITY_BATCH, DURABILITY_NONE
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import random
+import shutil
+import subprocess
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MASTER_PASSWORD = "senha_mestre_123"
+
+# Processo filho: salva e é morto (os._exit) após escrever `limit` bytes
+CRASH_SCRIPT = """
+import os, sys
+sys.path.insert(0, sys.argv[1])
+import src.storage.atomic as atomic
+
+data_dir, mode, limit = sys.argv[2], sys.argv[3], int(sys.argv[4])
+written = [0]
+
+def crashing_write_all(f, data):
+    remaining = limit - written[0]
+    if remaining < len(data):
+        f.write(data[:max(remaining, 0)])
+        f.flush()
+        os._exit(9)
+    f.write(data)
+    written[0] += len(data)
+
+atomic._write_all = crashing_write_all
+
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordEntry
+
+storage = StorageManager(data_dir, journal_mode=(mode == "journal"))
+database = storage.load_database(sys.argv[5])
+entry = PasswordEntry(id="nova", title="Nova", username="user", password="x" * 2000)
+database.entries.append(entry)
+if mode == "journal":
+    storage.save_entry(database, entry, sys.argv[5])
+else:
+    storage.save_database(database, sys.argv[5])
+"""
+
+def make_vault(data_dir: str) -> list[str]:
+    """Cria cofre inicial e retorna os títulos salvos"""
+    storage = StorageManager(data_dir)
+    db = PasswordDatabase()
+    for i in range(20):
+        db.entries.append(PasswordEntry(id=str(i), title=f"Site {i}", username="user", password="senha"))
+    assert storage.save_database(db, MASTER_PASSWORD)
+    return [e.title for e in db.entries]
+
+def crash_writer_at(data_dir: str, mode: str, limit: int) -> int:
+    """Executa um save que é interrompido após `limit` bytes"""
+    result = subprocess.run([sys.executable, "-c", CRASH_SCRIPT, ROOT_DIR, data_dir, mode,
+                             str(limit), MASTER_PASSWORD])
+    return result.returncode
+
+def run_fault_injection(mode: str, rounds: int = 8):
+    rng = random.Random(1234)
+    for _ in range(rounds):
+        data_dir = tempfile.mkdtemp()
+        try:
+            before = make_vault(data_dir)
+            limit = rng.randint(0, os.path.getsize(os.path.join(data_dir, "passwords.encrypted")) + 64)
+            crashed = crash_writer_at(data_dir, mode, limit) == 9
+            
+            # O cofre nunca fica corrompido: ou estado antigo, ou o novo completo
+            loaded_db = StorageManager(data_dir, journal_mode=True).load_database(MASTER_PASSWORD)
+            assert loaded_db is not None, f"cofre corrompido (limite {limit})"
+            titles = [e.title for e in loaded_db.entries]
+            if crashed:
+                assert titles == before
+            else:
+                assert titles == before + ["Nova"]
+        finally:
+            shutil.rmtree(data_dir)
+
+def test_fault_injection_snapshot():
+    run_fault_injection("snapshot")
+    print("✓ Save interrompido preserva o cofre")
+
+def test_fault_injection_journal():
+    run_fault_injection("journal")
+    print("✓ Anexo interrompido preserva o cofre")
+
+def test_durability_levels():
+    data_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(data_dir, "arquivo.bin")
+        
+        writer = AtomicWriter(DURABILITY_BATCH, batch_size=3)
+        writer.write(path, b"a")
+        writer.append(path, b"b")
+        assert writer._pending_writes == 2
+        writer.append(path, b"c")
+        assert writer._pending_writes == 0  # Lote sincronizado
+        
+        AtomicWriter(DURABILITY_NONE).write(path, b"novo")
+        with open(path, 'rb') as f:
+            assert f.read() == b"novo"
+        assert not os.path.exists(path + ".tmp")
+        print("✓ Níveis de durabilidade")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_fault_injection_snapshot()
+    test_fault_injection_journal()
+    test_durability_levels()
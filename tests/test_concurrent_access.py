@@ -0,0 +1,174 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.storage.file_lock import FileLock, LockTimeout
+from src.storage.merge import base_of
+from src.storage.storage_manager import StorageManager, ENGINE_SQLITE
+from tests.helpers import FAST_PARAMS, make_database
+import shutil
+import tempfile
+
+def edit(storage: StorageManager, database: PasswordDatabase, entry_id: str, title: str,
+         password: str = "senha_mestre"):
+    entry = storage.reveal_entry(database.get(entry_id), password)
+    entry.title = title
+    entry.update_timestamp()
+    database.update(entry)
+
+def test_full_saves_merge():
+    data_dir = tempfile.mkdtemp()
+    try:
+        first = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert first.save_database(make_database(10), "senha_mestre")
+        mine = first.load_database("senha_mestre")
+        second = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        theirs = second.load_database("senha_mestre")
+
+        # Cada processo altera entradas diferentes e grava o database inteiro
+        edit(first, mine, "1", "Editada aqui")
+        mine.remove("3")
+        assert first.save_database(mine, "senha_mestre")
+        edit(second, theirs, "2", "Editada lá")
+        theirs.add(PasswordEntry(id="novo", title="Novo", username="eu", password="segredo"))
+        assert second.save_database(theirs, "senha_mestre")
+
+        loaded = StorageManager(data_dir, kdf_params=FAST_PARAMS).load_database("senha_mestre")
+        assert loaded.get("1").title == "Editada aqui" and loaded.get("2").title == "Editada lá"
+        assert "3" not in loaded and "novo" in loaded and len(loaded) == 10
+        print("✓ Gravações concorrentes mescladas sem perder entradas")
+
+        # A primeira janela incorpora só o que mudou
+        # (a gravação mesclada foi para o disco, não para o database em memória)
+        assert second.refresh_database(theirs, "senha_mestre")
+        assert theirs.get("1").title == "Editada aqui" and "3" not in theirs
+        assert first.refresh_database(mine, "senha_mestre")
+        assert mine.get("2").title == "Editada lá" and "novo" in mine and "3" not in mine
+        assert first.reveal_entry(mine.get("novo"), "senha_mestre").password == "segredo"
+        assert not first.refresh_database(mine, "senha_mestre")
+        print("✓ Recarga incorpora alterações de outro processo")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_journal_refresh_and_conflicts():
+    data_dir = tempfile.mkdtemp()
+    try:
+        first = StorageManager(data_dir, kdf_params=FAST_PARAMS, journal_mode=True)
+        assert first.save_database(make_database(10), "senha_mestre")
+        mine = first.load_database("senha_mestre")
+        second = StorageManager(data_dir, kdf_params=FAST_PARAMS, journal_mode=True)
+        theirs = second.load_database("senha_mestre")
+
+        # Só o diário cresceu: a recarga lê apenas os registros novos
+        edit(second, theirs, "4", "Pelo diário")
+        assert second.save_entry(theirs, theirs.get("4"), "senha_mestre")
+        assert second.delete_entry(theirs, "5", "senha_mestre")
+        changes, _, full = first._read_changes(base_of(mine))
+        assert not full and set(changes) == {"4", "5"}
+        assert first.refresh_database(mine, "senha_mestre")
+        assert mine.get("4").title == "Pelo diário" and "5" not in mine
+
+        # Editada dos dois lados: a edição mais recente vence
+        edit(first, mine, "6", "Antiga")
+        edit(second, theirs, "6", "Recente")
+        assert second.save_entry(theirs, theirs.get("6"), "senha_mestre")
+        assert first.save_entry(mine, mine.get("6"), "senha_mestre")
+        assert first.save_database(mine, "senha_mestre")
+        loaded = StorageManager(data_dir, kdf_params=FAST_PARAMS).load_database("senha_mestre")
+        assert loaded.get("6").title == "Recente"
+        print("✓ Recarga incremental pelo diário e conflito por entrada")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_password_change_elsewhere():
+    data_dir = tempfile.mkdtemp()
+    try:
+        first = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert first.save_database(make_database(5), "senha_antiga")
+        mine = first.load_database("senha_antiga")
+        second = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert second.change_master_password("senha_antiga", "senha_nova")
+
+        # A sessão aberta continua gravando, sem desfazer a troca de senha
+        edit(first, mine, "0", "Depois da troca", "senha_antiga")
+        assert first.save_database(mine, "senha_antiga")
+        other = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert other.load_database("senha_antiga") is None
+        assert other.load_database("senha_nova").get("0").title == "Depois da troca"
+        print("✓ Troca de senha em outro processo preservada")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_sqlite_refresh():
+    data_dir = tempfile.mkdtemp()
+    try:
+        first = StorageManager(data_dir, engine=ENGINE_SQLITE, kdf_params=FAST_PARAMS)
+        assert first.save_database(make_database(10), "senha_mestre")
+        mine = first.load_database("senha_mestre")
+        second = StorageManager(data_dir, engine=ENGINE_SQLITE, kdf_params=FAST_PARAMS)
+        theirs = second.load_database("senha_mestre")
+
+        assert not first.refresh_database(mine, "senha_mestre")
+        edit(second, theirs, "7", "Pelo SQLite")
+        assert second.save_entry(theirs, theirs.get("7"), "senha_mestre")
+        assert first.refresh_database(mine, "senha_mestre")
+        assert mine.get("7").title == "Pelo SQLite"
+        first.close()
+        second.close()
+        print("✓ Recarga de alterações no cofre SQLite")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_file_lock():
+    data_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(data_dir, "passwords.lock")
+        holder = FileLock(path)
+        waiter = FileLock(path, timeout=0.1)
+        with holder:
+            with holder:  # Reentrante
+                pass
+            try:
+                waiter.acquire()
+                assert False, "lock deveria estar ocupado"
+            except LockTimeout:
+                pass
+        with waiter:
+            pass
+        print("✓ Lock entre processos com tempo limite")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_refresh_read_apart_from_apply():
+    data_dir = tempfile.mkdtemp()
+    try:
+        first = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert first.save_database(make_database(10), "senha_mestre")
+        mine = first.load_database("senha_mestre")
+        second = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        theirs = second.load_database("senha_mestre")
+        edit(second, theirs, "2", "Editada lá")
+        theirs.remove("7")
+        assert second.save_database(theirs, "senha_mestre")
+
+        # Leitura só com as versões (como na thread de recarga); o database
+        # continua sendo alterado até a mescla
+        changes = first.read_external_changes(base_of(mine), "senha_mestre")
+        assert changes is not None
+        edit(first, mine, "4", "Editada aqui")
+        assert first.apply_external_changes(mine, changes)
+        assert mine.get("2").title == "Editada lá" and "7" not in mine
+        assert mine.get("4").title == "Editada aqui"
+        assert first.read_external_changes(base_of(mine), "senha_mestre") is None
+        print("✓ Recarga lida fora do database e mesclada depois")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_full_saves_merge()
+    test_refresh_read_apart_from_apply()
+    test_journal_refresh_and_conflicts()
+    test_password_change_elsewhere()
+    test_sqlite_refresh()
+    test_file_lock()
@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.crypto.crypto_manager import CryptoManager
+from cryptography.exceptions import InvalidTag
 
 def test_crypto():
     crypto = CryptoManager()
@@ -24,5 +25,28 @@ def test_crypto():
     assert data == decrypted
     print("✓ Criptografia funcionando")
 
+def test_batch():
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("minha_senha_mestre")
+    payloads = [f"segredo {i}".encode() for i in range(500)]
+    ids = [str(i).encode() for i in range(500)]
+    
+    # Um AAD por payload; memoryview aceito sem cópia
+    sealed = crypto.encrypt_many([memoryview(p) for p in payloads], ids)
+    assert crypto.decrypt_many(sealed, ids) == payloads
+    assert crypto.decrypt_bytes(sealed[7], ids[7]) == payloads[7]
+    
+    # Em threads: mesmo resultado, na mesma ordem
+    parallel = crypto.encrypt_many(payloads, b"cofre", workers=4)
+    assert crypto.decrypt_many(parallel, b"cofre", workers=4) == payloads
+    
+    try:
+        crypto.decrypt_many(sealed, b"outro")
+        assert False, "AAD diferente não deveria autenticar"
+    except InvalidTag:
+        pass
+    print("✓ Criptografia em lote")
+
 if __name__ == "__main__":
     test_crypto()
+    test_batch()
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from src.models.search_index import SearchIndex
+from src.models.fuzzy_search import FuzzySearch, approximate_distance
+
+def make_entry(entry_id: str, title: str, username: str, url: str = None) -> PasswordEntry:
+    return PasswordEntry(id=entry_id, title=title, username=username, password="senha", url=url)
+
+def test_approximate_distance():
+    assert approximate_distance("gmail", "meu gmail") == 0
+    assert approximate_distance("gmial", "gmail") == 1  # Transposição
+    assert approximate_distance("gmal", "gmail") == 1
+    assert approximate_distance("facebok", "facebook") == 1
+    assert approximate_distance("xyz", "gmail") == 3
+    print("✓ Distância aproximada")
+
+def test_fuzzy_search():
+    index = SearchIndex([
+        make_entry("1", "Meu Gmail", "eu", "https://mail.google.com"),
+        make_entry("2", "Gmail", "trabalho@empresa.com"),
+        make_entry("3", "Facebook", "meuuser", "https://facebook.com"),
+        make_entry("4", "Banco", "gmailuser"),
+    ])
+    search = FuzzySearch(index)
+    
+    assert search.search("") is None
+    # Prefixo de campo antes de início de palavra; título antes de usuário
+    assert search.search("gmail") == ["2", "4", "1"]
+    print("✓ Ranqueamento")
+    
+    # Erros de digitação vêm depois dos casamentos exatos
+    assert search.search("facebok") == ["3"]
+    assert search.search("gmial") == ["4", "2", "1"]  # Empate: ordem alfabética
+    assert search.search("gmi") == []  # Palavra curta demais para tolerar erro
+    print("✓ Tolerância a erros")
+    
+    # Refinamento: consulta que estende a anterior
+    assert search.search("gm") == ["2", "4", "1"]
+    assert search.search("gma") == ["2", "4", "1"]
+    index.update(make_entry("4", "Banco", "cliente"))
+    assert search.search("gmai") == ["2", "1"]  # Índice mudou: nova busca completa
+    print("✓ Refinamento incremental")
+
+if __name__ == "__main__":
+    test_approximate_distance()
+    test_fuzzy_search()
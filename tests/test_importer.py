@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase, PasswordEntry, DATABASE_RESET
+from src.storage.importer import entry_fields, read_json_rows
+from src.storage.storage_manager import StorageManager
+from tests.helpers import FAST_PARAMS
+import io
+import json
+import shutil
+import tempfile
+
+def write(data_dir: str, name: str, content: str, encoding: str = 'utf-8') -> str:
+    path = os.path.join(data_dir, name)
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(content)
+    return path
+
+def test_entry_fields():
+    # Chrome
+    fields = entry_fields({'name': 'Exemplo', 'url': 'https://exemplo.com/', 'username': 'ana',
+                           'password': 'segredo', 'note': ''})
+    assert fields == {'title': 'Exemplo', 'username': 'ana', 'password': 'segredo',
+                      'url': 'https://exemplo.com/', 'notes': None}
+    # Bitwarden (JSON aninhado), sem título: usa o host da URL
+    fields = entry_fields({'type': 1, 'login': {'username': 'bia', 'password': 'x',
+                                                'uris': [{'uri': 'https://login.site.org/entrar'}]}})
+    assert fields['title'] == 'login.site.org' and fields['url'] == 'https://login.site.org/entrar'
+    # Cabeçalhos com maiúsculas/espaços (KeePass) e linhas sem senha
+    assert entry_fields({'Account': 'Banco', 'Login Name': 'c', 'Password': 'p'})['username'] == 'c'
+    assert entry_fields({'name': 'Nota segura', 'notes': 'texto'}) is None
+    assert entry_fields(['não', 'é', 'objeto']) is None
+    print("✓ Colunas de várias exportações mapeadas para PasswordEntry")
+
+def test_json_stream_small_chunks():
+    items = [{'name': f"Site {i}", 'password': f"p{i}", 'n': 12345.678} for i in range(50)]
+    text = json.dumps({'encrypted': False, 'folders': [{'id': 1}], 'items': items, 'fim': [1, 2]})
+    # Blocos minúsculos: valores, números e chaves cortados entre leituras
+    assert list(read_json_rows(io.StringIO(text), chunk_size=7)) == items
+    assert list(read_json_rows(io.StringIO(json.dumps(items)))) == items
+    assert list(read_json_rows(io.StringIO("[]"))) == []
+    print("✓ JSON lido em fluxo (array no topo ou em \"items\")")
+
+def test_import_file():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        database = PasswordDatabase([PasswordEntry(id="a", title="Exemplo", username="Ana",
+                                                   password="antiga", url="https://exemplo.com/")])
+        assert storage.save_database(database, "senha_mestre")
+        events = []
+        database.subscribe(lambda event, entry: events.append(event))
+
+        # CSV com BOM, campos entre aspas e quebra de linha, duplicata e linha sem senha
+        csv_path = write(data_dir, "chrome.csv",
+                         "name,url,username,password,note\n"
+                         "Exemplo,https://EXEMPLO.com,ana,nova,\n"
+                         "Novo,https://novo.com,bia,\"a,b\",\"linha 1\nlinha 2\"\n"
+                         "Novo de novo,https://novo.com,BIA,outra,\n"
+                         "Sem senha,https://x.com,c,,\n", encoding='utf-8-sig')
+        progress = []
+        result = storage.import_file(database, csv_path, "senha_mestre",
+                                     lambda done, total: progress.append((done, total)))
+        assert result == (1, 2, 1)
+        assert progress[-1][0] == progress[-1][1] == os.path.getsize(csv_path)
+        assert events.count(DATABASE_RESET) == 1 and len(database) == 2
+
+        imported = next(entry for entry in database if entry.title == "Novo")
+        assert imported.is_sealed  # Segredos já criptografados na importação
+        storage.reveal_entry(imported, "senha_mestre")
+        assert imported.password == "a,b" and imported.notes == "linha 1\nlinha 2"
+
+        # Exportação do próprio app preserva as datas
+        own = PasswordDatabase([PasswordEntry(id="z", title="Própria", username="eu", password="p",
+                                              created_at="2020-01-02T03:04:05")])
+        result = storage.import_file(database, write(data_dir, "own.json", own.to_json()), "senha_mestre")
+        assert result == (1, 0, 0)
+
+        loaded = StorageManager(data_dir, kdf_params=FAST_PARAMS).load_database("senha_mestre")
+        assert len(loaded) == 3
+        assert next(entry for entry in loaded if entry.title == "Própria").created_at == "2020-01-02T03:04:05"
+        assert storage.reveal_entry(loaded.get("a"), "senha_mestre").password == "antiga"
+
+        # Arquivo inválido: nada muda
+        assert storage.import_file(database, write(data_dir, "ruim.json", "{\"items\": [1,"), "senha_mestre") is None
+        assert len(database) == 3
+        print("✓ Importação com deduplicação e uma única gravação")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_entry_fields()
+    test_json_stream_small_chunks()
+    test_import_file()
@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import uuid
+import shutil
+import tempfile
+
+def make_entry(title: str) -> PasswordEntry:
+    return PasswordEntry(
+        id=str(uuid.uuid4()),
+        title=title,
+        username="user@test.com",
+        password="senha123"
+    )
+
+def test_journal():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, journal_mode=True)
+        master_password = "senha_mestre_123"
+        
+        db = PasswordDatabase()
+        first = make_entry("Primeira")
+        db.entries.append(first)
+        assert storage.save_database(db, master_password)
+        snapshot_size = os.path.getsize(storage.db_file)
+        
+        # Inclusão, edição e remoção viram registros no diário
+        second = make_entry("Segunda")
+        db.entries.append(second)
+        assert storage.save_entry(db, second, master_password)
+        first.title = "Editada"
+        assert storage.save_entry(db, first, master_password)
+        db.entries.remove(second)
+        assert storage.delete_entry(db, second.id, master_password)
+        
+        assert os.path.getsize(storage.db_file) == snapshot_size
+        assert storage.journal.record_count == 3
+        print("✓ Alterações gravadas no diário")
+        
+        # Carregar reaplica o diário sobre o snapshot
+        loaded_db = StorageManager(data_dir, journal_mode=True).load_database(master_password)
+        assert [e.title for e in loaded_db.entries] == ["Editada"]
+        print("✓ Diário reaplicado")
+        
+        # Registro final incompleto é descartado
+        with open(storage.journal.path, 'ab') as f:
+            f.write(b"gAAAAA-incompleto")
+        loaded_db = StorageManager(data_dir, journal_mode=True).load_database(master_password)
+        assert [e.title for e in loaded_db.entries] == ["Editada"]
+        print("✓ Registro incompleto descartado")
+        
+        # Entrada que não serializa: falha informada, nada gravado
+        broken = make_entry("Quebrada")
+        broken.created_ts = 10 ** 20  # Fora do intervalo de datas
+        count = storage.journal.record_count
+        assert storage.write_change('put', broken, master_password) is False
+        assert storage.journal.record_count == count
+        print("✓ Falha ao serializar informada sem exceção")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_compaction():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, journal_mode=True, compact_max_records=5)
+        master_password = "senha_mestre_123"
+        
+        db = PasswordDatabase()
+        assert storage.save_database(db, master_password)
+        
+        for i in range(12):
+            entry = make_entry(f"Site {i}")
+            db.entries.append(entry)
+            assert storage.save_entry(db, entry, master_password)
+        storage.wait_for_compaction()
+        
+        assert storage.journal.record_count < 12
+        loaded_db = StorageManager(data_dir, journal_mode=True).load_database(master_password)
+        assert [e.title for e in loaded_db.entries] == [f"Site {i}" for i in range(12)]
+        print("✓ Compactação preserva entradas")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_journal()
+    test_compaction()
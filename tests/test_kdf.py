@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.kdf import (KdfParams, KeySlot, LEGACY_PARAMS, KDF_PBKDF2, KDF_SCRYPT,
+                            available_algorithms, calibrate, new_vault_key)
+from src.crypto.crypto_manager import CryptoManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.storage.storage_manager import StorageManager
+from src.storage.vault_format import read_key_slot
+from tests.helpers import FAST_PARAMS
+import shutil
+import tempfile
+
+def test_key_slot():
+    key = new_vault_key()
+    slot = KeySlot.create("senha_mestre", key, FAST_PARAMS)
+    assert slot.open("senha_mestre") == key
+
+    # Cabeçalho serializado
+    parsed = KeySlot.from_bytes(slot.to_bytes())
+    assert parsed == slot and parsed.open("senha_mestre") == key
+
+    try:
+        slot.open("senha_errada")
+        assert False, "Senha errada não deveria abrir a chave"
+    except ValueError:
+        pass
+    print("✓ Chave do cofre protegida pela senha")
+
+def test_kdf_params():
+    salt = os.urandom(16)
+    # Parâmetros antigos continuam gerando a mesma chave do CryptoManager
+    legacy_key = CryptoManager().generate_key_from_password("senha", salt)
+    assert CryptoManager().generate_key_from_password("senha", salt, LEGACY_PARAMS) == legacy_key
+
+    for algorithm in available_algorithms():
+        params = calibrate(algorithm, 0.01)  # Alvo baixo: fica no mínimo
+        assert params.algorithm == algorithm
+        assert len(params.derive("senha", salt)) == 32
+    assert calibrate(KDF_PBKDF2, 0.01).time_cost >= LEGACY_PARAMS.time_cost
+
+    assert LEGACY_PARAMS.weaker_than(FAST_PARAMS)
+    assert not FAST_PARAMS.weaker_than(FAST_PARAMS)
+    assert KdfParams(KDF_SCRYPT, 8, 2 ** 10).weaker_than(KdfParams(KDF_SCRYPT, 8, 2 ** 12))
+    print("✓ KDFs e calibração")
+
+def test_legacy_rekey():
+    data_dir = tempfile.mkdtemp()
+    try:
+        master_password = "senha_mestre_123"
+        db = PasswordDatabase()
+        db.add(PasswordEntry(id="1", title="Site", username="user", password="senha1"))
+
+        # Cofre antigo: token Fernet com o JSON, chave derivada do salt.bin
+        storage = StorageManager(data_dir, journal_mode=True)
+        salt = os.urandom(16)
+        with open(storage.salt_file, 'wb') as f:
+            f.write(salt)
+        storage.crypto.generate_key_from_password(master_password, salt)
+        legacy_key = storage.crypto.key
+        with open(storage.db_file, 'wb') as f:
+            f.write(storage.crypto.encrypt_data(db.to_json()))
+
+        # Convertido ao abrir: chave nova protegida pelo KDF atual, salt.bin removido
+        storage = StorageManager(data_dir, journal_mode=True, kdf_params=FAST_PARAMS)
+        loaded = storage.load_database(master_password)
+        assert storage.session.key != legacy_key
+        assert not os.path.exists(storage.salt_file)
+        with open(storage.db_file, 'rb') as f:
+            assert read_key_slot(f).params == FAST_PARAMS
+
+        # Alterações seguintes já vão para o diário
+        entry = PasswordEntry(id="2", title="Outro", username="user2", password="senha2")
+        loaded.add(entry)
+        assert storage.save_entry(loaded, entry, master_password)
+        assert storage.journal.record_count == 1
+
+        other = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        reloaded = other.load_database(master_password)
+        assert other.reveal_entry(reloaded.get("1"), master_password).password == "senha1"
+        assert other.reveal_entry(reloaded.get("2"), master_password).password == "senha2"
+        assert StorageManager(data_dir).load_database("senha_errada") is None
+        print("✓ Cofre antigo convertido com chave nova ao abrir")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_key_slot()
+    test_kdf_params()
+    test_legacy_rekey()
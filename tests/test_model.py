@@ -2,7 +2,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.models.password_model import PasswordEntry, PasswordDatabase
+from src.models.password_model import (PasswordEntry, PasswordDatabase, ENTRY_ABOUT_TO_BE_ADDED,
+                                       ENTRY_ADDED, ENTRY_UPDATED, ENTRY_ABOUT_TO_BE_REMOVED, ENTRY_REMOVED,
+                                       now_timestamp, parse_timestamp, format_timestamp)
+import time
 import uuid
 
 def test_model():
@@ -37,5 +40,83 @@ def test_model():
     assert db_restored.entries[0].title == "Gmail"
     print("✓ Database funcionando")
 
+def test_database_collection():
+    db = PasswordDatabase()
+    events = []
+    db.subscribe(lambda event, entry: events.append((event, entry and entry.id)))
+    
+    for i in range(5):
+        db.add(PasswordEntry(id=str(i), title=f"Site {i}", username="user", password="senha"))
+    assert len(db) == 5
+    assert db.get("3").title == "Site 3"
+    assert db.get("x") is None
+    assert "4" in db
+    
+    # Id repetido não entra duas vezes
+    try:
+        db.add(PasswordEntry(id="1", title="Outro", username="user", password="senha"))
+        assert False, "Deveria ter falhado"
+    except ValueError:
+        pass
+    
+    # Atualização mantém a posição; remoção preserva a ordem das demais
+    db.update(PasswordEntry(id="1", title="Editado", username="user", password="senha"))
+    assert db.remove("2").title == "Site 2"
+    assert db.remove("2") is None
+    assert [e.id for e in db] == ["0", "1", "3", "4"]
+    assert db.entry_at(1).title == "Editado"
+    assert db.row_of("4") == 3
+    assert db.row_of("2") == -1
+    print("✓ Coleção por id")
+    
+    assert events[:2] == [(ENTRY_ABOUT_TO_BE_ADDED, "0"), (ENTRY_ADDED, "0")]
+    assert events[-3:] == [(ENTRY_UPDATED, "1"), (ENTRY_ABOUT_TO_BE_REMOVED, "2"), (ENTRY_REMOVED, "2")]
+    print("✓ Notificações de alteração")
+
+def test_compact_entry():
+    entry = PasswordEntry(id="1", title="Site", username="".join(["meu@", "email.com"]), password="senha",
+                          created_at="2024-05-01T10:30:00.123456")
+    other = PasswordEntry(id="2", title="Outro", username="meu@email.com", password="senha")
+    
+    # Sem __dict__; valores repetidos compartilhados
+    assert not hasattr(entry, '__dict__')
+    assert entry.username is other.username
+    
+    # Datas em inteiros, lidas e gravadas como ISO
+    assert isinstance(entry.created_ts, int)
+    assert entry.created_at == "2024-05-01T10:30:00.123456"
+    assert entry.updated_at == entry.created_at
+    entry.update_timestamp()
+    assert entry.updated_ts > entry.created_ts
+    assert entry.to_dict()['created_at'] == "2024-05-01T10:30:00.123456"
+    assert PasswordEntry.from_dict(entry.to_dict()) == entry
+    print("✓ Entrada compacta")
+
+def test_utc_timestamps():
+    assert abs(now_timestamp() - time.time() * 1_000_000) < 1_000_000
+    old_tz = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    try:
+        # Mesmo instante em fusos diferentes
+        assert parse_timestamp("2024-05-01T12:00:00+00:00") == parse_timestamp("2024-05-01T09:00:00-03:00")
+        # Hora repetida no fim do horário de verão: a edição posterior continua maior
+        first = parse_timestamp("2024-11-03T01:50:00-04:00")
+        second = parse_timestamp("2024-11-03T01:10:00-05:00")
+        assert second > first
+        # Datas ISO sem fuso (formato antigo) são horário local, e voltam como tal
+        assert parse_timestamp("2024-05-01T08:00:00") == parse_timestamp("2024-05-01T12:00:00+00:00")
+        assert format_timestamp(parse_timestamp("2024-05-01T08:00:00")) == "2024-05-01T08:00:00"
+    finally:
+        if old_tz is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = old_tz
+        time.tzset()
+    print("✓ Datas em UTC")
+
 if __name__ == "__main__":
     test_model()
+    test_database_collection()
+    test_compact_entry()
+    test_utc_timestamps()
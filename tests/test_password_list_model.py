@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QPersistentModelIndex, Qt
+from src.ui.password_list_model import PasswordListModel, PasswordFilterModel
+from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.models.search_index import SearchIndex
+
+def make_database(count: int) -> PasswordDatabase:
+    db = PasswordDatabase()
+    for i in range(count):
+        db.entries.append(PasswordEntry(
+            id=str(i),
+            title=f"Site {i}",
+            username=f"user{i}",
+            password="senha",
+            url=f"https://site{i}.com"
+        ))
+    return db
+
+def test_password_list_model():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    db = make_database(20)
+    index = SearchIndex(db)
+    index.watch(db)
+    model = PasswordListModel(db)
+    proxy = PasswordFilterModel(index)
+    proxy.setSourceModel(model)
+    
+    assert proxy.rowCount() == 20
+    assert proxy.data(proxy.index(0, 0)) == "Site 0 (user0)"
+    
+    # Filtro por título, usuário ou URL
+    proxy.set_search_text("SITE1")
+    assert [proxy.entry_at(proxy.index(r, 0)).id for r in range(proxy.rowCount())] == ["1"] + [str(i) for i in range(10, 20)]
+    proxy.set_search_text("site 13")
+    assert proxy.entry_at(proxy.index(0, 0)).id == "13"  # Melhor casamento primeiro
+    proxy.set_search_text("user3")
+    assert proxy.entry_at(proxy.index(0, 0)).id == "3"
+    print("✓ Filtro funcionando")
+    
+    # Atualizações incrementais mantêm índices persistentes (seleção)
+    proxy.set_search_text("")
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    db.add(PasswordEntry(id="novo", title="Novo", username="novo", password="senha"))
+    assert inserted == [(20, 20)]
+    assert db.entry_at(20).id == "novo"
+    
+    selected = proxy.index_of("15")
+    persistent = QPersistentModelIndex(proxy.mapToSource(selected))
+    db.remove("3")
+    assert model.data(persistent, Qt.UserRole) == "15"
+    assert "3" not in db
+    
+    # Edição reaplica o filtro e mantém a seleção pelo id
+    proxy.set_search_text("gmail")
+    assert proxy.rowCount() == 0
+    entry = db.get("15")
+    entry.title = "Gmail"
+    db.update(entry)
+    assert proxy.rowCount() == 1
+    
+    selected = QPersistentModelIndex(proxy.index_of("15"))
+    proxy.set_search_text("gmial")  # Erro de digitação ainda encontra
+    assert proxy.rowCount() == 1
+    assert proxy.data(selected, Qt.UserRole) == "15"
+    
+    # Remoção durante o filtro tira só a linha correspondente
+    db.remove("15")
+    assert proxy.rowCount() == 0
+    assert not selected.isValid()
+    print("✓ Atualizações incrementais")
+
+if __name__ == "__main__":
+    test_password_list_model()
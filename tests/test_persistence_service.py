@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+from src.ui.persistence_service import PersistenceService
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+from src.crypto.kdf import KdfParams, KDF_SCRYPT
+from src.storage.vault_format import read_key_slot
+import shutil
+import tempfile
+
+def wait_for(signal, timeout_ms: int = 5000):
+    """Processa eventos até o signal ser emitido"""
+    loop = QEventLoop()
+    signal.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(loop.quit)
+
+def test_persistence_service():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, journal_mode=True)
+        master_password = "senha_mestre_123"
+        db = PasswordDatabase()
+        assert storage.save_database(db, master_password)
+        
+        service = PersistenceService(storage, master_password, debounce_ms=50)
+        saved = []
+        service.saved.connect(lambda: saved.append(True))
+        
+        # Rajada de alterações vira uma gravação (a última versão vence)
+        entry = PasswordEntry(id="1", title="Primeira", username="user", password="senha")
+        db.entries.append(entry)
+        for i in range(10):
+            entry.title = f"Versão {i}"
+            service.save_entry(db, entry)
+        assert service.has_pending()
+        wait_for(service.saved)
+        
+        assert len(saved) == 1
+        assert storage.journal.record_count == 1
+        loaded_db = StorageManager(data_dir, journal_mode=True).load_database(master_password)
+        assert [e.title for e in loaded_db.entries] == ["Versão 9"]
+        print("✓ Rajada agrupada em uma gravação")
+        
+        # flush grava pendências antes de sair
+        db.entries.remove(entry)
+        service.delete_entry(db, entry.id)
+        service.flush()
+        assert not service.has_pending()
+        loaded_db = StorageManager(data_dir, journal_mode=True).load_database(master_password)
+        assert loaded_db.entries == []
+        print("✓ flush grava pendências")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_outdated_key_slot_saves_copy():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    data_dir = tempfile.mkdtemp()
+    try:
+        master_password = "senha_mestre_123"
+        weak = KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 10)
+        strong = KdfParams(KDF_SCRYPT, time_cost=8, memory_cost=2 ** 11)
+        assert StorageManager(data_dir, journal_mode=True, kdf_params=weak).save_database(PasswordDatabase(), master_password)
+        
+        # KDF mais fraco que o alvo: a thread recusa o lote por entrada e o
+        # database inteiro é regravado a partir de uma cópia
+        storage = StorageManager(data_dir, journal_mode=True, kdf_params=strong)
+        db = storage.load_database(master_password)
+        service = PersistenceService(storage, master_password, debounce_ms=50)
+        db.add(PasswordEntry(id="1", title="Site", username="user", password="senha"))
+        service.save_entry(db, db.get("1"))
+        wait_for(service.saved)
+        assert storage.journal.record_count == 0
+        with open(storage.db_file, 'rb') as f:
+            assert read_key_slot(f).params == strong
+        
+        # Já atualizado: volta a gravar só a entrada
+        db.add(PasswordEntry(id="2", title="Outro", username="user", password="senha"))
+        service.save_entry(db, db.get("2"))
+        service.flush()
+        assert storage.journal.record_count == 1
+        loaded = StorageManager(data_dir, journal_mode=True, kdf_params=strong).load_database(master_password)
+        assert sorted(entry.id for entry in loaded) == ["1", "2"]
+        print("✓ KeySlot desatualizado regravado a partir de uma cópia")
+        
+        # Também no flush, sem passar pelo laço de eventos
+        storage = StorageManager(data_dir, journal_mode=True, kdf_params=KdfParams(KDF_SCRYPT, 8, 2 ** 12))
+        db = storage.load_database(master_password)
+        service = PersistenceService(storage, master_password, debounce_ms=50)
+        db.remove("1")
+        service.delete_entry(db, "1")
+        service.flush()
+        assert not service.has_pending()
+        loaded = StorageManager(data_dir, journal_mode=True, kdf_params=strong).load_database(master_password)
+        assert "1" not in loaded and storage.journal.record_count == 0
+        print("✓ flush regrava o database quando a thread recusa o lote")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_persistence_service()
+    test_outdated_key_slot_saves_copy()
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from src.storage.storage_manager import StorageManager
+from tests.helpers import FAST_PARAMS, make_database
+import shutil
+import struct
+import tempfile
+
+class Interrupted(Exception):
+    pass
+
+def test_change_master_password():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert storage.save_database(make_database(3000), "senha_antiga")  # 3 blocos
+        database = storage.load_database("senha_antiga")
+
+        # Só a senha: a chave do cofre continua, entradas carregadas seguem válidas
+        stages = []
+        assert storage.change_master_password("senha_antiga", "senha_nova", progress=stages.append)
+        assert stages[-1] == "Recriptografando... 3 de 3 blocos"
+        assert storage.reveal_entry(database.get("10"), "senha_nova").password == "senha10"
+
+        other = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert other.load_database("senha_antiga") is None
+        assert len(other.load_database("senha_nova")) == 3000
+        assert not storage.change_master_password("senha_errada", "outra")
+        print("✓ Senha mestre trocada")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_resume_key_rotation():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, journal_mode=True, kdf_params=FAST_PARAMS)
+        database = make_database(3000)
+        assert storage.save_database(database, "senha_antiga")
+        entry = PasswordEntry(id="novo", title="Novo", username="user", password="segredo")
+        database.add(entry)
+        assert storage.save_entry(database, entry, "senha_antiga")
+
+        # Interrompida depois do primeiro bloco
+        def interrupt(stage):
+            if stage.startswith("Recriptografando... 1 "):
+                raise Interrupted()
+        assert not storage.change_master_password("senha_antiga", "senha_nova", rotate_key=True, progress=interrupt)
+        assert os.path.exists(storage.db_file + ".rekey")
+        assert StorageManager(data_dir, kdf_params=FAST_PARAMS).load_database("senha_antiga") is not None
+        # Queda no meio da gravação do bloco seguinte: cabeçalho e parte dos dados
+        with open(storage.db_file + ".rekey", 'ab') as f:
+            f.write(struct.pack('<BI', 0, 4096) + os.urandom(100))
+
+        # Nova chamada continua do bloco seguinte
+        stages = []
+        storage = StorageManager(data_dir, journal_mode=True, kdf_params=FAST_PARAMS)
+        assert storage.change_master_password("senha_antiga", "senha_nova", rotate_key=True, progress=stages.append)
+        assert stages[0] == "Recriptografando... 1 de 3 blocos"
+        assert not os.path.exists(storage.db_file + ".rekey")
+
+        other = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        loaded = other.load_database("senha_nova")
+        assert len(loaded) == 3001
+        assert other.reveal_entry(loaded.get("novo"), "senha_nova").password == "segredo"
+        assert other.reveal_entry(loaded.get("2999"), "senha_nova").password == "senha2999"
+        print("✓ Troca de chave retomada após interrupção")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_change_master_password()
+    test_resume_key_rotation()
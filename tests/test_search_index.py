@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from src.models.search_index import SearchIndex
+
+def make_entry(entry_id: str, title: str, username: str, url: str = None) -> PasswordEntry:
+    return PasswordEntry(id=entry_id, title=title, username=username, password="senha", url=url)
+
+def test_search_index():
+    index = SearchIndex([
+        make_entry("1", "Gmail", "eu@gmail.com", "https://mail.google.com"),
+        make_entry("2", "Facebook", "meuuser", "https://facebook.com"),
+        make_entry("3", "Banco", "cliente123"),
+    ])
+    
+    assert index.search("") is None
+    assert set(index.search("GMAIL")) == {"1"}
+    assert set(index.search("book")) == {"2"}
+    assert set(index.search(".com")) == {"1", "2"}
+    assert set(index.search("e1")) == {"3"}  # Consulta curta (lista do próprio trecho)
+    assert set(index.search("3")) == {"3"}    # Último caractere do texto
+    assert set(index.search("k")) == {"2"}
+    assert set(index.search("xyz")) == set()
+    # Campos não se emendam: título + usuário não formam substring
+    assert set(index.search("bancocli")) == set()
+    print("✓ Busca por substring")
+    
+    # Atualização incremental
+    index.update(make_entry("2", "Instagram", "meuuser"))
+    assert set(index.search("book")) == set()
+    assert set(index.search("insta")) == {"2"}
+    index.remove("1")
+    assert set(index.search("gmail")) == set()
+    assert set(index.search("gm")) == set()
+    assert len(index) == 2
+    assert index.entry_matches("2", "gram")
+    print("✓ Índice incremental")
+    
+    # Lista da consulta curta, montada no primeiro uso, acompanha as alterações
+    assert set(index.search("ag")) == {"2"}
+    index.add(make_entry("4", "Magalu", "vendas"))
+    assert set(index.search("ag")) == {"2", "4"}
+    assert index.word_frequency("vendas") == 1
+    index.add(make_entry("5", "Loja", "vendas"))
+    assert index.word_frequency("vendas") == 2
+    assert set(entry_id for entry_id, _ in index.entries_with_word("vendas")) == {"4", "5"}
+    index.remove("4")
+    assert set(index.search("ag")) == {"2"}
+    print("✓ Consultas curtas e palavras acompanham as alterações")
+
+def test_search_index_rebuild():
+    index = SearchIndex(make_entry(str(i), f"Site {i}", "user") for i in range(3000))
+    for i in range(2000):
+        index.remove(str(i))
+    assert len(index) == 1000
+    assert set(index.search("site 2999")) == {"2999"}
+    assert set(index.search("site 1")) == set()
+    print("✓ Reconstrução descarta removidos")
+
+if __name__ == "__main__":
+    test_search_index()
+    test_search_index_rebuild()
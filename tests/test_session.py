@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.session import VaultSession
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import uuid
+import shutil
+import tempfile
+
+def test_session():
+    session = VaultSession()
+    salt = os.urandom(16)
+    
+    # Desbloquear deriva a chave uma vez
+    key = session.unlock("senha_mestre", salt)
+    assert session.is_unlocked()
+    assert session.matches("senha_mestre", salt)
+    assert not session.matches("outra_senha", salt)
+    assert not session.matches("senha_mestre", os.urandom(16))
+    assert session.unlock("senha_mestre", salt) == key
+    print("✓ Sessão reutiliza chave")
+    
+    # Bloquear zera a chave
+    buffer = session._key
+    session.lock()
+    assert not session.is_unlocked()
+    assert all(b == 0 for b in buffer)
+    print("✓ Bloqueio zera chave")
+    
+    # Expiração
+    session = VaultSession(timeout=0)
+    session.unlock("senha_mestre", salt)
+    assert not session.is_unlocked()
+    print("✓ Sessão expira")
+
+def test_storage_session():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir)
+        master_password = "senha_mestre_123"
+        
+        db = PasswordDatabase()
+        db.entries.append(PasswordEntry(
+            id=str(uuid.uuid4()),
+            title="Teste",
+            username="user@test.com",
+            password="senha123"
+        ))
+        
+        assert storage.save_database(db, master_password)
+        key = storage.session.key
+        assert storage.save_database(db, master_password)
+        assert storage.session.key == key
+        
+        # Outra instância (novo processo) consegue ler
+        other = StorageManager(data_dir)
+        loaded_db = other.load_database(master_password)
+        assert loaded_db is not None
+        assert loaded_db.entries[0].title == "Teste"
+        
+        # Senha errada bloqueia sessão
+        assert other.load_database("senha_errada") is None
+        assert not other.session.is_unlocked()
+        print("✓ Storage usa sessão")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_session()
+    test_storage_session()
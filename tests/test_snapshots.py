@@ -0,0 +1,155 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordDatabase
+from src.storage.snapshots import SnapshotInfo, _retained
+from src.storage.storage_manager import StorageManager, ENGINE_SQLITE
+from tests.helpers import FAST_PARAMS, make_database
+import shutil
+import tempfile
+
+def edit(storage: StorageManager, database: PasswordDatabase, entry_id: str, title: str):
+    entry = storage.reveal_entry(database.get(entry_id), "senha_mestre")
+    entry.title = title
+    entry.update_timestamp()
+    database.update(entry)
+
+def packs(storage: StorageManager) -> list[str]:
+    return sorted(os.listdir(storage.snapshots.packs_dir))
+
+def test_snapshots_store_only_changes():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        database = make_database(600)  # Vários grupos
+        assert storage.save_database(database, "senha_mestre")
+        first = storage.create_snapshot("senha_mestre", "inicial")
+        assert first is not None and len(packs(storage)) == 1
+
+        # Nada mudou: só o manifesto
+        assert storage.create_snapshot("senha_mestre") is not None
+        assert len(packs(storage)) == 1
+
+        # Uma entrada alterada: um pack novo com a entrada e o grupo dela
+        edit(storage, database, "7", "Alterada")
+        assert storage.save_database(database, "senha_mestre")
+        latest = storage.create_snapshot("senha_mestre")
+        new_pack = packs(storage)
+        assert len(new_pack) == 2
+        objects = [list(storage.snapshots._scan_pack(name)) for name in new_pack]
+        assert sorted(len(pack) for pack in objects) == [2, 600 + 4]
+
+        old = storage.load_snapshot(first, "senha_mestre")
+        assert len(old) == 600 and old.get("7").title == "Site 7"
+        assert storage.reveal_entry(old.get("7"), "senha_mestre").password == "senha7"
+        assert storage.load_snapshot(latest, "senha_mestre").get("7").title == "Alterada"
+        assert [info.label for info in storage.list_snapshots()] == ["inicial", None, None]
+        print("✓ Snapshots repetidos gravam só as entradas alteradas")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_restore_and_export():
+    data_dir = tempfile.mkdtemp()
+    other_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, engine=ENGINE_SQLITE, kdf_params=FAST_PARAMS)
+        database = make_database(20)
+        assert storage.save_database(database, "senha_mestre")
+        snapshot_id = storage.create_snapshot("senha_mestre")
+        database.remove("3")
+        assert storage.save_database(database, "senha_mestre")
+
+        restored = storage.restore_snapshot(snapshot_id, "senha_mestre")
+        assert restored is not None and "3" in restored
+        assert "3" in storage.load_database("senha_mestre")
+        assert storage.list_snapshots()[-1].label == "Antes de restaurar"
+
+        # Arquivo único no formato do cofre: abre em outra pasta com a mesma senha
+        export_path = os.path.join(other_dir, "passwords.encrypted")
+        assert storage.export_vault(export_path, "senha_mestre", snapshot_id)
+        exported = StorageManager(other_dir, kdf_params=FAST_PARAMS).load_database("senha_mestre")
+        assert len(exported) == 20
+        storage.close()
+        print("✓ Restauração de snapshot e exportação portátil")
+    finally:
+        shutil.rmtree(data_dir)
+        shutil.rmtree(other_dir)
+
+def test_restore_after_key_change():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert storage.save_database(make_database(10), "senha_antiga")
+        snapshot_id = storage.create_snapshot("senha_antiga")
+        assert storage.change_master_password("senha_antiga", "senha_mestre", rotate_key=True)
+
+        # Chave do cofre trocada: o snapshot abre com a senha de então
+        assert storage.load_snapshot(snapshot_id, "senha_mestre") is None
+        loaded = storage.load_snapshot(snapshot_id, "senha_mestre", snapshot_password="senha_antiga")
+        assert storage.reveal_entry(loaded.get("2"), "senha_mestre").password == "senha2"
+
+        # Cofre perdido: restaurado só a partir dos backups, com a senha atual
+        os.remove(storage.db_file)
+        fresh = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert fresh.restore_snapshot(snapshot_id, "nova", snapshot_password="senha_antiga") is not None
+        reopened = StorageManager(data_dir, kdf_params=FAST_PARAMS).load_database("nova")
+        assert len(reopened) == 10
+        print("✓ Snapshot restaurado após troca de chave e sem o cofre")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_tampered_snapshot():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        assert storage.save_database(make_database(5), "senha_mestre")
+        snapshot_id = storage.create_snapshot("senha_mestre")
+        pack_path = os.path.join(storage.snapshots.packs_dir, packs(storage)[0])
+        with open(pack_path, 'r+b') as f:
+            f.seek(60)
+            byte = f.read(1)
+            f.seek(60)
+            f.write(bytes([byte[0] ^ 1]))
+        assert storage.load_snapshot(snapshot_id, "senha_mestre") is None
+        print("✓ Backup adulterado é rejeitado")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_prune():
+    infos = [SnapshotInfo(f"s{i}", created_at, None, 0) for i, created_at in enumerate([
+        "2026-01-15T10:00:00", "2026-02-10T10:00:00", "2026-03-02T09:00:00", "2026-03-02T18:00:00",
+        "2026-03-03T09:00:00", "2026-03-04T09:00:00", "2026-03-04T12:00:00",
+    ])]
+    # O mais recente, o último de cada um dos 2 últimos dias, 2 últimas semanas e 3 últimos meses
+    assert _retained(infos, 1, 2, 2, 3) == {"s6", "s4", "s1", "s0"}
+    assert _retained(infos, 0, 3, 0, 0) == {"s6", "s4", "s3"}
+    assert _retained(infos, 0, 0, 0, 0) == set()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir, kdf_params=FAST_PARAMS)
+        database = make_database(50)
+        assert storage.save_database(database, "senha_mestre")
+        for i in range(3):
+            edit(storage, database, str(i), f"Versão {i}")
+            assert storage.save_database(database, "senha_mestre")
+            assert storage.create_snapshot("senha_mestre") is not None
+        before = sum(os.path.getsize(os.path.join(storage.snapshots.packs_dir, name)) for name in packs(storage))
+
+        removed = storage.prune_snapshots(keep_last=1, keep_daily=0, keep_weekly=0, keep_monthly=0)
+        assert len(removed) == 2 and len(storage.list_snapshots()) == 1
+        after = sum(os.path.getsize(os.path.join(storage.snapshots.packs_dir, name)) for name in packs(storage))
+        assert after < before
+        latest = storage.load_snapshot(storage.list_snapshots()[0].id, "senha_mestre")
+        assert [latest.get(str(i)).title for i in range(3)] == ["Versão 0", "Versão 1", "Versão 2"]
+        print("✓ Retenção remove snapshots antigos e objetos sem uso")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_snapshots_store_only_changes()
+    test_restore_and_export()
+    test_restore_after_key_change()
+    test_tampered_snapshot()
+    test_prune()
@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.password_model import PasswordEntry
+from src.storage.storage_manager import StorageManager, ENGINE_SQLITE
+from tests.helpers import FAST_PARAMS, make_database
+import shutil
+import sqlite3
+import tempfile
+
+def open_storage(data_dir: str) -> StorageManager:
+    return StorageManager(data_dir, engine=ENGINE_SQLITE, kdf_params=FAST_PARAMS)
+
+def test_sqlite_engine():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = open_storage(data_dir)
+        database = make_database(2000)
+        assert storage.save_database(database, "senha_mestre")
+        assert storage.writes_entries()
+
+        # Edição e remoção gravam só a linha da entrada
+        entry = database.get("7")
+        storage.reveal_entry(entry, "senha_mestre")
+        entry.notes = "nota"
+        assert storage.save_entry(database, entry, "senha_mestre")
+        assert storage.delete_entry(database, "8", "senha_mestre")
+        novo = PasswordEntry(id="novo", title="Novo", username="User1@Mail.com", password="segredo")
+        assert storage.save_entry(database, novo, "senha_mestre")
+
+        other = open_storage(data_dir)
+        loaded = other.load_database("senha_mestre")
+        assert len(loaded) == 2000 and "8" not in loaded
+        assert [e.id for e in loaded][:8] == ["0", "1", "2", "3", "4", "5", "6", "7"]  # Ordem mantida
+        assert loaded.entry_at(len(loaded) - 1).id == "novo"
+        assert other.reveal_entry(loaded.get("7"), "senha_mestre").notes == "nota"
+        assert other.load_entry("novo", "senha_mestre").title == "Novo"
+        assert other.load_entry("inexistente", "senha_mestre") is None
+        assert other.load_database("senha_errada") is None
+        print("✓ Cofre SQLite com gravação por entrada")
+
+        # Busca pelo índice de HMACs (sem diferenciar maiúsculas)
+        found = other.find_entries('username', "user1@mail.com", "senha_mestre")
+        assert "novo" in {e.id for e in found} and len(found) == 668
+        assert other.find_entries('url', "https://site5.com", "senha_mestre")[0].id == "5"
+
+        # Nada em claro no arquivo
+        other.close()
+        storage.close()
+        with sqlite3.connect(storage.db_file) as connection:
+            dump = "\n".join(connection.iterdump())
+        assert "site5" not in dump and "Site 5" not in dump
+        print("✓ Metadados indexados só por HMAC")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_sqlite_transactions():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = open_storage(data_dir)
+        assert storage.save_database(make_database(10), "senha_antiga")
+
+        # Falha no meio da transação desfaz tudo
+        try:
+            with storage.vault.transaction():
+                storage.vault.delete(["1", "2"], storage.crypto)
+                raise RuntimeError("queda")
+        except RuntimeError:
+            pass
+        assert len(storage.load_database("senha_antiga")) == 10
+
+        database = storage.load_database("senha_antiga")
+        assert storage.change_master_password("senha_antiga", "senha_nova")
+        assert storage.reveal_entry(database.get("3"), "senha_nova").password == "senha3"
+        assert storage.change_master_password("senha_nova", "senha_final", rotate_key=True)
+
+        other = open_storage(data_dir)
+        assert other.load_database("senha_nova") is None
+        loaded = other.load_database("senha_final")
+        assert other.reveal_entry(loaded.get("9"), "senha_final").password == "senha9"
+        assert other.find_entries('url', "https://site9.com", "senha_final")[0].id == "9"
+        print("✓ Transações e troca de chave")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_sqlite_engine()
+    test_sqlite_transactions()
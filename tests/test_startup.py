@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Processo novo: o que já foi importado quando o login aparece
+_DRIVER = """
+import sys
+sys.argv = ["main.py"]
+sys.path.insert(0, %r)
+import main
+app = main.PasswordManagerApp()
+app.show_login()
+app.app.processEvents()
+print(",".join(name for name in ("cryptography", "ui.main_window", "src.models.search_index")
+               if name in sys.modules))
+app.warm_up()
+print(",".join(name for name in ("ui.main_window", "src.models.search_index") if name in sys.modules))
+"""
+
+def test_login_imports_only_what_it_needs():
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = subprocess.run([sys.executable, "-c", _DRIVER % ROOT], cwd=work_dir, env=environment,
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+    assert output[-2] == ""  # Nem cryptography, nem janela principal antes do login
+    assert output[-1] == "ui.main_window,src.models.search_index"
+    print("✓ Login abre sem importar janela principal e cryptography")
+
+if __name__ == "__main__":
+    test_login_imports_only_what_it_needs()
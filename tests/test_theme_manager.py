@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.theme_manager import ThemeManager, PALETTES, stylesheet
+
+def test_stylesheets():
+    for theme, palette in PALETTES.items():
+        style = stylesheet(theme)
+        assert "$" not in style  # Todos os tokens substituídos
+        assert palette['background'] in style and "QPushButton#deleteButton" in style
+        assert stylesheet(theme) is style  # Gerado uma vez só
+    assert stylesheet("dark") != stylesheet("light")
+    print("✓ Stylesheets gerados da paleta e reaproveitados")
+
+def test_theme_switch():
+    manager = ThemeManager()
+    themes = []
+    manager.theme_changed.connect(themes.append)
+    assert manager.toggle_theme() == "light"
+    manager.set_theme("inexistente")
+    manager.set_theme("dark")
+    assert themes == ["light", "dark"] and manager.get_theme() == "dark"
+    print("✓ Troca de tema")
+
+if __name__ == "__main__":
+    test_stylesheets()
+    test_theme_switch()
@@ -0,0 +1,188 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crypto.crypto_manager import CryptoManager
+from src.storage.storage_manager import StorageManager
+from src.storage.vault_format import (encode_vault, decode_vault, encode_chunks, is_legacy_vault,
+                                      open_secret, open_reader, MappedVault, VaultReader)
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import io
+import shutil
+import tempfile
+
+def make_database() -> PasswordDatabase:
+    db = PasswordDatabase()
+    for i in range(3):
+        db.entries.append(PasswordEntry(
+            id=str(i),
+            title=f"Site {i}",
+            username=f"user{i}",
+            password=f"senha{i}",
+            url=f"https://site{i}.com",
+            notes=f"nota {i}"
+        ))
+    return db
+
+def test_per_entry_format():
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    
+    data = encode_vault(make_database(), crypto)
+    assert not is_legacy_vault(data)
+    
+    # Só o índice é descriptografado no carregamento
+    db = decode_vault(data, crypto)
+    assert [e.title for e in db.entries] == ["Site 0", "Site 1", "Site 2"]
+    assert all(e.is_sealed and e.password is None for e in db.entries)
+    print("✓ Segredos permanecem criptografados")
+    
+    # Segredos fechados são regravados sem descriptografar
+    sealed = db.entries[1].sealed_secret
+    db = decode_vault(encode_vault(db, crypto), crypto)
+    assert db.entries[1].sealed_secret == sealed
+    print("✓ Regravação preserva registros fechados")
+    
+    # Segredo trocado entre entradas não abre (vinculado ao id)
+    db.entries[0].sealed_secret = sealed
+    try:
+        open_secret(db.entries[0], crypto)
+        assert False, "Deveria ter falhado"
+    except Exception:
+        pass
+    print("✓ Segredos vinculados à entrada")
+
+def test_binary_format():
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    db = make_database()
+    db.entries[0].url = None
+    db.entries[1].notes = None
+    db.entries[2].title = "Título com acentuação ✓"
+    
+    data = encode_vault(db, crypto)
+    legacy = crypto.encrypt_data(db.to_json())
+    assert len(data) < len(legacy)
+    
+    loaded = decode_vault(data, crypto)
+    assert loaded.entries[0].url is None
+    assert loaded.entries[2].title == "Título com acentuação ✓"
+    
+    # Cabeçalho adulterado invalida o índice
+    tampered = bytearray(data)
+    tampered[9] ^= 1
+    try:
+        decode_vault(bytes(tampered), crypto)
+        assert False, "Deveria ter falhado"
+    except Exception:
+        pass
+    print("✓ Formato binário")
+
+def test_chunked_stream():
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    db = PasswordDatabase()
+    for i in range(10):
+        db.entries.append(PasswordEntry(id=str(i), title=f"Site {i}", username="user", password="senha"))
+    
+    chunks = list(encode_chunks(db, crypto, chunk_entries=4))
+    assert len(chunks) == 4  # Cabeçalho + 3 blocos
+    
+    # Entradas chegam bloco a bloco
+    reader = VaultReader(io.BytesIO(b"".join(chunks)), crypto)
+    assert reader.count == 10
+    assert [len(batch) for batch in reader.batches()] == [4, 4, 2]
+    print("✓ Leitura bloco a bloco")
+    
+    # Arquivo cortado entre blocos, blocos trocados ou removidos são rejeitados
+    for broken in [chunks[:3], [chunks[0], chunks[2], chunks[1], chunks[3]], [chunks[0], chunks[1], chunks[3]]]:
+        try:
+            for _ in VaultReader(io.BytesIO(b"".join(broken)), crypto).batches():
+                pass
+            assert False, "Deveria ter falhado"
+        except Exception:
+            pass
+    print("✓ Blocos autenticados em ordem")
+
+def test_mapped_vault():
+    crypto = CryptoManager()
+    crypto.generate_key_from_password("senha_mestre")
+    db = PasswordDatabase()
+    for i in range(10):
+        db.entries.append(PasswordEntry(id=str(i), title=f"Site {i}", username="user", password="senha"))
+    
+    with tempfile.TemporaryFile() as f:
+        f.write(b"".join(encode_chunks(db, crypto, chunk_entries=4)))
+        f.flush()
+        
+        # Só o bloco pedido é descriptografado
+        vault = MappedVault(f, crypto)
+        assert len(vault) == 3 and vault.count == 10
+        assert [e.title for e in vault.read_chunk(2)] == ["Site 8", "Site 9"]
+        assert sum(len(batch) for batch in vault.batches()) == 10
+        vault.close()
+        
+        # Arquivo cortado é detectado já na leitura da tabela de blocos
+        f.truncate(f.tell() - 10)
+        try:
+            MappedVault(f, crypto)
+            assert False, "Deveria ter falhado"
+        except ValueError:
+            pass
+    
+    # Formatos antigos caem na leitura sequencial
+    with tempfile.TemporaryFile() as f:
+        f.write(crypto.encrypt_data(db.to_json()))
+        f.flush()
+        reader = open_reader(f, crypto)
+        assert isinstance(reader, VaultReader)
+        assert [len(batch) for batch in reader.batches()] == [10]
+    print("✓ Leitura mapeada em memória")
+
+def test_lazy_reveal():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir)
+        master_password = "senha_mestre_123"
+        assert storage.save_database(make_database(), master_password)
+        
+        db = StorageManager(data_dir).load_database(master_password)
+        entry = storage.reveal_entry(db.entries[2], master_password)
+        assert entry.password == "senha2" and entry.notes == "nota 2"
+        assert not entry.is_sealed
+        assert db.entries[0].is_sealed
+        print("✓ Segredo descriptografado sob demanda")
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_legacy_upgrade():
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir)
+        master_password = "senha_mestre_123"
+        
+        # Cofre no formato antigo (token Fernet com JSON completo)
+        salt = os.urandom(16)
+        with open(storage.salt_file, 'wb') as f:
+            f.write(salt)
+        storage.crypto.generate_key_from_password(master_password, salt)
+        with open(storage.db_file, 'wb') as f:
+            f.write(storage.crypto.encrypt_data(make_database().to_json()))
+        
+        storage = StorageManager(data_dir)
+        db = storage.load_database(master_password)
+        assert storage.reveal_entry(db.entries[0], master_password).password == "senha0"
+        with open(storage.db_file, 'rb') as f:
+            assert not is_legacy_vault(f.read())
+        assert not os.path.exists(storage.salt_file)
+        print("✓ Cofre antigo convertido ao abrir")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_per_entry_format()
+    test_binary_format()
+    test_chunked_stream()
+    test_mapped_vault()
+    test_lazy_reveal()
+    test_legacy_upgrade()
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functools import partial
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+from src.ui.worker import Worker
+from src.ui.login_window import unlock_vault
+from src.storage.storage_manager import StorageManager
+from src.models.password_model import PasswordDatabase, PasswordEntry
+import shutil
+import tempfile
+import threading
+
+def run_worker(fn, cancel=False):
+    """Executa a tarefa e retorna (sinal recebido, valor) e o progresso repassado"""
+    result = []
+    progress = []
+    loop = QEventLoop()
+    worker = Worker(fn)
+    worker.progress.connect(progress.append)
+    worker.done.connect(lambda value: result.append(("done", value)))
+    worker.failed.connect(lambda error: result.append(("failed", error)))
+    worker.cancelled.connect(lambda: result.append(("cancelled", None)))
+    for signal in (worker.done, worker.failed, worker.cancelled):
+        signal.connect(loop.quit)
+    QTimer.singleShot(5000, loop.quit)
+
+    worker.start()
+    if cancel:
+        worker.cancel()
+    loop.exec()
+    return result[0], progress
+
+def test_worker():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    main_thread = threading.get_ident()
+
+    def task(report):
+        report("metade")
+        return threading.get_ident()
+
+    (signal, thread), progress = run_worker(task)
+    assert signal == "done" and thread != main_thread
+    assert progress == ["metade"]
+    print("✓ Tarefa executada fora da thread da interface")
+
+    def broken(report):
+        raise ValueError("arquivo inválido")
+
+    (signal, error), _ = run_worker(broken)
+    assert signal == "failed" and str(error) == "arquivo inválido"
+    print("✓ Exceção entregue pelo sinal failed")
+
+    def slow(report):
+        while True:
+            report("trabalhando")  # Interrompe depois do cancel()
+
+    (signal, _), _ = run_worker(slow, cancel=True)
+    assert signal == "cancelled"
+    print("✓ Tarefa cancelada")
+
+def test_unlock_vault():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    data_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(data_dir)
+        master_password = "senha_mestre_123"
+        db = PasswordDatabase()
+        db.entries.append(PasswordEntry(id="1", title="Teste", username="user", password="senha"))
+        assert storage.save_database(db, master_password)
+        storage.lock()
+
+        # Database desbloqueado e índice entregues pelo signal
+        (signal, (database, search_index)), progress = run_worker(partial(unlock_vault, storage, master_password))
+        assert signal == "done"
+        assert database.entries[0].title == "Teste"
+        assert search_index.search("test") == ["1"]
+        assert storage.session.is_unlocked()
+        assert progress[-1] == "Indexando..."
+        print("✓ Desbloqueio em segundo plano")
+
+        (signal, error), _ = run_worker(partial(unlock_vault, StorageManager(data_dir), "senha_errada"))
+        assert signal == "failed" and str(error) == "Senha incorreta ou arquivo corrompido"
+        print("✓ Senha errada informada")
+
+        (signal, _), _ = run_worker(partial(unlock_vault, StorageManager(data_dir), master_password), cancel=True)
+        assert signal == "cancelled"
+        print("✓ Desbloqueio cancelado")
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    test_worker()
+    test_unlock_vault()